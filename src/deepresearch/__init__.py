@@ -1,6 +1,5 @@
 from . import server
 from .orchestration import DeepResearchOrchestrator
-import asyncio
 from .models import (
     Author,
     Paper,
@@ -17,7 +16,7 @@ from .models import (
 
 def main():
     """Main entry point for the package."""
-    asyncio.run(server.main())
+    server.run()
 
 # Expose the core components
 __all__ = ['main', 'server', 'DeepResearchOrchestrator']
\ No newline at end of file
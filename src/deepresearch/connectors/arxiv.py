@@ -1,5 +1,5 @@
 import arxiv
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import aiohttp
 import asyncio
 from datetime import datetime
@@ -120,6 +120,24 @@ class ArXivConnector(BaseConnector):
                 
             return await response.read()
             
+    async def stream_fulltext(self, paper_id: str) -> AsyncIterator[bytes]:
+        """Stream the PDF of an arXiv paper in chunks."""
+        await self._ensure_session()
+        
+        # Extract the actual arXiv ID
+        if ":" in paper_id:
+            _, arxiv_id = paper_id.split(":", 1)
+        else:
+            arxiv_id = paper_id
+            
+        paper = await self.get_paper_metadata(f"arxiv:{arxiv_id}")
+        
+        if not paper.pdf_url:
+            raise ValueError(f"No PDF URL available for paper {paper_id}")
+            
+        async for chunk in self._stream_pdf_url(paper.pdf_url, paper_id):
+            yield chunk
+            
     @staticmethod
     def parse_paper_id(external_id: str) -> str:
         """Parse and normalize an arXiv ID."""
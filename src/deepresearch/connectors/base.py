@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterable
 import asyncio
 import aiohttp
 from ..models import Paper, SearchQuery
 
+# Size of the pieces PDFs are streamed in
+STREAM_CHUNK_SIZE = 64 * 1024
+
 class BaseConnector(ABC):
     """Base class for all connectors to scholarly sources."""
     
@@ -40,8 +43,46 @@ class BaseConnector(ABC):
         """Download the full text of a paper as bytes."""
         pass
         
+    async def stream_fulltext(self, paper_id: str) -> AsyncIterator[bytes]:
+        """
+        Stream the full text of a paper as chunks of bytes.
+        
+        The default yields the whole download_fulltext result at once; connectors
+        that fetch a plain PDF URL override this to stream from the response.
+        """
+        yield await self.download_fulltext(paper_id)
+        
+    async def _stream_pdf_url(
+        self,
+        url: str,
+        paper_id: str,
+        require_pdf_type: bool = False
+    ) -> AsyncIterator[bytes]:
+        """
+        Stream a PDF from a URL in STREAM_CHUNK_SIZE pieces.
+        
+        Args:
+            url: URL serving the PDF
+            paper_id: Paper identifier, used in error messages
+            require_pdf_type: Whether to reject responses not labelled as PDF
+        """
+        async with self._session.get(url) as response:
+            if response.status != 200:
+                raise ValueError(f"Failed to download PDF for {paper_id}: {response.status}")
+                
+            if require_pdf_type and "pdf" not in response.headers.get("Content-Type", "").lower():
+                raise ValueError(f"Retrieved content is not a PDF for {paper_id}")
+                
+            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                yield chunk
+                
     @staticmethod
     @abstractmethod
     def parse_paper_id(external_id: str) -> str:
         """Parse and normalize an external ID to the connector's native format."""
-        pass 
\ No newline at end of file
+        pass
+        
+    @classmethod
+    def parse_paper_ids(cls, external_ids: Iterable[str]) -> List[str]:
+        """Parse and normalize a batch of external IDs in one call."""
+        return list(map(cls.parse_paper_id, external_ids)) 
\ No newline at end of file
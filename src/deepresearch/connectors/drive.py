@@ -1,18 +1,22 @@
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Union, BinaryIO
 import aiohttp
 import asyncio
 import os
 import io
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import json
 import logging
+import threading
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
+from googleapiclient.http import HttpRequest, MediaIoBaseUpload
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from ..models import DriveDocument, Paper, PaperSummary
 from .base import BaseConnector
+from ..utils.filenames import sanitize_filename
 
 logger = logging.getLogger(__name__)
 
@@ -21,20 +25,58 @@ SCOPES = ['https://www.googleapis.com/auth/drive.file']
 TOKEN_FILE = 'deepresearch_token.json'
 CREDENTIALS_FILE = 'deepresearch_credentials.json'
 
+# Tokens this close to expiry are refreshed before use
+TOKEN_EXPIRY_MARGIN = timedelta(seconds=60)
+
 class GoogleDriveConnector(BaseConnector):
     """Connector for Google Drive to store and retrieve research documents."""
     
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None, credentials: Optional[Credentials] = None):
         super().__init__(session)
         self._drive_service = None
+        # Credentials from an earlier authenticate() are used instead of the token file
+        self._creds: Optional[Credentials] = credentials
+        # Naive UTC, as google-auth stores it; None if the token doesn't expire
+        self._creds_expiry: Optional[datetime] = None
+        # One persistent authorized transport per executor thread
+        self._local = threading.local()
+        self._transports: List[AuthorizedHttp] = []
+        self._transports_lock = threading.Lock()
+        
+    def _thread_http(self) -> AuthorizedHttp:
+        """
+        Get this thread's authorized HTTP transport, creating it on first use.
+        
+        httplib2 connections are not thread-safe, so each executor thread keeps
+        its own keep-alive connection and reuses it for every call it runs.
+        """
+        http = getattr(self._local, "http", None)
+        if http is None:
+            http = AuthorizedHttp(self._creds, http=httplib2.Http())
+            self._local.http = http
+            with self._transports_lock:
+                self._transports.append(http)
+        return http
+        
+    def _build_request(self, http, *args, **kwargs) -> HttpRequest:
+        """Build a Drive API request bound to the calling thread's transport."""
+        return HttpRequest(self._thread_http(), *args, **kwargs)
+        
+    def _close_transports(self):
+        """Close every per-thread transport and forget them."""
+        with self._transports_lock:
+            transports, self._transports = self._transports, []
+        for http in transports:
+            http.http.close()
+        self._local = threading.local()
         
     async def authenticate(self) -> bool:
         """Authenticate with Google Drive."""
         loop = asyncio.get_running_loop()
         
-        creds = None
+        creds = self._creds
         # The file deepresearch_token.json stores the user's access and refresh tokens
-        if os.path.exists(TOKEN_FILE):
+        if creds is None and os.path.exists(TOKEN_FILE):
             try:
                 creds = await loop.run_in_executor(
                     None, lambda: Credentials.from_authorized_user_info(
@@ -78,18 +120,53 @@ class GoogleDriveConnector(BaseConnector):
             with open(TOKEN_FILE, 'w') as token:
                 token.write(creds.to_json())
                 
-        # Create the Drive API client
+        # Transports bound to earlier credentials are no longer valid
+        self._close_transports()
+        self._creds = creds
+        self._creds_expiry = creds.expiry
+        
+        # Create the Drive API client. Requests are built on the executing thread's
+        # persistent transport rather than one httplib2 object shared by all threads.
         self._drive_service = await loop.run_in_executor(
-            None, lambda: build('drive', 'v3', credentials=creds)
+            None, lambda: build(
+                'drive', 'v3',
+                http=self._thread_http(),
+                requestBuilder=self._build_request
+            )
         )
         return True
         
+    @property
+    def credentials(self) -> Optional[Credentials]:
+        """Credentials from the last successful authenticate() call."""
+        return self._creds
+        
+    async def close(self):
+        """Close the Drive transports and any session owned by this connector."""
+        self._close_transports()
+        await super().close()
+        
     async def ensure_authenticated(self):
         """Ensure we are authenticated to Google Drive."""
-        if self._drive_service is None:
-            success = await self.authenticate()
-            if not success:
-                raise ValueError("Failed to authenticate with Google Drive")
+        if self._drive_service is not None:
+            # Fast path: the token is still good for a while
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            if self._creds_expiry is None or now + TOKEN_EXPIRY_MARGIN < self._creds_expiry:
+                return
+                
+            # Refresh once up front instead of inside whichever request hits the expiry
+            if self._creds.refresh_token:
+                loop = asyncio.get_running_loop()
+                try:
+                    await loop.run_in_executor(None, lambda: self._creds.refresh(Request()))
+                    self._creds_expiry = self._creds.expiry
+                    return
+                except Exception as e:
+                    logger.warning(f"Error refreshing credentials: {e}")
+                    
+        success = await self.authenticate()
+        if not success:
+            raise ValueError("Failed to authenticate with Google Drive")
                 
     async def create_folder(self, folder_name: str, parent_id: Optional[str] = None) -> str:
         """Create a folder in Google Drive."""
@@ -148,12 +225,17 @@ class GoogleDriveConnector(BaseConnector):
             
     async def store_document(
         self, 
-        content: Union[bytes, str], 
+        content: Union[bytes, str, BinaryIO], 
         filename: str,
         mime_type: str,
         folder_id: Optional[str] = None
     ) -> DriveDocument:
-        """Store a document in Google Drive."""
+        """
+        Store a document in Google Drive.
+        
+        content may be an open binary file, which is uploaded in chunks straight
+        from the file instead of being read into memory first.
+        """
         await self.ensure_authenticated()
         loop = asyncio.get_running_loop()
         
@@ -167,7 +249,7 @@ class GoogleDriveConnector(BaseConnector):
             content = content.encode('utf-8')
             
         # Create a media upload object
-        fh = io.BytesIO(content)
+        fh = io.BytesIO(content) if isinstance(content, bytes) else content
         media = MediaIoBaseUpload(fh, mimetype=mime_type, resumable=True)
         
         try:
@@ -197,7 +279,7 @@ class GoogleDriveConnector(BaseConnector):
     async def store_paper(self, paper: Paper, pdf_content: bytes, folder_name: str = "Research Papers") -> DriveDocument:
         """Store a research paper PDF in Google Drive."""
         # Create a sanitized filename
-        safe_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
+        safe_title = sanitize_filename(paper.title)
         filename = f"{safe_title}.pdf"
         
         # Find or create the research papers folder
@@ -217,7 +299,7 @@ class GoogleDriveConnector(BaseConnector):
     async def store_paper_summary(self, paper: Paper, summary: PaperSummary, folder_name: str = "Research Papers") -> DriveDocument:
         """Store a summary of a research paper in Google Drive."""
         # Create a sanitized filename
-        safe_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
+        safe_title = sanitize_filename(paper.title)
         filename = f"{safe_title} - Summary.txt"
         
         # Find or create the research papers folder
@@ -294,15 +376,13 @@ class GoogleDriveConnector(BaseConnector):
         loop = asyncio.get_running_loop()
         
         try:
-            request = self._drive_service.files().get_media(fileId=document_id)
-            
             # Create an in-memory bytes buffer
             fh = io.BytesIO()
             
-            # Execute the request and write to the buffer
+            # Build and execute the request on the same thread, so it runs on that thread's transport
             downloader = await loop.run_in_executor(
                 None,
-                lambda: request.execute(num_retries=3)
+                lambda: self._drive_service.files().get_media(fileId=document_id).execute(num_retries=3)
             )
             
             fh.write(downloader)
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import aiohttp
 import asyncio
 from datetime import datetime
@@ -10,6 +10,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Cluster ID in a Google Scholar URL, e.g. ...scholar?cluster=1234567890
+_CLUSTER_ID_RE = re.compile(r'cluster=([^&]+)')
+
 class GoogleScholarConnector(BaseConnector):
     """
     Connector for Google Scholar using scholarly library.
@@ -228,6 +231,18 @@ class GoogleScholarConnector(BaseConnector):
                 raise ValueError(f"Retrieved content is not a PDF for {paper_id}")
                 
             return await response.read()
+            
+    async def stream_fulltext(self, paper_id: str) -> AsyncIterator[bytes]:
+        """Stream the PDF of a Google Scholar result in chunks, if one is linked."""
+        await self._ensure_session()
+        
+        paper = await self.get_paper_metadata(paper_id)
+        
+        if not paper.pdf_url:
+            raise ValueError(f"No PDF URL available for {paper_id}")
+            
+        async for chunk in self._stream_pdf_url(paper.pdf_url, paper_id, require_pdf_type=True):
+            yield chunk
     
     @staticmethod
     def parse_paper_id(external_id: str) -> str:
@@ -238,7 +253,7 @@ class GoogleScholarConnector(BaseConnector):
         # Handle common Google Scholar URL patterns
         if "scholar.google.com" in external_id:
             # Extract cluster ID from URL
-            match = re.search(r'cluster=([^&]+)', external_id)
+            match = _CLUSTER_ID_RE.search(external_id)
             if match:
                 return f"googlescholar:{match.group(1)}"
         
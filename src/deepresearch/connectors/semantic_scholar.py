@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import aiohttp
 import asyncio
 from datetime import datetime
@@ -6,11 +6,18 @@ import semanticscholar as ss
 from ..models import Paper, Author, SearchQuery
 from .base import BaseConnector
 
+# Graph API endpoint that resolves many papers in one POST
+S2_BATCH_URL = "https://api.semanticscholar.org/graph/v1/paper/batch"
+
+# Most IDs the batch endpoint accepts per request
+S2_BATCH_LIMIT = 500
+
 class SemanticScholarConnector(BaseConnector):
     """Connector for the Semantic Scholar API."""
     
     def __init__(self, session: Optional[aiohttp.ClientSession] = None, api_key: Optional[str] = None):
         super().__init__(session)
+        self._api_key = api_key
         # Semantic Scholar client
         self._client = ss.SemanticScholar(api_key=api_key)
         
@@ -169,6 +176,36 @@ class SemanticScholarConnector(BaseConnector):
             }
         )
         
+    async def get_papers_batch(self, ids: List[str], fields: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Fetch raw Graph API records for many papers at once.
+        
+        Args:
+            ids: Semantic Scholar paper IDs, or prefixed external IDs such as 'DOI:...' or 'ARXIV:...'
+            fields: Graph API fields to return, including nested ones like 'citations.paperId'
+            
+        Returns:
+            Records aligned with ids; None where a paper was not found
+        """
+        await self._ensure_session()
+        
+        headers = {"x-api-key": self._api_key} if self._api_key else {}
+        params = {"fields": ",".join(fields)}
+        
+        records: List[Optional[Dict[str, Any]]] = []
+        for start in range(0, len(ids), S2_BATCH_LIMIT):
+            async with self._session.post(
+                S2_BATCH_URL,
+                params=params,
+                json={"ids": ids[start:start + S2_BATCH_LIMIT]},
+                headers=headers
+            ) as response:
+                if response.status != 200:
+                    raise ValueError(f"Semantic Scholar batch lookup failed: {response.status}")
+                records.extend(await response.json())
+                
+        return records
+        
     async def download_fulltext(self, paper_id: str) -> bytes:
         """Download the PDF of a paper from Semantic Scholar if available."""
         await self._ensure_session()
@@ -186,6 +223,18 @@ class SemanticScholarConnector(BaseConnector):
                 
             return await response.read()
             
+    async def stream_fulltext(self, paper_id: str) -> AsyncIterator[bytes]:
+        """Stream the PDF of a paper from Semantic Scholar in chunks."""
+        await self._ensure_session()
+        
+        paper = await self.get_paper_metadata(paper_id)
+        
+        if not paper.pdf_url:
+            raise ValueError(f"No open access PDF available for {paper_id}")
+            
+        async for chunk in self._stream_pdf_url(paper.pdf_url, paper_id):
+            yield chunk
+            
     @staticmethod
     def parse_paper_id(external_id: str) -> str:
         """Parse and normalize a Semantic Scholar ID."""
@@ -1,13 +1,18 @@
 from typing import List, Dict, Optional, Any, Union, Tuple
-from pydantic import BaseModel, Field, AnyUrl
+from pydantic import BaseModel, ConfigDict, Field, AnyUrl
 from datetime import datetime
 
 class Author(BaseModel):
+    # Immutable (and hashable) so identical authors can share one instance
+    model_config = ConfigDict(frozen=True)
+    
     name: str
     affiliation: Optional[str] = None
     email: Optional[str] = None
     
 class Paper(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     paper_id: str
     title: str
     authors: List[Author]
@@ -22,6 +27,8 @@ class Paper(BaseModel):
     raw_metadata: Optional[Dict[str, Any]] = None
     
 class PaperSummary(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     paper_id: str
     background: str
     methods: str
@@ -63,6 +70,8 @@ class SearchResult(BaseModel):
     suggested_queries: Optional[List[str]] = None
 
 class Relation(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     paper_id: str
     source: str
     relation: str
@@ -71,6 +80,8 @@ class Relation(BaseModel):
     evidence: Optional[str] = None
 
 class PaperComparison(BaseModel):
+    model_config = ConfigDict(frozen=True)
+    
     paper_ids: List[str]
     research_questions: Dict[str, Any]
     methodologies: Dict[str, Any]
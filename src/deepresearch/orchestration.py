@@ -37,6 +37,8 @@ from .pipelines import (
     TrendAnalyzer
 )
 
+from .utils import get_shared_client, close_shared_client, load_token_encoding, user_cache_dir
+
 
 from dotenv import load_dotenv
 
@@ -67,6 +69,12 @@ class DeepResearchOrchestrator:
         if "semanticscholar_api_key" not in self.config:
             self.config["semanticscholar_api_key"] = os.environ.get("SEMANTICSCHOLAR_API_KEY")
             
+        # Crossref responses are cached on disk; set CROSSREF_CACHE_DIR to "" to turn that off
+        if "crossref_cache_dir" not in self.config:
+            self.config["crossref_cache_dir"] = os.environ.get(
+                "CROSSREF_CACHE_DIR", user_cache_dir("crossref")
+            )
+            
         self._session = None
         self._connectors = {}
         self._pipelines = {}
@@ -77,8 +85,13 @@ class DeepResearchOrchestrator:
         if self._initialized:
             return
             
-        # Create shared aiohttp session
-        self._session = aiohttp.ClientSession()
+        # Create shared aiohttp session; keep-alive lets repeated calls to the
+        # same scholarly hosts skip the TCP and TLS handshakes
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32, limit_per_host=8, ttl_dns_cache=300, keepalive_timeout=75
+            )
+        )
         
         # Initialize connectors
         self._connectors = {
@@ -98,19 +111,31 @@ class DeepResearchOrchestrator:
             "drive": GoogleDriveConnector(self._session)
         }
         
+        # LLM-backed pipelines share one pooled session for Anthropic calls
+        llm_client = get_shared_client()
+        
+        # Load the tokenizer now, off the event loop, rather than on the first prompt
+        await load_token_encoding()
+        
         # Initialize pipelines
         self._pipelines = {
             "metadata_extractor": MetadataExtractor(),
             "fulltext_fetcher": FullTextFetcher(self._connectors),
             "summarizer": Summarizer(
-                llm_api_key=self.config.get("llm_api_key")
+                llm_api_key=self.config.get("llm_api_key"),
+                client=llm_client
+            ),
+            "citation_graph_builder": CitationGraphBuilder(
+                self._connectors,
+                cache_dir=self.config.get("crossref_cache_dir")
             ),
-            "citation_graph_builder": CitationGraphBuilder(self._connectors),
             "relation_extractor": RelationExtractor(
-                llm_api_key=self.config.get("llm_api_key")
+                llm_api_key=self.config.get("llm_api_key"),
+                client=llm_client
             ),
             "paper_comparator": PaperComparator(
-                llm_api_key=self.config.get("llm_api_key")
+                llm_api_key=self.config.get("llm_api_key"),
+                client=llm_client
             ),
             "trend_analyzer": TrendAnalyzer()
         }
@@ -126,6 +151,9 @@ class DeepResearchOrchestrator:
         # Close pipelines that need cleanup
         if "fulltext_fetcher" in self._pipelines:
             await self._pipelines["fulltext_fetcher"].close()
+        if "citation_graph_builder" in self._pipelines:
+            self._pipelines["citation_graph_builder"].close()
+        await close_shared_client()
             
         # Close session
         if self._session:
@@ -134,6 +162,16 @@ class DeepResearchOrchestrator:
             
         self._initialized = False
         
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the orchestrator's pooled HTTP session.
+        
+        Returns:
+            The shared aiohttp session, closed by shutdown()
+        """
+        await self.initialize()
+        return self._session
+        
     async def search_papers(self, query: Union[str, SearchQuery]) -> SearchResult:
         """
         Search for papers across multiple sources.
@@ -239,16 +277,22 @@ class DeepResearchOrchestrator:
             
         return pdf_content
         
-    async def summarize_document(self, document: Union[str, bytes], paper_id: Optional[str] = None) -> PaperSummary:
+    async def _prepare_document(
+        self,
+        document: Union[str, bytes],
+        paper_id: Optional[str],
+        purpose: str
+    ) -> Tuple[str, Paper]:
         """
-        Generate a structured summary of a document.
+        Turn a document into text and look up (or stub) its paper metadata.
         
         Args:
-            document: HTML or text content to summarize
-            paper_id: Optional paper ID to attach to the summary
+            document: HTML, text, or PDF bytes
+            paper_id: Optional paper ID to fetch metadata for
+            purpose: What the document is being prepared for, used in error messages
             
         Returns:
-            PaperSummary object
+            Tuple of (document text, Paper)
         """
         await self.initialize()
         
@@ -263,7 +307,7 @@ class DeepResearchOrchestrator:
             try:
                 paper = await self.fetch_paper_metadata(paper_id)
             except Exception as e:
-                print(f"Error fetching paper metadata for summary: {e}")
+                print(f"Error fetching paper metadata for {purpose}: {e}")
                 
         # If we don't have paper metadata, create minimal Paper object
         if not paper:
@@ -274,9 +318,26 @@ class DeepResearchOrchestrator:
                 source="unknown"
             )
             
-        # Use the summarizer to generate a summary
+        return document, paper
+        
+    async def summarize_document(self, document: Union[str, bytes], paper_id: Optional[str] = None) -> PaperSummary:
+        """
+        Generate a structured summary of a document.
+        
+        Args:
+            document: HTML or text content to summarize
+            paper_id: Optional paper ID to attach to the summary
+            
+        Returns:
+            PaperSummary object
+        """
+        document, paper = await self._prepare_document(document, paper_id, "summary")
+        
+        # The fused call caches both parts, so a later annotate_highlights on
+        # the same document is served from the cache instead of the API
         summarizer = self._pipelines["summarizer"]
-        return await summarizer.summarize_paper(paper, document)
+        summary, _ = await summarizer.summarize_and_annotate(paper, document)
+        return summary
         
     async def annotate_highlights(self, document: Union[str, bytes], paper_id: Optional[str] = None) -> Annotation:
         """
@@ -289,33 +350,11 @@ class DeepResearchOrchestrator:
         Returns:
             Annotation object
         """
-        await self.initialize()
+        document, paper = await self._prepare_document(document, paper_id, "annotation")
         
-        # If document is PDF (bytes), extract text
-        if isinstance(document, bytes):
-            fetcher = self._pipelines["fulltext_fetcher"]
-            document = await fetcher.extract_text_from_pdf(document)
-            
-        # If we have a paper_id, get the paper metadata
-        paper = None
-        if paper_id:
-            try:
-                paper = await self.fetch_paper_metadata(paper_id)
-            except Exception as e:
-                print(f"Error fetching paper metadata for annotation: {e}")
-                
-        # If we don't have paper metadata, create minimal Paper object
-        if not paper:
-            paper = Paper(
-                paper_id=paper_id or "document:unknown",
-                title="Unknown Document",
-                authors=[],
-                source="unknown"
-            )
-            
-        # Use the summarizer to generate annotations
+        # Shares its cached LLM call with summarize_document
         summarizer = self._pipelines["summarizer"]
-        annotations_dict = await summarizer.annotate_paper(paper, document)
+        _, annotations_dict = await summarizer.summarize_and_annotate(paper, document)
         
         # Convert to Annotation object
         return Annotation(
@@ -348,6 +387,29 @@ class DeepResearchOrchestrator:
             direction=direction
         )
         
+    async def get_citation_graph_batched(self, paper_ids: List[str], depth: int = 1, max_citations: int = 20, direction: str = "both") -> CitationGraph:
+        """
+        Build a citation graph using one Semantic Scholar batch request per depth level.
+        
+        Args:
+            paper_ids: List of paper identifiers
+            depth: How many levels of citations to include
+            max_citations: Maximum number of citations per paper to include
+            direction: Citation direction ("both", "citing", or "cited")
+            
+        Returns:
+            CitationGraph object
+        """
+        await self.initialize()
+        
+        graph_builder = self._pipelines["citation_graph_builder"]
+        return await graph_builder.build_citation_graph_batched(
+            paper_ids,
+            depth=depth,
+            max_citations=max_citations,
+            direction=direction
+        )
+        
     async def store_to_drive(self, document: bytes, folder_id: Optional[str] = None, paper_id: Optional[str] = None) -> str:
         """
         Save a document to Google Drive.
@@ -413,40 +475,39 @@ class DeepResearchOrchestrator:
         """
         await self.initialize()
         
-        # Create tasks for each source
-        tasks = {}
-        for source in sources:
-            if source in self._connectors:
-                connector = self._connectors[source]
-                search_query = SearchQuery(query=query, max_results=max_results)
-                tasks[source] = asyncio.create_task(connector.search(search_query))
+        # Search every requested source at once; total latency is the slowest source
+        search_query = SearchQuery(query=query, max_results=max_results)
+        active_sources = [source for source in sources if source in self._connectors]
+        outcomes = await asyncio.gather(
+            *(self._connectors[source].search(search_query) for source in active_sources),
+            return_exceptions=True
+        )
         
-        # Wait for all tasks to complete
         results = {}
-        for source, task in tasks.items():
-            try:
-                papers = await task
-                # Convert papers to serializable format
-                papers_json = []
-                for paper in papers:
-                    papers_json.append({
-                        "paper_id": paper.paper_id,
-                        "title": paper.title,
-                        "authors": [a.name for a in paper.authors],
-                        "abstract": paper.abstract[:200] + "..." if paper.abstract and len(paper.abstract) > 200 else paper.abstract,
-                        "url": paper.url,
-                        "source": paper.source
-                    })
-                results[source] = {
-                    "status": "success",
-                    "count": len(papers),
-                    "papers": papers_json
-                }
-            except Exception as e:
+        for source, outcome in zip(active_sources, outcomes):
+            if isinstance(outcome, BaseException):
                 results[source] = {
                     "status": "error",
-                    "error": str(e)
+                    "error": str(outcome)
                 }
+                continue
+                
+            # Convert papers to serializable format
+            papers_json = []
+            for paper in outcome:
+                papers_json.append({
+                    "paper_id": paper.paper_id,
+                    "title": paper.title,
+                    "authors": [a.name for a in paper.authors],
+                    "abstract": paper.abstract[:200] + "..." if paper.abstract and len(paper.abstract) > 200 else paper.abstract,
+                    "url": paper.url,
+                    "source": paper.source
+                })
+            results[source] = {
+                "status": "success",
+                "count": len(outcome),
+                "papers": papers_json
+            }
         
         return {
             "query": query,
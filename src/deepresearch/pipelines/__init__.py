@@ -1,4 +1,4 @@
-from .metadata_extractor import MetadataExtractor
+from .metadata_extractor import MetadataExtractor, from_semantic_scholar_record
 from .fulltext_fetcher import FullTextFetcher
 from .summarizer import Summarizer
 from .citation_graph_builder import CitationGraphBuilder
@@ -8,6 +8,7 @@ from .trend_analyzer import TrendAnalyzer
 
 __all__ = [
     'MetadataExtractor',
+    'from_semantic_scholar_record',
     'FullTextFetcher',
     'Summarizer',
     'CitationGraphBuilder',
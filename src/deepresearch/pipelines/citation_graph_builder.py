@@ -1,25 +1,161 @@
-from typing import Dict, Any, Optional, Union, List, Set
+from typing import Dict, Any, Optional, Union, List, Set, Tuple
 import asyncio
+import json
 import logging
+import os
+import sqlite3
+import threading
+import time
 from crossref.restful import Works
 from ..models import Paper, CitationLink, CitationGraph
 from ..connectors.base import BaseConnector
+from ..utils.paper_ids import split_paper_id
+from .metadata_extractor import from_semantic_scholar_record
 
 logger = logging.getLogger(__name__)
 
+# How long cached Crossref responses stay valid (7 days)
+CROSSREF_CACHE_TTL = 7 * 24 * 60 * 60
+
+# How each ID source is written for the Semantic Scholar batch endpoint
+_S2_ID_PREFIXES = {
+    "semanticscholar": "",
+    "arxiv": "ARXIV:",
+    "doi": "DOI:",
+    "pubmed": "PMID:",
+    "pmid": "PMID:"
+}
+
+# Graph API fields used to build graph nodes
+_S2_NODE_FIELDS = [
+    "paperId", "externalIds", "url", "title", "abstract", "venue", "year",
+    "publicationDate", "journal", "authors", "citationCount", "openAccessPdf"
+]
+
+# Fields requested for each neighbour, enough to show it as a node
+_S2_EDGE_FIELDS = ["paperId", "title", "authors", "venue", "year", "externalIds"]
+
+
+def _to_s2_id(paper_id: str) -> Optional[str]:
+    """Express a paper ID in a form the Semantic Scholar batch endpoint accepts, if possible."""
+    source, rest = split_paper_id(paper_id)
+    prefix = _S2_ID_PREFIXES.get(source)
+    return None if prefix is None else prefix + rest
+
+
+def _s2_record_to_paper(record: Dict[str, Any]) -> Paper:
+    """Build a graph node from a Graph API record, leaving out its edge lists."""
+    return from_semantic_scholar_record({
+        key: value for key, value in record.items()
+        if key not in ("citations", "references")
+    })
+
+
+def _first(value: Any, default: Any = "") -> Any:
+    """Return the first item of a Crossref list field, or the value itself if it isn't a list."""
+    if isinstance(value, list):
+        return value[0] if value else default
+    return value or default
+
+
 class CitationGraphBuilder:
     """Pipeline for building citation networks between scholarly papers."""
     
-    def __init__(self, connectors: Dict[str, BaseConnector]):
+    def __init__(self, connectors: Dict[str, BaseConnector], cache_dir: Optional[str] = None):
         """
         Initialize with a dictionary of connectors keyed by source name.
         
         Args:
             connectors: Dictionary of source connectors
+            cache_dir: Optional directory for a persistent Crossref response cache
         """
         self.connectors = connectors
         self._works = Works()
         
+        # Optional on-disk cache so repeated runs don't refetch the same DOIs
+        self._cache: Optional[sqlite3.Connection] = None
+        self._cache_lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._cache = sqlite3.connect(
+                os.path.join(cache_dir, "crossref.sqlite"), check_same_thread=False
+            )
+            self._cache.execute(
+                "CREATE TABLE IF NOT EXISTS crossref "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._cache.commit()
+            
+    def close(self):
+        """Close the Crossref cache database, if one is open."""
+        with self._cache_lock:
+            if self._cache is not None:
+                self._cache.close()
+                self._cache = None
+                
+    def _cache_get(self, key: str) -> Optional[Any]:
+        """Return a cached Crossref response, or None if missing or expired."""
+        with self._cache_lock:
+            if self._cache is None:
+                return None
+            row = self._cache.execute(
+                "SELECT value, stored_at FROM crossref WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > CROSSREF_CACHE_TTL:
+            return None
+        return json.loads(row[0])
+        
+    def _cache_set(self, key: str, value: Any) -> None:
+        """Store a Crossref response in the cache, if caching is enabled."""
+        with self._cache_lock:
+            if self._cache is None:
+                return
+            self._cache.execute(
+                "INSERT OR REPLACE INTO crossref (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self._cache.commit()
+            
+    def _crossref_fetch_doi(self, doi: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a Crossref work by DOI, consulting the cache first.
+        
+        Blocking; call from an executor.
+        
+        Args:
+            doi: DOI to look up
+            
+        Returns:
+            Crossref work data or None if not found
+        """
+        key = f"crossref:doi:{doi}"
+        work = self._cache_get(key)
+        if work is None:
+            work = self._works.doi(doi)
+            if work:
+                self._cache_set(key, work)
+        return work
+        
+    def _crossref_fetch_citing(self, doi: str, max_papers: int) -> List[Dict[str, Any]]:
+        """
+        Fetch Crossref works that reference a DOI, consulting the cache first.
+        
+        Blocking; call from an executor.
+        
+        Args:
+            doi: DOI of the cited paper
+            max_papers: Maximum number of works to return
+            
+        Returns:
+            List of Crossref work data
+        """
+        key = f"crossref:citing:{doi}:{max_papers}"
+        works = self._cache_get(key)
+        if works is None:
+            works = list(self._works.filter(references=doi).limit(max_papers))
+            self._cache_set(key, works)
+        return works
+        
     async def build_citation_graph(
         self, 
         paper_ids: List[str], 
@@ -73,29 +209,29 @@ class CitationGraphBuilder:
                             # Get citations in both directions if requested
                             if direction in ["both", "citing"]:
                                 citing_papers = await self._get_citing_papers(paper_id, max_citations)
-                                for citing_id, citing_paper in citing_papers.items():
-                                    if citing_id not in papers_dict:
-                                        papers_dict[citing_id] = citing_paper
-                                    if citing_id not in processed_papers:
-                                        papers_to_process.add(citing_id)
-                                    # Add citation link: citing paper -> current paper
-                                    citation_links.append(CitationLink(
-                                        source_id=citing_id,
-                                        target_id=paper_id
-                                    ))
+                                # Walk in insertion order so node order is stable between runs
+                                for cid, cpaper in citing_papers.items():
+                                    if cid not in papers_dict:
+                                        papers_dict[cid] = cpaper
+                                papers_to_process |= citing_papers.keys() - processed_papers
+                                # Add citation links: citing paper -> current paper
+                                citation_links.extend(
+                                    CitationLink(source_id=cid, target_id=paper_id)
+                                    for cid in citing_papers
+                                )
                                     
                             if direction in ["both", "cited"]:
                                 cited_papers = await self._get_cited_papers(paper_id, max_citations)
-                                for cited_id, cited_paper in cited_papers.items():
-                                    if cited_id not in papers_dict:
-                                        papers_dict[cited_id] = cited_paper
-                                    if cited_id not in processed_papers:
-                                        papers_to_process.add(cited_id)
-                                    # Add citation link: current paper -> cited paper
-                                    citation_links.append(CitationLink(
-                                        source_id=paper_id,
-                                        target_id=cited_id
-                                    ))
+                                # Walk in insertion order so node order is stable between runs
+                                for cid, cpaper in cited_papers.items():
+                                    if cid not in papers_dict:
+                                        papers_dict[cid] = cpaper
+                                papers_to_process |= cited_papers.keys() - processed_papers
+                                # Add citation links: current paper -> cited paper
+                                citation_links.extend(
+                                    CitationLink(source_id=paper_id, target_id=cid)
+                                    for cid in cited_papers
+                                )
                                     
                         processed_papers.add(paper_id)
                 except Exception as e:
@@ -108,6 +244,126 @@ class CitationGraphBuilder:
             links=citation_links
         )
         
+    async def build_citation_graph_batched(
+        self, 
+        paper_ids: List[str], 
+        depth: int = 1, 
+        max_citations: int = 20,
+        direction: str = "both"
+    ) -> CitationGraph:
+        """
+        Build a citation graph with one Semantic Scholar batch request per depth level.
+        
+        Each level's papers, together with their citations and references, are
+        resolved in a single POST instead of one lookup per paper. Falls back to
+        build_citation_graph when Semantic Scholar is unavailable or an ID has no
+        Semantic Scholar form, and to a per-paper metadata lookup for papers it
+        doesn't index. Nodes are keyed by the IDs they were requested under;
+        neighbours found along the way are keyed as 'semanticscholar:<id>'.
+        
+        Args:
+            paper_ids: List of paper identifiers
+            depth: How many levels of citations to follow (1 = direct citations only)
+            max_citations: Maximum number of citations to include per paper
+            direction: "citing", "cited" or "both", as for build_citation_graph
+                       
+        Returns:
+            CitationGraph object with nodes (papers) and links (citations)
+        """
+        connector = self.connectors.get("semanticscholar")
+        if connector is None or any(_to_s2_id(pid) is None for pid in paper_ids):
+            return await self.build_citation_graph(paper_ids, depth, max_citations, direction)
+            
+        edge_kinds = []
+        if direction in ["both", "citing"]:
+            edge_kinds.append("citations")
+        if direction in ["both", "cited"]:
+            edge_kinds.append("references")
+        edge_fields = [f"{kind}.{field}" for kind in edge_kinds for field in _S2_EDGE_FIELDS]
+        
+        papers_dict: Dict[str, Paper] = {}
+        citation_links: List[CitationLink] = []
+        seen_links: Set[Tuple[str, str]] = set()
+        processed_papers: Set[str] = set()
+        # Node key for each Semantic Scholar paper ID seen so far
+        s2_keys: Dict[str, str] = {}
+        frontier = list(dict.fromkeys(paper_ids))
+        
+        for current_depth in range(depth + 1):
+            frontier = [pid for pid in frontier if pid not in processed_papers]
+            if not frontier:
+                break
+                
+            # Only levels that will be expanded need their edge lists
+            expand = current_depth < depth
+            fields = _S2_NODE_FIELDS + edge_fields if expand else _S2_NODE_FIELDS
+            try:
+                records = await connector.get_papers_batch(
+                    [_to_s2_id(pid) for pid in frontier], fields
+                )
+            except Exception as e:
+                logger.warning(f"Semantic Scholar batch lookup failed: {e}")
+                if current_depth == 0:
+                    return await self.build_citation_graph(paper_ids, depth, max_citations, direction)
+                break
+                
+            # Register every resolved paper first, so a neighbour that is also in
+            # this level links to the ID it was requested under
+            resolved: Dict[str, Dict[str, Any]] = {}
+            missing: List[str] = []
+            for paper_id, record in zip(frontier, records):
+                processed_papers.add(paper_id)
+                if record and record.get("paperId"):
+                    s2_keys.setdefault(record["paperId"], paper_id)
+                    resolved[paper_id] = record
+                else:
+                    missing.append(paper_id)
+                    
+            # Papers Semantic Scholar doesn't index (e.g. fresh preprints) are
+            # looked up through their own connector instead
+            fallbacks = dict(zip(
+                missing,
+                await asyncio.gather(*(self._get_paper_metadata(pid) for pid in missing))
+            ))
+            
+            next_frontier: Dict[str, None] = {}
+            for paper_id in frontier:
+                record = resolved.get(paper_id)
+                if record is None:
+                    if fallbacks.get(paper_id):
+                        papers_dict[paper_id] = fallbacks[paper_id]
+                    continue
+                paper = _s2_record_to_paper(record)
+                # Nodes keep the ID they were requested under
+                if paper.paper_id != paper_id:
+                    paper = paper.model_copy(update={"paper_id": paper_id})
+                papers_dict[paper_id] = paper
+                if not expand:
+                    continue
+                    
+                for kind in edge_kinds:
+                    for neighbour in (record.get(kind) or [])[:max_citations]:
+                        if not neighbour.get("paperId"):
+                            continue
+                        nid = s2_keys.setdefault(neighbour["paperId"], f"semanticscholar:{neighbour['paperId']}")
+                        if nid not in papers_dict:
+                            papers_dict[nid] = _s2_record_to_paper(neighbour)
+                        if nid not in processed_papers:
+                            next_frontier[nid] = None
+                        # citations cite this paper; references are cited by it
+                        edge = (nid, paper_id) if kind == "citations" else (paper_id, nid)
+                        # Both endpoints can report the same edge once they are expanded
+                        if edge not in seen_links:
+                            seen_links.add(edge)
+                            citation_links.append(CitationLink(source_id=edge[0], target_id=edge[1]))
+                            
+            frontier = list(next_frontier)
+            
+        return CitationGraph(
+            nodes=list(papers_dict.values()),
+            links=citation_links
+        )
+        
     async def _get_paper_metadata(self, paper_id: str) -> Optional[Paper]:
         """
         Get metadata for a paper using the appropriate connector.
@@ -119,9 +375,7 @@ class CitationGraphBuilder:
             Paper object or None if not found
         """
         # Determine the source and ID
-        source = None
-        if ':' in paper_id:
-            source, _ = paper_id.split(':', 1)
+        source, rest = split_paper_id(paper_id)
             
         # Find an appropriate connector
         connector = None
@@ -141,12 +395,12 @@ class CitationGraphBuilder:
                     
         if connector is None:
             # For papers without a connector, try Crossref as a fallback
-            if paper_id.startswith("doi:"):
-                doi = paper_id.replace("doi:", "")
+            if source == "doi":
+                doi = rest
                 loop = asyncio.get_running_loop()
                 try:
                     crossref_data = await loop.run_in_executor(
-                        None, lambda: self._works.doi(doi)
+                        None, lambda: self._crossref_fetch_doi(doi)
                     )
                     if crossref_data:
                         # Convert Crossref data to Paper object
@@ -177,9 +431,10 @@ class CitationGraphBuilder:
         # This is a simplified implementation that would be customized for each source
         
         # Check if we have a DOI
+        source, rest = split_paper_id(paper_id)
         doi = None
-        if paper_id.startswith("doi:"):
-            doi = paper_id.replace("doi:", "")
+        if source == "doi":
+            doi = rest
         else:
             # Try to get the paper metadata first to extract DOI
             paper = await self._get_paper_metadata(paper_id)
@@ -195,7 +450,7 @@ class CitationGraphBuilder:
             # Note: Crossref's citing-doi endpoint requires an API token for production use
             citing_works = await loop.run_in_executor(
                 None, 
-                lambda: list(self._works.filter(references=doi).limit(max_papers))
+                lambda: self._crossref_fetch_citing(doi, max_papers)
             )
             
             papers = {}
@@ -223,7 +478,8 @@ class CitationGraphBuilder:
         # This is a source-specific operation; each source requires different handling
         
         # For Semantic Scholar, we can use their API directly
-        if paper_id.startswith("semanticscholar:"):
+        source, rest = split_paper_id(paper_id)
+        if source == "semanticscholar":
             if "semanticscholar" in self.connectors:
                 connector = self.connectors["semanticscholar"]
                 try:
@@ -251,8 +507,8 @@ class CitationGraphBuilder:
                     
         # For papers with DOIs, we can use Crossref
         doi = None
-        if paper_id.startswith("doi:"):
-            doi = paper_id.replace("doi:", "")
+        if source == "doi":
+            doi = rest
         else:
             # Try to get the paper metadata first to extract DOI
             paper = await self._get_paper_metadata(paper_id)
@@ -263,7 +519,7 @@ class CitationGraphBuilder:
             loop = asyncio.get_running_loop()
             try:
                 work = await loop.run_in_executor(
-                    None, lambda: self._works.doi(doi)
+                    None, lambda: self._crossref_fetch_doi(doi)
                 )
                 
                 if work and "reference" in work:
@@ -276,7 +532,7 @@ class CitationGraphBuilder:
                             ref_id = f"doi:{ref_doi}"
                             try:
                                 ref_work = await loop.run_in_executor(
-                                    None, lambda: self._works.doi(ref_doi)
+                                    None, lambda: self._crossref_fetch_doi(ref_doi)
                                 )
                                 if ref_work:
                                     ref_paper = await self._crossref_to_paper(ref_work)
@@ -309,20 +565,20 @@ class CitationGraphBuilder:
                 
             # Extract authors
             authors = []
-            if "author" in crossref_data:
-                for author_data in crossref_data["author"]:
-                    name_parts = []
-                    if "given" in author_data:
-                        name_parts.append(author_data["given"])
-                    if "family" in author_data:
-                        name_parts.append(author_data["family"])
+            auth_list = crossref_data.get("author") or []
+            for author_data in auth_list:
+                name_parts = []
+                if "given" in author_data:
+                    name_parts.append(author_data["given"])
+                if "family" in author_data:
+                    name_parts.append(author_data["family"])
                         
-                    if name_parts:
-                        from ..models import Author
-                        authors.append(Author(
-                            name=" ".join(name_parts),
-                            affiliation=author_data.get("affiliation", [{}])[0].get("name") if author_data.get("affiliation") else None
-                        ))
+                if name_parts:
+                    from ..models import Author
+                    authors.append(Author(
+                        name=" ".join(name_parts),
+                        affiliation=_first(author_data.get("affiliation"), {}).get("name")
+                    ))
                         
             # Extract publication date
             pub_date = None
@@ -339,13 +595,13 @@ class CitationGraphBuilder:
             from ..models import Paper
             return Paper(
                 paper_id=f"doi:{doi}",
-                title=crossref_data.get("title", [""])[0] if isinstance(crossref_data.get("title", []), list) else crossref_data.get("title", ""),
+                title=_first(crossref_data.get("title")),
                 authors=authors,
                 abstract=crossref_data.get("abstract", ""),
                 url=crossref_data.get("URL", ""),
                 pdf_url=None,  # Crossref doesn't provide direct PDF links
                 publication_date=pub_date,
-                journal=crossref_data.get("container-title", [""])[0] if isinstance(crossref_data.get("container-title", []), list) else crossref_data.get("container-title", ""),
+                journal=_first(crossref_data.get("container-title")),
                 doi=doi,
                 source="crossref",
                 citations_count=crossref_data.get("is-referenced-by-count"),
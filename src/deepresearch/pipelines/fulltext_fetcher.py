@@ -7,29 +7,105 @@ import logging
 import re
 from ..models import Paper
 from ..connectors.base import BaseConnector
+from ..utils.paper_ids import split_paper_id
 
 logger = logging.getLogger(__name__)
 
+# Hosts most downloads end up at; connections to these are opened eagerly
+PREWARM_HOSTS = ("doi.org", "api.crossref.org", "arxiv.org", "www.semanticscholar.org")
+
+
+def _extract_pdf_text(pdf_content: bytes) -> str:
+    """
+    Extract text from PDF bytes with PyPDF2.
+    
+    Args:
+        pdf_content: PDF content as bytes
+        
+    Returns:
+        Extracted text, or an empty string if parsing fails
+    """
+    try:
+        reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
+        return "".join((page.extract_text() or "") + "\n\n" for page in reader.pages)
+    except Exception as e:
+        logger.error(f"Error extracting text with PyPDF2: {e}")
+        return ""
+
 class FullTextFetcher:
     """Pipeline for fetching and extracting full text from scholarly papers."""
     
     def __init__(self, connectors: Dict[str, BaseConnector]):
         """Initialize with a dictionary of connectors keyed by source name."""
         self.connectors = connectors
-        
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._owns_session = False
+        # Guards session creation when many downloads run concurrently
+        self._session_lock = asyncio.Lock()
+        self._prewarm_task: Optional[asyncio.Task] = None
+
     async def _ensure_aiohttp_session(self):
         """Create an aiohttp session if none exists."""
-        if not hasattr(self, '_session') or self._session is None:
-            self._session = aiohttp.ClientSession()
-            self._owns_session = True
-        
+        async with self._session_lock:
+            if self._session is None:
+                self._session = aiohttp.ClientSession()
+                self._owns_session = True
+                # Don't block the caller; the pool just fills up in the background
+                self._prewarm_task = asyncio.create_task(self._prewarm_connections())
+
+    async def _prewarm_connections(self):
+        """Resolve DNS and complete TLS handshakes for common hosts ahead of use."""
+        timeout = aiohttp.ClientTimeout(total=5)
+
+        async def touch(host: str):
+            async with self._session.head(f"https://{host}/", timeout=timeout):
+                pass
+
+        results = await asyncio.gather(
+            *(touch(host) for host in PREWARM_HOSTS), return_exceptions=True
+        )
+        for host, result in zip(PREWARM_HOSTS, results):
+            if isinstance(result, Exception):
+                logger.debug(f"Prewarm failed for {host}: {result}")
+
     async def close(self):
         """Close resources owned by this fetcher."""
-        if hasattr(self, '_session') and self._session and getattr(self, '_owns_session', False):
+        if self._prewarm_task and not self._prewarm_task.done():
+            self._prewarm_task.cancel()
+        self._prewarm_task = None
+        if self._session and self._owns_session:
             await self._session.close()
             self._session = None
             self._owns_session = False
-            
+
+    async def _is_pdf_url(self, url: str) -> bool:
+        """
+        Check whether a URL serves a PDF using a HEAD request, so non-PDF
+        landing pages are never downloaded in full.
+
+        Args:
+            url: URL to check
+
+        Returns:
+            True if the URL looks like it serves a PDF, or the HEAD request
+            could not tell
+        """
+        # Fast path: no round-trip needed for obvious PDF links
+        if url.lower().endswith('.pdf'):
+            return True
+
+        try:
+            async with self._session.head(url, allow_redirects=True) as response:
+                # Some hosts reject or forbid HEAD; let the GET decide in that case
+                if response.status in (403, 405, 501):
+                    return True
+                content_type = response.headers.get('Content-Type', '')
+                return response.status == 200 and 'pdf' in content_type.lower()
+        except Exception as e:
+            # A failed HEAD says nothing about the URL; the GET's Content-Type check decides
+            logger.warning(f"HEAD request failed for {url}: {str(e)}")
+            return True
+
     async def download_pdf(self, paper: Paper) -> Optional[bytes]:
         """
         Download PDF for a paper using the appropriate connector.
@@ -53,6 +129,8 @@ class FullTextFetcher:
         if paper.pdf_url:
             await self._ensure_aiohttp_session()
             try:
+                if not await self._is_pdf_url(paper.pdf_url):
+                    raise ValueError(f"URL does not serve a PDF: {paper.pdf_url}")
                 async with self._session.get(paper.pdf_url) as response:
                     if response.status == 200:
                         content_type = response.headers.get('Content-Type', '')
@@ -66,6 +144,8 @@ class FullTextFetcher:
             await self._ensure_aiohttp_session()
             try:
                 doi_url = f"https://doi.org/{paper.doi}"
+                if not await self._is_pdf_url(doi_url):
+                    raise ValueError(f"DOI does not resolve to a PDF: {paper.doi}")
                 async with self._session.get(doi_url, allow_redirects=True) as response:
                     if response.status == 200:
                         content_type = response.headers.get('Content-Type', '')
@@ -87,27 +167,9 @@ class FullTextFetcher:
         Returns:
             Extracted text as a string
         """
-        loop = asyncio.get_running_loop()
-        
-        # Use PyPDF2 to extract text (run in executor to not block)
+        # Parse in a worker thread so the event loop isn't blocked
         try:
-            # Create an in-memory file for PyPDF2
-            pdf_file = io.BytesIO(pdf_content)
-            
-            # Define a function to extract text using PyPDF2
-            def extract_with_pypdf():
-                text = ""
-                try:
-                    with PyPDF2.PdfReader(pdf_file) as pdf:
-                        for page_num in range(len(pdf.pages)):
-                            page = pdf.pages[page_num]
-                            text += page.extract_text() + "\n\n"
-                except Exception as e:
-                    logger.error(f"Error extracting text with PyPDF2: {e}")
-                return text
-                
-            # Run in executor to avoid blocking
-            return await loop.run_in_executor(None, extract_with_pypdf)
+            return await asyncio.to_thread(_extract_pdf_text, pdf_content)
         except Exception as e:
             logger.error(f"Failed to extract text from PDF: {str(e)}")
             return ""
@@ -142,9 +204,7 @@ class FullTextFetcher:
             Tuple of (paper_metadata, pdf_content, extracted_text)
         """
         # Determine the source and ID
-        source = None
-        if ':' in paper_id:
-            source, _ = paper_id.split(':', 1)
+        source, _ = split_paper_id(paper_id)
             
         # Find an appropriate connector
         connector = None
@@ -1,52 +1,455 @@
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, Tuple
 import re
 import json
 import asyncio
-from bs4 import BeautifulSoup
-from datetime import datetime
+import functools
+import threading
+from lxml import etree
+from datetime import MAXYEAR, MINYEAR, datetime
 from ..models import Paper, Author
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when available, otherwise the stdlib json module."""
+    if orjson is not None:
+        # orjson rejects str subclasses
+        if isinstance(data, str) and type(data) is not str:
+            data = str(data)
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _parse_year(value: Any) -> Optional[int]:
+    """Return a year from an int, whole float or numeric string, or None if it isn't one."""
+    if isinstance(value, float):
+        # JSON decoders may hand back 2020.0 for a year
+        if not value.is_integer():
+            return None
+        value = int(value)
+    try:
+        year = int(value)
+    except (ValueError, TypeError):
+        return None
+    # Outside this range datetime can't represent the year
+    return year if MINYEAR <= year <= MAXYEAR else None
+
+
+def _parse_month(value: Any) -> int:
+    """Return a month number from a numeric string, defaulting to January."""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.isdigit() and 1 <= int(value) <= 12:
+            return int(value)
+    return 1
+
+
+def _parse_iso_date(value: Any) -> Optional[datetime]:
+    """Parse an ISO 8601 date string, or return None if it isn't one."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=65536)
+def _author(name: str, affiliation: Optional[str] = None, email: Optional[str] = None) -> Author:
+    """Return a shared Author instance, so repeated authors across a corpus aren't reallocated."""
+    return Author(name=name, affiliation=affiliation, email=email)
+
+
+def _scan_bibtex(bibtex_str: str) -> Tuple[str, str, Dict[str, str]]:
+    """
+    Tokenize a single BibTeX entry in one pass.
+    
+    Field values may be brace-delimited (with nesting), quoted, or bare.
+    
+    Args:
+        bibtex_str: BibTeX entry text
+        
+    Returns:
+        Tuple of (entry_type, entry_key, fields) with field names lowercased
+        and values left as written (including any inner braces)
+    """
+    at = bibtex_str.find('@')
+    brace = bibtex_str.find('{', at + 1) if at != -1 else -1
+    entry_type = bibtex_str[at + 1:brace].strip() if brace != -1 else ''
+    if not entry_type or not entry_type.replace('_', '').isalnum():
+        raise ValueError("Invalid BibTeX format")
+        
+    n = len(bibtex_str)
+    i = brace + 1
+    while i < n and bibtex_str[i] not in ',}':
+        i += 1
+    entry_key = bibtex_str[brace + 1:i].strip()
+    
+    fields = {}
+    while i < n:
+        c = bibtex_str[i]
+        if c == '}':
+            break  # End of entry
+        if c in ', \t\r\n':
+            i += 1
+            continue
+            
+        # Field name
+        start = i
+        while i < n and (bibtex_str[i].isalnum() or bibtex_str[i] in '_-'):
+            i += 1
+        name = bibtex_str[start:i].lower()
+        if not name:
+            i += 1  # Skip a stray character
+            continue
+        while i < n and bibtex_str[i].isspace():
+            i += 1
+        if i >= n or bibtex_str[i] != '=':
+            continue
+        i += 1
+        while i < n and bibtex_str[i].isspace():
+            i += 1
+        if i >= n:
+            break
+            
+        # Field value
+        opener = bibtex_str[i]
+        if opener == '{' or opener == '"':
+            depth = 1 if opener == '{' else 0
+            start = i + 1
+            i += 1
+            while i < n:
+                c = bibtex_str[i]
+                if c == '{':
+                    depth += 1
+                elif c == '}':
+                    depth -= 1
+                    if opener == '{' and depth == 0:
+                        break
+                elif c == '"' and opener == '"' and depth == 0:
+                    break
+                i += 1
+            fields[name] = bibtex_str[start:i]
+            i += 1  # Skip the closing delimiter
+        else:
+            start = i
+            while i < n and bibtex_str[i] not in ',}\n':
+                i += 1
+            fields[name] = bibtex_str[start:i].strip()
+            
+    return entry_type, entry_key, fields
+
+
+def _split_bibtex_authors(value: str) -> List[str]:
+    """Split a BibTeX author list on ' and ', ignoring any inside braces."""
+    names = []
+    depth = 0
+    start = 0
+    i = 0
+    n = len(value)
+    while i < n:
+        c = value[i]
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+        elif (depth == 0 and c.isspace() and value.startswith('and', i + 1)
+              and i + 4 < n and value[i + 4].isspace()):
+            names.append(value[start:i])
+            i += 5
+            start = i
+            continue
+        i += 1
+    names.append(value[start:])
+    return names
+
+
+
+# Per-thread reusable HTML parser; lxml parsers can't be shared across threads
+_TLS = threading.local()
+
+# Bytes fed to the HTML parser at a time, so scanning can stop early
+_HTML_CHUNK_SIZE = 64 * 1024
+
+
+def _html_parser() -> etree.HTMLPullParser:
+    """
+    Return this thread's HTML pull parser, creating it on first use.
+    
+    Comments and processing instructions are dropped and the id index is
+    skipped (collect_ids=False) since we never look elements up by id.
+    """
+    parser = getattr(_TLS, 'html_parser', None)
+    if parser is None:
+        parser = etree.HTMLPullParser(
+            events=('end',),
+            encoding='utf-8',
+            remove_comments=True,
+            remove_pis=True,
+            collect_ids=False
+        )
+        _TLS.html_parser = parser
+    return parser
+
+
+def _iter_html_elements(html_bytes: bytes):
+    """Yield elements of an HTML document as they close, using the thread's parser."""
+    parser = _html_parser()
+    closed = False
+    try:
+        for start in range(0, len(html_bytes), _HTML_CHUNK_SIZE):
+            parser.feed(html_bytes[start:start + _HTML_CHUNK_SIZE])
+            for _, elem in parser.read_events():
+                yield elem
+        closed = True
+        parser.close()
+        for _, elem in parser.read_events():
+            yield elem
+    finally:
+        # Reset the parser (and drop pending events) so it can be reused
+        if not closed:
+            try:
+                parser.close()
+            except etree.XMLSyntaxError:
+                pass
+        for _ in parser.read_events():
+            pass
+
+
+# schema.org keys that, once present, outrank anything later in the page
+# (headline or name for the title, then authors and date)
+_SCHEMA_SCAN_KEYS = (('headline', 'name'), ('author',), ('datePublished',))
+
+# Meta tags that fields like pdf_url, doi and abstract only ever come from
+_META_SCAN_KEYS = ('description', 'og:url', 'citation_pdf_url', 'citation_doi', 'citation_journal_title')
+
+
+def _html_scan_complete(meta_data: Dict[str, str], schema_data: Dict[str, Any]) -> bool:
+    """
+    Whether the rest of an HTML document can't change the extracted Paper.
+    
+    True once the schema.org article supplies the title, authors and date and
+    the meta tags that are the first choice for every other field have been
+    seen; short of that, the body may still hold a <meta> that's needed.
+    """
+    return (
+        all(any(schema_data.get(key) for key in keys) for keys in _SCHEMA_SCAN_KEYS) and
+        all(key in meta_data for key in _META_SCAN_KEYS)
+    )
+
+
+def _scan_html(html_str: str) -> Tuple[Dict[str, str], Dict[str, Any], str]:
+    """
+    Stream an HTML document and collect only the tags metadata comes from.
+    
+    Elements are cleared as soon as they are closed, so the full DOM is never
+    held in memory. Parsing stops early once <head> is done and every Paper
+    field already has the value it would take from the full document; see
+    _html_scan_complete.
+    
+    Args:
+        html_str: HTML document
+        
+    Returns:
+        Tuple of (meta_data, schema_data, page_title)
+    """
+    meta_data: Dict[str, str] = {}
+    schema_data: Dict[str, Any] = {}
+    page_title = None
+    if not html_str.strip():
+        return meta_data, schema_data, ''
+        
+    head_done = False
+    elements = _iter_html_elements(html_str.encode('utf-8'))
+    for elem in elements:
+        tag = elem.tag
+        if tag == 'meta':
+            attrs = elem.attrib
+            key = attrs.get('name') or attrs.get('property')
+            if key and attrs.get('content'):
+                meta_data[key] = attrs['content']
+        elif tag == 'title':
+            if page_title is None:
+                page_title = elem.text or ''
+        elif tag == 'script':
+            if not schema_data and elem.get('type') == 'application/ld+json':
+                try:
+                    data = _json_loads(elem.text)
+                    if isinstance(data, dict) and data.get('@type') in ['ScholarlyArticle', 'Article']:
+                        schema_data = data
+                except (json.JSONDecodeError, TypeError):
+                    pass
+        elif tag == 'head':
+            head_done = True
+            
+        elem.clear(keep_tail=True)
+        if head_done and _html_scan_complete(meta_data, schema_data):
+            break
+    elements.close()
+            
+    return meta_data, schema_data, page_title or ''
+
+def _date_from_parts(parts_holder: Any) -> Optional[datetime]:
+    """Build a datetime from a Crossref {'date-parts': [[y, m, d]]} value."""
+    if not isinstance(parts_holder, dict):
+        return None
+    parts = (parts_holder.get('date-parts') or [[]])[0] or []
+    if not parts or not isinstance(parts[0], int):
+        return None
+    return datetime(parts[0], parts[1] if len(parts) > 1 else 1, parts[2] if len(parts) > 2 else 1)
+
+
+def from_semantic_scholar_record(data: Dict[str, Any]) -> Paper:
+    """Map a Semantic Scholar Graph API paper record to a Paper."""
+    external_ids = data.get('externalIds') or {}
+    journal = data.get('journal') or {}
+    pdf = data.get('openAccessPdf') or {}
+    year = data.get('year')
+    pub_date = _parse_iso_date(data.get('publicationDate'))
+    if pub_date is None and isinstance(year, int):
+        pub_date = datetime(year, 1, 1)
+    return Paper(
+        paper_id=f"semanticscholar:{data['paperId']}",
+        title=data.get('title') or '',
+        authors=[_author(name=a['name']) for a in data.get('authors') or [] if a.get('name')],
+        abstract=data.get('abstract') or '',
+        url=data.get('url') or '',
+        pdf_url=pdf.get('url') or '',
+        publication_date=pub_date,
+        journal=journal.get('name') or data.get('venue') or '',
+        doi=external_ids.get('DOI') or '',
+        source='semanticscholar',
+        citations_count=data.get('citationCount'),
+        raw_metadata=data
+    )
+
+
+def _from_openalex(data: Dict[str, Any]) -> Paper:
+    """Map an OpenAlex work record to a Paper."""
+    authors = []
+    for authorship in data.get('authorships') or []:
+        name = (authorship.get('author') or {}).get('display_name')
+        if name:
+            institutions = authorship.get('institutions') or []
+            affiliation = institutions[0].get('display_name') if institutions else None
+            authors.append(_author(name=name, affiliation=affiliation))
+            
+    # OpenAlex ships abstracts as {word: [positions]}; rebuild the text
+    abstract = ''
+    inverted = data.get('abstract_inverted_index')
+    if inverted:
+        positions = {pos: word for word, spots in inverted.items() for pos in spots}
+        abstract = ' '.join(positions[i] for i in sorted(positions))
+        
+    location = data.get('primary_location') or {}
+    doi = data.get('doi') or ''
+    pub_date = _parse_iso_date(data.get('publication_date'))
+    if pub_date is None and isinstance(data.get('publication_year'), int):
+        pub_date = datetime(data['publication_year'], 1, 1)
+    return Paper(
+        paper_id=f"openalex:{data['id'].rsplit('/', 1)[-1]}",
+        title=data.get('title') or data.get('display_name') or '',
+        authors=authors,
+        abstract=abstract,
+        url=location.get('landing_page_url') or data['id'],
+        pdf_url=location.get('pdf_url') or '',
+        publication_date=pub_date,
+        journal=(location.get('source') or {}).get('display_name') or '',
+        doi=doi.replace('https://doi.org/', ''),
+        source='openalex',
+        citations_count=data.get('cited_by_count'),
+        raw_metadata=data
+    )
+
+
+def _from_crossref(data: Dict[str, Any]) -> Paper:
+    """Map a Crossref work record to a Paper."""
+    authors = []
+    for author_data in data.get('author') or []:
+        name = ' '.join(filter(None, (author_data.get('given'), author_data.get('family'))))
+        if name:
+            affiliations = author_data.get('affiliation') or []
+            authors.append(_author(
+                name=name,
+                affiliation=affiliations[0].get('name') if affiliations else None
+            ))
+            
+    titles = data.get('title') or ['']
+    containers = data.get('container-title') or ['']
+    pub_date = (
+        _date_from_parts(data.get('published-print')) or
+        _date_from_parts(data.get('published-online')) or
+        _date_from_parts(data.get('issued'))
+    )
+    return Paper(
+        paper_id=f"doi:{data['DOI']}",
+        title=titles[0] if isinstance(titles, list) else titles,
+        authors=authors,
+        abstract=data.get('abstract') or '',
+        url=data.get('URL') or '',
+        pdf_url='',
+        publication_date=pub_date,
+        journal=containers[0] if isinstance(containers, list) else containers,
+        doi=data['DOI'],
+        source='crossref',
+        citations_count=data.get('is-referenced-by-count'),
+        raw_metadata=data
+    )
+
+
+def _json_paper_id(data: Dict[str, Any]) -> str:
+    """Return the paper ID for JSON input: its own id or paper_id, else one built from the title."""
+    return data.get('id', data.get('paper_id', f"json:{data.get('title', '')}"))
+
+
+def _known_shape_parser(data: Dict[str, Any]):
+    """Return the specialized parser for a recognized API record shape, or None."""
+    if 'paperId' in data:
+        return from_semantic_scholar_record
+    record_id = data.get('id')
+    if isinstance(record_id, str) and record_id.startswith('https://openalex.org/'):
+        return _from_openalex
+    if 'DOI' in data and 'container-title' in data:
+        return _from_crossref
+    return None
+
 class MetadataExtractor:
     """Extract and normalize metadata from different scholarly sources."""
     
     @staticmethod
     async def extract_from_bibtex(bibtex_str: str) -> Paper:
         """Extract paper metadata from BibTeX format."""
-        # Basic BibTeX parser - in a real implementation, use a proper BibTeX parser
-        entry_type_match = re.search(r'@(\w+)\s*\{([^,]*)', bibtex_str)
-        if not entry_type_match:
-            raise ValueError("Invalid BibTeX format")
-            
-        entry_type = entry_type_match.group(1).lower()
-        entry_key = entry_type_match.group(2).strip()
+        return MetadataExtractor._parse_bibtex(bibtex_str)
         
-        # Extract all fields
-        fields = {}
-        field_matches = re.finditer(r'(\w+)\s*=\s*[{"]([^}"]*)[}"]', bibtex_str)
+    @staticmethod
+    def _parse_bibtex(bibtex_str: str) -> Paper:
+        """Synchronous body of extract_from_bibtex."""
+        # Tokenize the entry in a single pass over the string
+        entry_type, entry_key, raw_fields = _scan_bibtex(bibtex_str)
+        entry_type = entry_type.lower()
         
-        for match in field_matches:
-            field_name = match.group(1).lower()
-            field_value = match.group(2)
-            fields[field_name] = field_value
+        # Drop the braces BibTeX uses to protect capitalization
+        fields = {
+            name: value.replace('{', '').replace('}', '')
+            for name, value in raw_fields.items()
+        }
             
         # Process authors
         authors = []
-        if 'author' in fields:
-            # Split on 'and' but handle names with 'and' in them
-            author_names = re.split(r'\s+and\s+', fields['author'])
-            for name in author_names:
-                authors.append(Author(name=name.strip()))
+        if 'author' in raw_fields:
+            # Split on 'and' but leave braced names like {Smith and Sons} intact
+            for name in _split_bibtex_authors(raw_fields['author']):
+                authors.append(_author(name=name.replace('{', '').replace('}', '').strip()))
                 
         # Process publication date
         pub_date = None
-        if 'year' in fields:
-            try:
-                year = int(fields['year'])
-                month = int(fields.get('month', '1'))
-                day = 1
-                pub_date = datetime(year, month, day)
-            except (ValueError, TypeError):
-                pass
+        year = _parse_year(fields.get('year'))
+        if year is not None:
+            pub_date = datetime(year, _parse_month(fields.get('month')), 1)
                 
         # Create paper object
         return Paper(
@@ -67,81 +470,81 @@ class MetadataExtractor:
     @staticmethod
     async def extract_from_json(json_str: str) -> Paper:
         """Extract paper metadata from JSON format."""
+        return MetadataExtractor._parse_json(json_str)
+        
+    @staticmethod
+    def _parse_json(json_str: str) -> Paper:
+        """Synchronous body of extract_from_json."""
         try:
-            data = json.loads(json_str)
-            
-            # Process authors
-            authors = []
-            if 'authors' in data:
-                for author_data in data['authors']:
-                    if isinstance(author_data, str):
-                        authors.append(Author(name=author_data))
-                    elif isinstance(author_data, dict):
-                        authors.append(Author(
-                            name=author_data.get('name', ''),
-                            affiliation=author_data.get('affiliation'),
-                            email=author_data.get('email')
-                        ))
-                        
-            # Process publication date
-            pub_date = None
-            if 'publication_date' in data:
-                try:
-                    pub_date = datetime.fromisoformat(data['publication_date'])
-                except (ValueError, TypeError):
-                    # Try to parse just year
-                    if 'year' in data:
-                        try:
-                            pub_date = datetime(int(data['year']), 1, 1)
-                        except (ValueError, TypeError):
-                            pass
-            elif 'year' in data:
-                try:
-                    pub_date = datetime(int(data['year']), 1, 1)
-                except (ValueError, TypeError):
-                    pass
-                    
-            # Create paper object
-            return Paper(
-                paper_id=data.get('id', data.get('paper_id', f"json:{data.get('title', '')}")),
-                title=data.get('title', ''),
-                authors=authors,
-                abstract=data.get('abstract', ''),
-                url=data.get('url', ''),
-                pdf_url=data.get('pdf_url', ''),
-                publication_date=pub_date,
-                journal=data.get('journal', data.get('venue', '')),
-                doi=data.get('doi', ''),
-                source=data.get('source', 'json'),
-                citations_count=data.get('citations_count'),
-                raw_metadata=data
-            )
+            data = _json_loads(json_str)
         except json.JSONDecodeError:
             raise ValueError("Invalid JSON format")
-            
+        return MetadataExtractor._parse_dict(data)
+        
+    @staticmethod
+    def _parse_dict(data: Dict[str, Any]) -> Paper:
+        """Build a Paper from already-decoded JSON data."""
+        # Records from known APIs map field-by-field without guessing key names
+        parser = _known_shape_parser(data) if isinstance(data, dict) else None
+        if parser is not None:
+            try:
+                paper = parser(data)
+            except (KeyError, TypeError, AttributeError, ValueError):
+                pass  # Unexpected variant of the shape; use the generic path
+            else:
+                # Keep the ID and source the generic path has always reported for JSON input
+                return paper.model_copy(update={
+                    "paper_id": _json_paper_id(data),
+                    "source": data.get('source', 'json')
+                })
+                
+        # Process authors
+        authors = []
+        if 'authors' in data:
+            for author_data in data['authors']:
+                if isinstance(author_data, str):
+                    authors.append(_author(name=author_data))
+                elif isinstance(author_data, dict):
+                    authors.append(_author(
+                        name=author_data.get('name', ''),
+                        affiliation=author_data.get('affiliation'),
+                        email=author_data.get('email')
+                    ))
+                        
+        # Process publication date
+        pub_date = _parse_iso_date(data.get('publication_date'))
+        if pub_date is None:
+            # Try to parse just year
+            year = _parse_year(data.get('year'))
+            if year is not None:
+                pub_date = datetime(year, 1, 1)
+                    
+        # Create paper object
+        return Paper(
+            paper_id=_json_paper_id(data),
+            title=data.get('title', ''),
+            authors=authors,
+            abstract=data.get('abstract', ''),
+            url=data.get('url', ''),
+            pdf_url=data.get('pdf_url', ''),
+            publication_date=pub_date,
+            journal=data.get('journal', data.get('venue', '')),
+            doi=data.get('doi', ''),
+            source=data.get('source', 'json'),
+            citations_count=data.get('citations_count'),
+            raw_metadata=data
+        )
+        
     @staticmethod
     async def extract_from_html(html_str: str) -> Paper:
         """Extract paper metadata from HTML (using meta tags and schema.org markup)."""
-        soup = BeautifulSoup(html_str, 'html.parser')
-        
-        # Try to extract from meta tags first
-        meta_data = {}
-        for meta in soup.find_all('meta'):
-            if meta.get('name') and meta.get('content'):
-                meta_data[meta['name']] = meta['content']
-            elif meta.get('property') and meta.get('content'):
-                meta_data[meta['property']] = meta['content']
-                
-        # Try to extract from schema.org markup
-        schema_data = {}
-        for script in soup.find_all('script', type='application/ld+json'):
-            try:
-                data = json.loads(script.string)
-                if isinstance(data, dict) and data.get('@type') in ['ScholarlyArticle', 'Article']:
-                    schema_data = data
-                    break
-            except (json.JSONDecodeError, TypeError):
-                continue
+        return MetadataExtractor._parse_html(html_str)
+        
+    @staticmethod
+    def _parse_html(html_str: str) -> Paper:
+        """Synchronous body of extract_from_html."""
+        # Stream the document, collecting meta tags, <title> and schema.org markup
+        meta_data, schema_data, page_title = _scan_html(html_str)
                 
         # Combine data sources with priority to schema.org
         combined_data = {**meta_data, **schema_data}
@@ -150,7 +553,7 @@ class MetadataExtractor:
         title = (
             schema_data.get('headline', schema_data.get('name', '')) or
             meta_data.get('citation_title', meta_data.get('og:title', '')) or
-            soup.title.string if soup.title else ''
+            page_title
         )
         
         # Process authors
@@ -162,7 +565,7 @@ class MetadataExtractor:
                 
             for author in author_data:
                 if isinstance(author, dict):
-                    authors.append(Author(
+                    authors.append(_author(
                         name=author.get('name', ''),
                         affiliation=author.get('affiliation', {}).get('name') if isinstance(author.get('affiliation'), dict) else author.get('affiliation'),
                         email=None
@@ -171,9 +574,9 @@ class MetadataExtractor:
         if not authors and 'citation_author' in meta_data:
             if isinstance(meta_data['citation_author'], list):
                 for author_name in meta_data['citation_author']:
-                    authors.append(Author(name=author_name))
+                    authors.append(_author(name=author_name))
             else:
-                authors.append(Author(name=meta_data['citation_author']))
+                authors.append(_author(name=meta_data['citation_author']))
                 
         # Process publication date
         pub_date = None
@@ -184,10 +587,7 @@ class MetadataExtractor:
         )
         
         if date_str:
-            try:
-                pub_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-            except (ValueError, TypeError):
-                pass
+            pub_date = _parse_iso_date(date_str)
                 
         # Create paper object
         return Paper(
@@ -211,15 +611,20 @@ class MetadataExtractor:
         format_type: str
     ) -> Paper:
         """Extract metadata from various formats."""
-        if isinstance(source_data, dict):
-            source_data = json.dumps(source_data)
-            format_type = 'json'
-            
-        if format_type == 'bibtex':
-            return await MetadataExtractor.extract_from_bibtex(source_data)
-        elif format_type == 'json':
-            return await MetadataExtractor.extract_from_json(source_data)
-        elif format_type == 'html':
-            return await MetadataExtractor.extract_from_html(source_data)
-        else:
-            raise ValueError(f"Unsupported format type: {format_type}") 
\ No newline at end of file
+        return _sync_extract(source_data, format_type)
+
+
+def _sync_extract(source_data: Union[str, Dict[str, Any]], format_type: str) -> Paper:
+    """Dispatch to the parser for format_type."""
+    if isinstance(source_data, dict):
+        # Already decoded; skip the dumps/loads round-trip
+        return MetadataExtractor._parse_dict(source_data)
+        
+    if format_type == 'bibtex':
+        return MetadataExtractor._parse_bibtex(source_data)
+    elif format_type == 'json':
+        return MetadataExtractor._parse_json(source_data)
+    elif format_type == 'html':
+        return MetadataExtractor._parse_html(source_data)
+    else:
+        raise ValueError(f"Unsupported format type: {format_type}")
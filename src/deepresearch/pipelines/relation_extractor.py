@@ -1,9 +1,11 @@
 from typing import Dict, Any, Optional, Union, List
 import asyncio
+import aiohttp
+import json
 import logging
 import re
 from ..models import Paper, Relation
-from ..utils.llm_utils import call_anthropic_api, parse_json_response
+from ..utils.llm_utils import call_anthropic_api_cached, parse_json_response, clip_to_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -31,30 +33,52 @@ PAPER ABSTRACT: {abstract}
 PAPER FULL TEXT:
 {text}
 
-Format your response as a JSON list of relations:
-[
-  {{
-    "source": "concept1",
-    "relation": "causes",
-    "target": "concept2",
-    "section": "Results",
-    "evidence": "We observed that concept1 directly causes concept2..."
-  }},
-  ...
-]
+Record all of the relations you find by calling the emit_relations tool.
 """
 
+# Tool schema so the model returns relations as structured data rather than free text
+EMIT_RELATIONS_TOOL = {
+    "name": "emit_relations",
+    "description": "Record the relationships found in the paper.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "relations": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "source": {"type": "string", "description": "The source concept"},
+                        "relation": {"type": "string", "description": "The relation type, e.g. 'causes'"},
+                        "target": {"type": "string", "description": "The target concept"},
+                        "section": {"type": "string", "description": "Section where the relation was found"},
+                        "evidence": {"type": "string", "description": "Short supporting quote from the text"}
+                    },
+                    "required": ["source", "relation", "target"]
+                }
+            }
+        },
+        "required": ["relations"]
+    }
+}
+
 class RelationExtractor:
     """Pipeline for extracting relationships between concepts in scholarly papers."""
     
-    def __init__(self, llm_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        llm_api_key: Optional[str] = None,
+        client: Optional[aiohttp.ClientSession] = None
+    ):
         """
         Initialize the relation extractor.
         
         Args:
             llm_api_key: API key for the language model service
+            client: Shared HTTP session for LLM calls (defaults to the module-wide one)
         """
         self.llm_api_key = llm_api_key
+        self._client = client
         
     async def extract_relations(self, paper: Paper, full_text: str) -> List[Relation]:
         """
@@ -73,21 +97,30 @@ class RelationExtractor:
             title=paper.title,
             authors=authors_str,
             abstract=paper.abstract,
-            text=full_text[:10000]  # Limit text length for LLM context window
+            text=clip_to_tokens(full_text)  # Limit text length for LLM context window
         )
         
         # Call LLM
         try:
-            response = await call_anthropic_api(prompt, self.llm_api_key)
+            response = await call_anthropic_api_cached(
+                prompt,
+                self.llm_api_key,
+                client=self._client,
+                tools=[EMIT_RELATIONS_TOOL],
+                tool_choice={"type": "tool", "name": "emit_relations"}
+            )
             
-            # Parse the response to extract relations
-            import json
-            try:
-                # First try to parse the response directly with json.loads
-                relations_data = json.loads(response)
-            except json.JSONDecodeError:
-                # If direct parsing fails, use the helper
-                relations_data = await parse_json_response(response)
+            # The forced tool call gives us the relations as parsed data
+            if isinstance(response, dict):
+                relations_data = response.get("relations", [])
+            else:
+                # Fall back to parsing JSON out of a plain-text reply
+                try:
+                    # First try to parse the response directly with json.loads
+                    relations_data = json.loads(response)
+                except json.JSONDecodeError:
+                    # If direct parsing fails, use the helper
+                    relations_data = await parse_json_response(response)
             
             # Convert to Relation objects
             relations = []
@@ -1,9 +1,10 @@
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, Tuple
 import asyncio
+import aiohttp
 import logging
 import re
 from ..models import Paper, PaperSummary
-from ..utils.llm_utils import call_anthropic_api, parse_json_response
+from ..utils.llm_utils import call_anthropic_api_cached, parse_json_response, clip_to_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +66,47 @@ Please format your response as:
 [keyword1], [keyword2], [keyword3], ...
 """
 
+# Define the LLM prompt template for summarizing and annotating in a single call
+SUMMARIZE_AND_ANNOTATE_PROMPT_TEMPLATE = """
+You are a research assistant tasked with summarizing a scholarly paper and highlighting its key information.
+Please analyze the following paper and produce:
+
+1. A structured summary with these sections:
+   - Background: the context and motivation for the research, prior work, and the gap being addressed.
+   - Methods: the key methodologies, techniques, and approaches used in the paper.
+   - Results: the most important findings, data, and outcomes reported in the paper.
+   - Conclusions: the main conclusions, implications, and future directions suggested by the authors.
+2. The 5-10 most important sentences that capture key findings, methodologies, and conclusions.
+3. 10-15 keywords that represent the core topics and concepts in the paper.
+
+PAPER TITLE: {title}
+PAPER AUTHORS: {authors}
+PAPER ABSTRACT: {abstract}
+
+PAPER FULL TEXT:
+{text}
+
+Record the summary, key sentences, and keywords by calling the emit_summary tool.
+"""
+
+# Tool schema for the fused call, so the model returns structured fields directly
+EMIT_SUMMARY_TOOL = {
+    "name": "emit_summary",
+    "description": "Record a structured summary and annotations of the paper.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "background": {"type": "string"},
+            "methods": {"type": "string"},
+            "results": {"type": "string"},
+            "conclusions": {"type": "string"},
+            "highlights": {"type": "array", "items": {"type": "string"}},
+            "keywords": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["background", "methods", "results", "conclusions", "highlights", "keywords"]
+    }
+}
+
 # Add this to the top with the other prompt templates
 SECTION_SUMMARIZE_PROMPT_TEMPLATE = """
 You are a research assistant tasked with summarizing a specific section of a scholarly paper.
@@ -86,17 +128,50 @@ Please provide a comprehensive but concise summary of this section, capturing:
 Your summary should maintain the technical accuracy of the original while being more accessible.
 """
 
+# Markdown headings in LLM responses; one scan finds every section
+_HEADING_RE = re.compile(r"#[ \t]*([^\n#]+?)[ \t]*\n")
+_NUMBERED_SENTENCE = re.compile(r"\d+\.\s*(.*?)(?:\n|$)")
+
+def _split_sections(text: str) -> Dict[str, str]:
+    """
+    Split a markdown response into sections in a single pass.
+    
+    Each section runs from its heading to the next line starting with '#'.
+    Keys are heading names lowercased with whitespace removed (so
+    "Key Sentences" becomes "keysentences"); the first occurrence wins.
+    
+    Args:
+        text: LLM response text
+        
+    Returns:
+        Dictionary of section content keyed by normalized heading
+    """
+    sections = {}
+    for match in _HEADING_RE.finditer(text):
+        key = "".join(match.group(1).split()).lower()
+        if key in sections:
+            continue
+        end = text.find("\n#", match.end())
+        sections[key] = text[match.end():end if end != -1 else len(text)].strip()
+    return sections
+
 class Summarizer:
     """Pipeline for generating structured summaries and annotations of scholarly papers."""
     
-    def __init__(self, llm_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        llm_api_key: Optional[str] = None,
+        client: Optional[aiohttp.ClientSession] = None
+    ):
         """
         Initialize the summarizer.
         
         Args:
             llm_api_key: API key for the language model service
+            client: Shared HTTP session for LLM calls (defaults to the module-wide one)
         """
         self.llm_api_key = llm_api_key
+        self._client = client
         
     async def summarize_paper(self, paper: Paper, full_text: str) -> PaperSummary:
         """
@@ -115,18 +190,19 @@ class Summarizer:
             title=paper.title,
             authors=authors_str,
             abstract=paper.abstract,
-            text=full_text[:10000]  # Limit text length for LLM context window
+            text=clip_to_tokens(full_text)  # Limit text length for LLM context window
         )
         
         # Call LLM
         try:
-            response = await call_anthropic_api(prompt, self.llm_api_key)
+            response = await call_anthropic_api_cached(prompt, self.llm_api_key, client=self._client)
             
             # Parse the response to extract sections
-            background = self._extract_section(response, "Background")
-            methods = self._extract_section(response, "Methods")
-            results = self._extract_section(response, "Results")
-            conclusions = self._extract_section(response, "Conclusions")
+            sections = _split_sections(response)
+            background = self._extract_section(sections, "Background")
+            methods = self._extract_section(sections, "Methods")
+            results = self._extract_section(sections, "Results")
+            conclusions = self._extract_section(sections, "Conclusions")
             
             # Create the summary object
             return PaperSummary(
@@ -164,16 +240,17 @@ class Summarizer:
             title=paper.title,
             authors=authors_str,
             abstract=paper.abstract,
-            text=full_text[:10000]  # Limit text length for LLM context window
+            text=clip_to_tokens(full_text)  # Limit text length for LLM context window
         )
         
         # Call LLM
         try:
-            response = await call_anthropic_api(prompt, self.llm_api_key)
+            response = await call_anthropic_api_cached(prompt, self.llm_api_key, client=self._client)
             
             # Parse the response to extract key sentences and keywords
-            sentences = self._extract_key_sentences(response)
-            keywords = self._extract_keywords(response)
+            sections = _split_sections(response)
+            sentences = self._extract_key_sentences(sections)
+            keywords = self._extract_keywords(sections)
             
             # Create the annotations
             return {
@@ -190,31 +267,92 @@ class Summarizer:
                 "keywords": []
             }
             
-    def _extract_section(self, text: str, section_name: str) -> str:
-        """Extract content of a specific section from the structured response."""
-        pattern = rf"#\s*{section_name}\s*\n(.*?)(?:\n#|$)"
-        match = re.search(pattern, text, re.DOTALL)
-        if match:
-            return match.group(1).strip()
+    async def summarize_and_annotate(self, paper: Paper, full_text: str) -> Tuple[PaperSummary, Dict[str, Any]]:
+        """
+        Generate a structured summary and annotations for a paper in one LLM call.
+        
+        Prefer this over calling summarize_paper and annotate_paper separately
+        when both are needed, since the paper text is only sent once.
+        
+        Args:
+            paper: Paper model with metadata
+            full_text: Full text of the paper
+            
+        Returns:
+            Tuple of (PaperSummary, annotations dictionary with highlights and keywords)
+        """
+        # Create the prompt
+        authors_str = ", ".join(author.name for author in paper.authors)
+        prompt = SUMMARIZE_AND_ANNOTATE_PROMPT_TEMPLATE.format(
+            title=paper.title,
+            authors=authors_str,
+            abstract=paper.abstract,
+            text=clip_to_tokens(full_text)  # Limit text length for LLM context window
+        )
+        
+        # Call LLM
+        try:
+            response = await call_anthropic_api_cached(
+                prompt,
+                self.llm_api_key,
+                client=self._client,
+                tools=[EMIT_SUMMARY_TOOL],
+                tool_choice={"type": "tool", "name": "emit_summary"}
+            )
+            # The forced tool call returns parsed fields; plain text is a fallback
+            data = response if isinstance(response, dict) else await parse_json_response(response)
+            
+            summary = PaperSummary(
+                paper_id=paper.paper_id,
+                background=data.get("background") or "No Background section found in the summary.",
+                methods=data.get("methods") or "No Methods section found in the summary.",
+                results=data.get("results") or "No Results section found in the summary.",
+                conclusions=data.get("conclusions") or "No Conclusions section found in the summary."
+            )
+            annotations = {
+                "paper_id": paper.paper_id,
+                "highlights": [{"text": sentence} for sentence in data.get("highlights", [])],
+                "keywords": [k for k in data.get("keywords", []) if k]
+            }
+            return summary, annotations
+        except Exception as e:
+            logger.error(f"Failed to generate paper summary and annotations: {str(e)}")
+            # Return minimal results with error information
+            return (
+                PaperSummary(
+                    paper_id=paper.paper_id,
+                    background=f"Error generating summary: {str(e)}",
+                    methods="",
+                    results="",
+                    conclusions=""
+                ),
+                {
+                    "paper_id": paper.paper_id,
+                    "highlights": [{"text": f"Error generating annotations: {str(e)}"}],
+                    "keywords": []
+                }
+            )
+            
+    def _extract_section(self, sections: Dict[str, str], section_name: str) -> str:
+        """Extract content of a specific section from the split response."""
+        content = sections.get("".join(section_name.split()).lower())
+        if content is not None:
+            return content
         return f"No {section_name} section found in the summary."
         
-    def _extract_key_sentences(self, text: str) -> List[str]:
-        """Extract key sentences from the structured response."""
-        pattern = r"#\s*Key\s*Sentences\s*\n(.*?)(?:\n#|$)"
-        match = re.search(pattern, text, re.DOTALL)
-        if match:
-            sentences_text = match.group(1).strip()
+    def _extract_key_sentences(self, sections: Dict[str, str]) -> List[str]:
+        """Extract key sentences from the split response."""
+        sentences_text = sections.get("keysentences")
+        if sentences_text is not None:
             # Extract numbered sentences
-            sentences = re.findall(r"\d+\.\s*(.*?)(?:\n|$)", sentences_text)
+            sentences = _NUMBERED_SENTENCE.findall(sentences_text)
             return sentences
         return []
         
-    def _extract_keywords(self, text: str) -> List[str]:
-        """Extract keywords from the structured response."""
-        pattern = r"#\s*Keywords\s*\n(.*?)(?:\n#|$)"
-        match = re.search(pattern, text, re.DOTALL)
-        if match:
-            keywords_text = match.group(1).strip()
+    def _extract_keywords(self, sections: Dict[str, str]) -> List[str]:
+        """Extract keywords from the split response."""
+        keywords_text = sections.get("keywords")
+        if keywords_text is not None:
             # Split by commas and clean up
             keywords = [k.strip() for k in keywords_text.split(",")]
             return [k for k in keywords if k]  # Filter out empty strings
@@ -238,12 +376,12 @@ class Summarizer:
             title=paper.title,
             authors=authors_str,
             section_name=section_name,
-            section_text=section_text[:10000]  # Limit text length for LLM context window
+            section_text=clip_to_tokens(section_text)  # Limit text length for LLM context window
         )
         
         # Call LLM
         try:
-            response = await call_anthropic_api(prompt, self.llm_api_key)
+            response = await call_anthropic_api_cached(prompt, self.llm_api_key, client=self._client)
             
             # Return the summary (no need to extract sections)
             return response.strip()
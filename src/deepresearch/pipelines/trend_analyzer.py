@@ -1,14 +1,62 @@
-from typing import Dict, Any, Optional, Union, List, Tuple
+from typing import Dict, Any, Optional, Union, List, Sequence, Tuple
 import asyncio
+import functools
+import heapq
 import logging
+import random
 from datetime import datetime
-from collections import Counter, defaultdict
+from collections import Counter
+from itertools import chain, islice
+from operator import attrgetter, itemgetter
 import re
 import json
+import sys
 from ..models import Paper, PublicationTrend
 
 logger = logging.getLogger(__name__)
 
+# Words are runs of word characters; everything else separates them
+_WORD_RE = re.compile(r'\w+')
+
+# Below this many papers term statistics are noise and are skipped
+MIN_PAPERS_FOR_TERMS = 5
+
+# Above this many papers the n-gram passes run on a fixed-seed sample
+MAX_PAPERS_FOR_TERMS = 20000
+
+# Common words that never count as emerging topics
+_STOPWORDS = frozenset({"the", "and", "of", "in", "to", "a", "is", "that", "for", "on", "with"})
+
+
+def _tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into words, dropping punctuation."""
+    # One findall pass pulls the word runs straight out, with no intermediate
+    # punctuation-stripped copy. Interning makes every occurrence of a word one
+    # shared object, so cached word tuples and n-gram keys stay small and compare by identity.
+    return list(map(sys.intern, _WORD_RE.findall(text.lower())))
+
+
+def _ngram_counters(words: Sequence[str], max_ngram: int = 3) -> Tuple[Counter, ...]:
+    """Count 1 to max_ngram-grams of a word list, one Counter of word tuples per length."""
+    # Counter over zip keeps the loop in C; islice offsets avoid copying the list
+    return tuple(
+        Counter(zip(*(islice(words, i, None) for i in range(n))))
+        for n in range(1, max_ngram + 1)
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _paper_words(title: str, abstract: str) -> Tuple[str, ...]:
+    """
+    Tokenize a paper's title and abstract.
+    
+    Cached so repeated analyses over overlapping results skip re-tokenizing.
+    Only the word tuple is kept; the n-gram Counters built from it are many
+    times larger and are recounted per analysis instead.
+    """
+    return tuple(_tokenize(" ".join(part for part in (title, abstract) if part)))
+
+
 class TrendAnalyzer:
     """Pipeline for analyzing publication trends and identifying emerging topics."""
     
@@ -39,21 +87,21 @@ class TrendAnalyzer:
         # Extract query from first paper if available
         query = papers[0].raw_metadata.get("query", "") if papers[0].raw_metadata else ""
         
-        # Count publications by year
-        year_counts = self._count_by_year(papers)
+        # Years are read once and reused for counting and recent/older partitioning
+        years = [date.year if (date := paper.publication_date) else None for paper in papers]
         
-        # Extract n-grams from titles and abstracts
-        title_abstract_text = self._concatenate_titles_and_abstracts(papers)
-        term_frequencies = self._extract_ngrams(title_abstract_text)
-        
-        # Identify frequent authors
-        frequent_authors = self._find_frequent_authors(papers)
-        
-        # Count publications by source
-        source_distribution = self._count_by_source(papers)
-        
-        # Identify emerging topics using temporal analysis
-        emerging_topics = self._identify_emerging_topics(papers)
+        # The passes are independent, so run them side by side off the event loop
+        (
+            year_counts,
+            (term_frequencies, emerging_topics),
+            frequent_authors,
+            source_distribution
+        ) = await asyncio.gather(
+            asyncio.to_thread(self._count_by_year, years),
+            asyncio.to_thread(self._analyze_terms, papers, years),
+            asyncio.to_thread(self._find_frequent_authors, papers),
+            asyncio.to_thread(self._count_by_source, papers)
+        )
         
         # Create and return the trend analysis
         return PublicationTrend(
@@ -65,73 +113,112 @@ class TrendAnalyzer:
             source_distribution=source_distribution
         )
         
-    def _count_by_year(self, papers: List[Paper]) -> Dict[int, int]:
-        """Count papers by publication year."""
-        year_counts = defaultdict(int)
+    def _count_by_year(self, years: List[Optional[int]]) -> Dict[int, int]:
+        """Count papers by publication year, skipping papers without a date."""
+        year_counts = Counter(year for year in years if year is not None)
         
-        for paper in papers:
-            if paper.publication_date:
-                year = paper.publication_date.year
-                year_counts[year] += 1
-                
         # Convert to regular dict and sort by year
         return dict(sorted(year_counts.items()))
         
-    def _concatenate_titles_and_abstracts(self, papers: List[Paper]) -> str:
-        """Combine all titles and abstracts for text analysis."""
-        text = ""
+    def _analyze_terms(
+        self,
+        papers: List[Paper],
+        years: List[Optional[int]]
+    ) -> Tuple[Dict[str, int], List[str]]:
+        """
+        Compute term frequencies and emerging topics from titles and abstracts.
         
-        for paper in papers:
-            if paper.title:
-                text += paper.title + " "
-            if paper.abstract:
-                text += paper.abstract + " "
-                
-        return text
+        Args:
+            papers: Papers to analyze
+            years: Publication year of each paper, aligned with papers
+            
+        Returns:
+            Tuple of (term_frequencies, emerging_topics)
+        """
+        if len(papers) < MIN_PAPERS_FOR_TERMS:
+            return {}, []
+            
+        # Bound the cost on huge corpora; counts for years, authors and sources stay exact
+        if len(papers) > MAX_PAPERS_FOR_TERMS:
+            indices = sorted(random.Random(0).sample(range(len(papers)), MAX_PAPERS_FOR_TERMS))
+            papers = [papers[i] for i in indices]
+            years = [years[i] for i in indices]
+            
+        # Tokenize each paper once; both passes share the counts
+        per_paper_counts = self._count_paper_ngrams(papers)
+        return (
+            self._corpus_ngrams(per_paper_counts),
+            self._identify_emerging_topics(years, per_paper_counts)
+        )
+        
+    def _count_paper_ngrams(self, papers: List[Paper]) -> List[Tuple[Counter, ...]]:
+        """Count n-grams in the title and abstract of each paper separately."""
+        paper_words = _paper_words
+        return [_ngram_counters(paper_words(paper.title or "", paper.abstract or "")) for paper in papers]
+        
+    def _merge_counts(
+        self,
+        per_paper_counts: List[Tuple[Counter, ...]],
+        max_ngram: int = 3
+    ) -> List[Counter]:
+        """Sum per-paper n-gram counts, keeping one total per length up to max_ngram."""
+        totals = []
+        for counters in islice(zip(*per_paper_counts), max_ngram):
+            total = Counter()
+            update = total.update
+            for counts in counters:
+                update(counts)
+            totals.append(total)
+        return totals
+        
+    def _corpus_ngrams(self, per_paper_counts: List[Tuple[Counter, ...]]) -> Dict[str, int]:
+        """Merge per-paper n-gram counts and return the corpus-wide top n-grams."""
+        return self._top_ngrams(self._merge_counts(per_paper_counts))
+        
+    def _top_ngrams(self, counts_by_length: List[Counter], min_count: int = 2) -> Dict[str, int]:
+        """
+        Return the 50 most frequent n-grams seen at least min_count times.
+        
+        Lengths are scanned shortest first. Once 50 candidates are held, longer
+        n-grams must beat the current 50th count to be considered, so most of the
+        long tail never reaches the heap.
+        """
+        top: List[Tuple[Tuple[str, ...], int]] = []
+        for counts in counts_by_length:
+            # Ties keep the earlier, shorter n-gram, so a match is not enough
+            floor = top[-1][1] + 1 if len(top) == 50 else min_count
+            top = heapq.nlargest(
+                50,
+                chain(top, (item for item in counts.items() if item[1] >= floor)),
+                key=itemgetter(1)
+            )
+        
+        # Only the top n-grams are ever materialized as strings
+        return {" ".join(key): count for key, count in top}
         
     def _extract_ngrams(self, text: str, max_ngram: int = 3, min_count: int = 2) -> Dict[str, int]:
         """Extract and count n-grams from text."""
-        # Clean and normalize text
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', ' ', text)  # Replace punctuation with spaces
-        text = re.sub(r'\s+', ' ', text).strip()  # Normalize whitespace
-        words = text.split()
-        
-        # Count n-grams
-        ngram_counts = defaultdict(int)
-        
-        # Extract 1 to max_ngram-grams
-        for n in range(1, max_ngram + 1):
-            for i in range(len(words) - n + 1):
-                ngram = " ".join(words[i:i+n])
-                ngram_counts[ngram] += 1
-                
-        # Filter by minimum count and sort by frequency
-        filtered_counts = {k: v for k, v in ngram_counts.items() if v >= min_count}
-        return dict(sorted(filtered_counts.items(), key=lambda x: x[1], reverse=True)[:50])
+        return self._top_ngrams(_ngram_counters(_tokenize(text), max_ngram), min_count)
         
     def _find_frequent_authors(self, papers: List[Paper], top_n: int = 20) -> List[Tuple[str, int]]:
         """Find the most frequent authors."""
-        author_counts = defaultdict(int)
-        
-        for paper in papers:
-            for author in paper.authors:
-                author_counts[author.name] += 1
-                
-        # Sort by frequency and return top N
-        return sorted(author_counts.items(), key=lambda x: x[1], reverse=True)[:top_n]
+        # map/attrgetter/chain keep the flattening and counting loop in C
+        author_counts = Counter(map(
+            attrgetter('name'),
+            chain.from_iterable(map(attrgetter('authors'), papers))
+        ))
+        return author_counts.most_common(top_n)
         
     def _count_by_source(self, papers: List[Paper]) -> Dict[str, int]:
-        """Count papers by source."""
-        source_counts = defaultdict(int)
+        """Count papers by source, most frequent first."""
+        return dict(Counter(paper.source for paper in papers).most_common())
         
-        for paper in papers:
-            source_counts[paper.source] += 1
-            
-        # Sort by frequency
-        return dict(sorted(source_counts.items(), key=lambda x: x[1], reverse=True))
-        
-    def _identify_emerging_topics(self, papers: List[Paper], recent_years: int = 2) -> List[str]:
+    def _identify_emerging_topics(
+        self,
+        years: List[Optional[int]],
+        per_paper_counts: List[Tuple[Counter, ...]],
+        recent_years: int = 2
+    ) -> List[str]:
         """
         Identify emerging topics by looking at term frequency growth in recent years.
         
@@ -139,45 +226,44 @@ class TrendAnalyzer:
         1. Calculate term frequencies by year
         2. Measure growth rates
         3. Apply statistical tests to identify significant growth
+        
+        Args:
+            years: Publication year of each paper, or None if unknown
+            per_paper_counts: N-gram counts for each paper, aligned with years
+            recent_years: How many years back count as recent
+            
+        Returns:
+            Up to 10 emerging terms, fastest-growing first
         """
-        # Filter to recent and older papers
-        current_year = datetime.now().year
-        recent_papers = []
-        older_papers = []
-        
-        for paper in papers:
-            if paper.publication_date:
-                if paper.publication_date.year >= current_year - recent_years:
-                    recent_papers.append(paper)
-                else:
-                    older_papers.append(paper)
-        
-        if not recent_papers or not older_papers:
+        # Partition the precomputed counts in a single pass over the years
+        cutoff = datetime.now().year - recent_years
+        recent = []
+        older = []
+        
+        for year, counts in zip(years, per_paper_counts):
+            if year is not None:
+                (recent if year >= cutoff else older).append(counts)
+        
+        if not recent or not older:
             return []  # Need both recent and older papers for comparison
             
-        # Get terms from recent and older papers
-        recent_text = self._concatenate_titles_and_abstracts(recent_papers)
-        older_text = self._concatenate_titles_and_abstracts(older_papers)
-        
-        recent_terms = self._extract_ngrams(recent_text, max_ngram=2)
-        older_terms = self._extract_ngrams(older_text, max_ngram=2)
+        recent_papers = len(recent)
+        older_papers = len(older)
         
-        # Find terms that are more frequent in recent papers
-        emerging_topics = []
+        # Only unigrams and bigrams are considered, so trigram counts are never merged
+        recent_terms = self._top_ngrams(self._merge_counts(recent, max_ngram=2))
+        older_terms = self._top_ngrams(self._merge_counts(older, max_ngram=2))
         
-        for term, count in recent_terms.items():
-            older_count = older_terms.get(term, 0)
+        def growth(item: Tuple[str, int]) -> float:
+            """Ratio of a term's per-paper frequency in recent versus older papers."""
+            term, count = item
+            older_freq = older_terms.get(term, 0) / older_papers
+            return (count / recent_papers) / max(older_freq, 1e-9)
             
-            # Skip common stop words and single letters
-            if len(term) <= 1 or term in ["the", "and", "of", "in", "to", "a", "is", "that", "for", "on", "with"]:
-                continue
-                
-            # Calculate normalized frequency (by paper count)
-            recent_freq = count / len(recent_papers) if recent_papers else 0
-            older_freq = older_count / len(older_papers) if older_papers else 0
-            
-            # Check if term is significantly more frequent in recent papers
-            if recent_freq > older_freq * 1.5:  # 50% growth in frequency
-                emerging_topics.append(term)
-                
-        return emerging_topics[:10]  # Return top 10 emerging topics 
\ No newline at end of file
+        # Keep the 10 fastest-growing terms, skipping stop words and single letters
+        candidates = (
+            item for item in recent_terms.items()
+            if len(item[0]) > 1 and item[0] not in _STOPWORDS
+            and growth(item) > 1.5  # 50% growth in frequency
+        )
+        return [term for term, _ in heapq.nlargest(10, candidates, key=growth)]
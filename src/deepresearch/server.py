@@ -1,18 +1,41 @@
 import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any, Union
-import base64
+import os
+from typing import Dict, List, Optional, Any, Union, AsyncIterator, Awaitable, Literal, Callable
+from pathlib import Path
+from datetime import datetime
+import binascii
 import io
+import time
+from collections import OrderedDict
+from operator import attrgetter
+from urllib.parse import quote, unquote
+
+import aiohttp
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
 
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
-from pydantic import AnyUrl
+from pydantic import AnyUrl, BaseModel, Field
 import mcp.server.stdio
 
 from .orchestration import DeepResearchOrchestrator
+from .connectors import (
+    ArXivConnector,
+    PubMedConnector,
+    SemanticScholarConnector,
+    GoogleScholarConnector
+)
+from .connectors.base import BaseConnector
 from .models import SearchQuery, Paper, PaperSummary
+from .utils.filenames import sanitize_filename
+from .utils.event_loop import run_event_loop
 
 logger = logging.getLogger(__name__)
 
@@ -22,729 +45,874 @@ server = Server("deepresearch")
 
 orchestrator = DeepResearchOrchestrator()
 
+# Standalone connector constructors keyed by source name, shared by the tools
+# that build a connector on the orchestrator's session
+_CONNECTOR_FACTORIES: dict[str, Callable[[aiohttp.ClientSession], BaseConnector]] = {
+    "arxiv": ArXivConnector,
+    "pubmed": PubMedConnector,
+    "semanticscholar": lambda session: SemanticScholarConnector(
+        session, api_key=os.environ.get("SEMANTICSCHOLAR_API_KEY")
+    ),
+    "googlescholar": GoogleScholarConnector,
+}
+
 # Helper function to get the orchestrator
 def get_orchestrator():
     """Get the global orchestrator instance."""
     return orchestrator
 
-# Configure the server with the available tools
-@server.list_tools()
-async def handle_list_tools() -> list[types.Tool]:
-    """List the deep research tools available in this MCP server."""
-    return [
-        types.Tool(
-            name="search_papers",
-            description="Search multiple scholarly sources for papers matching a query.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Search query text"},
-                    "sources": {"type": "array", "items": {"type": "string", "enum": ["arxiv", "pubmed", "semanticscholar", "googlescholar"]}, "description": "Sources to search (default: all)"},
-                    "max_results": {"type": "integer", "description": "Maximum number of results to return (default: 20)"},
-                    "sort_by": {"type": "string", "enum": ["relevance", "date", "citations"], "description": "Sorting criteria (default: relevance)"}
-                },
-                "required": ["query"]
+# Recently downloaded PDFs keyed by paper ID, least recently used first
+_fulltext_cache: "OrderedDict[str, bytes]" = OrderedDict()
+FULLTEXT_CACHE_MAX_ITEMS = 128
+FULLTEXT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+FULLTEXT_CACHE_MAX_ITEM_BYTES = 25 * 1024 * 1024  # Larger PDFs are never cached
+_fulltext_cache_bytes = 0
+
+def _remember_fulltext(paper_id: str, pdf_content: bytes):
+    """Add a PDF to the fulltext cache, evicting the oldest entries to stay in budget."""
+    global _fulltext_cache_bytes
+    if len(pdf_content) > FULLTEXT_CACHE_MAX_ITEM_BYTES:
+        return
+    previous = _fulltext_cache.pop(paper_id, None)
+    if previous is not None:
+        _fulltext_cache_bytes -= len(previous)
+    _fulltext_cache[paper_id] = pdf_content
+    _fulltext_cache_bytes += len(pdf_content)
+    while (
+        len(_fulltext_cache) > FULLTEXT_CACHE_MAX_ITEMS or
+        _fulltext_cache_bytes > FULLTEXT_CACHE_MAX_BYTES
+    ):
+        _, evicted = _fulltext_cache.popitem(last=False)
+        _fulltext_cache_bytes -= len(evicted)
+
+async def _cached_fulltext(paper_id: str) -> bytes:
+    """
+    Download a paper's PDF through the orchestrator, reusing recent downloads.
+    
+    Args:
+        paper_id: Identifier for the paper
+        
+    Returns:
+        PDF content as bytes
+    """
+    pdf_content = _fulltext_cache.get(paper_id)
+    if pdf_content is not None:
+        _fulltext_cache.move_to_end(paper_id)
+        return pdf_content
+    pdf_content = await orchestrator.download_fulltext(paper_id)
+    _remember_fulltext(paper_id, pdf_content)
+    return pdf_content
+
+# Paper metadata keyed by paper ID as (fetched_at, paper), least recently used first
+_metadata_cache: "OrderedDict[str, tuple[float, Paper]]" = OrderedDict()
+METADATA_CACHE_MAX_ITEMS = 1024
+METADATA_CACHE_TTL = 3600  # seconds
+
+async def _cached_metadata(
+    paper_id: str,
+    fetch: Optional[Callable[[str], Awaitable[Paper]]] = None
+) -> Paper:
+    """
+    Get a paper's metadata, reusing results fetched within the last hour.
+    
+    Metadata doesn't change over a session, so tools that touch the same
+    papers share one lookup per ID. Failed lookups are not cached.
+    
+    Args:
+        paper_id: Identifier for the paper
+        fetch: Lookup to use on a miss; defaults to the orchestrator's
+        
+    Returns:
+        Paper object with metadata
+    """
+    entry = _metadata_cache.get(paper_id)
+    if entry is not None:
+        fetched_at, paper = entry
+        if time.monotonic() - fetched_at < METADATA_CACHE_TTL:
+            _metadata_cache.move_to_end(paper_id)
+            return paper
+        del _metadata_cache[paper_id]
+    paper = await (fetch or orchestrator.fetch_paper_metadata)(paper_id)
+    _metadata_cache[paper_id] = (time.monotonic(), paper)
+    if len(_metadata_cache) > METADATA_CACHE_MAX_ITEMS:
+        _metadata_cache.popitem(last=False)
+    return paper
+
+async def _stream_to_file(chunks: AsyncIterator[bytes], filepath: Path):
+    """
+    Write streamed chunks to a file without holding the whole download in memory.
+    
+    Writes run in a worker thread so the event loop keeps serving other tools.
+    A partially written file is removed if the stream fails.
+    
+    Args:
+        chunks: Async iterator of byte chunks
+        filepath: Destination path
+    """
+    f = await asyncio.to_thread(open, filepath, "wb")
+    try:
+        async for chunk in chunks:
+            await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(f.close)
+        filepath.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(f.close)
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values the stdlib encoder doesn't handle natively."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dump(obj: Any) -> str:
+    """
+    Serialize a tool response as indented JSON.
+    
+    Uses orjson's C encoder when installed. Datetimes are written in ISO 8601
+    by both encoders, so payloads can carry them as-is.
+    
+    Args:
+        obj: JSON-compatible payload, possibly containing datetimes
+        
+    Returns:
+        JSON text indented by two spaces
+    """
+    if orjson is not None:
+        # Year counts and similar maps have int keys, which orjson rejects by default
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, indent=2, default=_json_default)
+
+def _decode_pdf(document: str) -> bytes:
+    """
+    Decode a base64-encoded PDF passed as a tool argument.
+    
+    Args:
+        document: Base64 text
+        
+    Returns:
+        Decoded PDF bytes
+    """
+    try:
+        # base64.b64decode is a thin wrapper around this
+        return binascii.a2b_base64(document)
+    except ValueError as e:  # binascii.Error, or non-ASCII input
+        raise ValueError(f"Invalid base64-encoded PDF: {str(e)}")
+
+# Fields read from each citation graph node and link, fetched in one C call per item
+_node_fields = attrgetter("paper_id", "title", "authors", "journal", "publication_date", "source")
+_link_fields = attrgetter("source_id", "target_id")
+
+def _paper_to_dict(paper: Paper) -> Dict[str, Any]:
+    """Convert a paper to the JSON-serializable form used in search results."""
+    return {
+        "paper_id": paper.paper_id,
+        "title": paper.title,
+        "authors": [{"name": a.name} for a in paper.authors],
+        "abstract": paper.abstract,
+        "url": paper.url,
+        "publication_date": paper.publication_date,
+        "journal": paper.journal,
+        "source": paper.source,
+        "citations_count": paper.citations_count
+    }
+
+Source = Literal["arxiv", "pubmed", "semanticscholar", "googlescholar"]
+ContentType = Literal["text", "pdf"]
+
+# Tool argument models; each validates and fills defaults in one pydantic-core pass
+class SearchPapersArgs(BaseModel):
+    query: str
+    sources: List[Source] = Field(default_factory=lambda: ["arxiv", "pubmed", "semanticscholar"])
+    max_results: int = 20
+    sort_by: Literal["relevance", "date", "citations"] = "relevance"
+    
+class PaperIdArgs(BaseModel):
+    paper_id: str = Field(min_length=1)
+    
+class DocumentArgs(BaseModel):
+    document: str = Field(min_length=1)
+    content_type: ContentType = "text"
+    paper_id: Optional[str] = None
+    
+class CitationGraphArgs(BaseModel):
+    paper_ids: List[str] = Field(min_length=1)
+    depth: int = 1
+    max_citations: int = 20
+    direction: Literal["both", "citing", "cited"] = "both"
+    
+class StoreToDriveArgs(BaseModel):
+    document: str = Field(min_length=1)
+    folder_id: Optional[str] = None
+    paper_id: Optional[str] = None
+    
+class SearchApisArgs(BaseModel):
+    query: str = Field(min_length=1)
+    sources: List[Source] = Field(default_factory=lambda: ["arxiv", "pubmed", "semanticscholar", "googlescholar"])
+    max_results: int = 5
+    
+class TestApiConnectorArgs(BaseModel):
+    # Unknown connectors are reported in the diagnostics rather than rejected
+    connector: str = Field(min_length=1)
+    query: str = "machine learning"
+    max_results: int = 3
+    
+class DownloadPaperArgs(BaseModel):
+    paper_id: str = Field(min_length=1)
+    save_directory: str = "downloads"
+    
+class SummarizeSectionArgs(DocumentArgs):
+    section_name: str = Field(min_length=1)
+    
+class ComparePapersArgs(BaseModel):
+    paper_ids: List[str] = Field(min_length=2)
+    abstracts_only: bool = False
+    
+class AnalyzeTrendsArgs(BaseModel):
+    query: str = Field(min_length=1)
+    max_papers: int = 100
+
+_TOOL_ARG_MODELS: dict[str, type[BaseModel]] = {
+    "search_papers": SearchPapersArgs,
+    "fetch_paper_metadata": PaperIdArgs,
+    "download_fulltext": PaperIdArgs,
+    "summarize_document": DocumentArgs,
+    "annotate_highlights": DocumentArgs,
+    "get_citation_graph": CitationGraphArgs,
+    "store_to_drive": StoreToDriveArgs,
+    "search_apis": SearchApisArgs,
+    "test_api_connector": TestApiConnectorArgs,
+    "download_paper": DownloadPaperArgs,
+    "extract_relations": PaperIdArgs,
+    "summarize_section": SummarizeSectionArgs,
+    "compare_papers": ComparePapersArgs,
+    "analyze_trends": AnalyzeTrendsArgs,
+}
+
+# Tool definitions are static, so they are built once at import
+_TOOLS: list[types.Tool] = [
+    types.Tool(
+        name="search_papers",
+        description="Search multiple scholarly sources for papers matching a query.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search query text"},
+                "sources": {"type": "array", "items": {"type": "string", "enum": ["arxiv", "pubmed", "semanticscholar", "googlescholar"]}, "description": "Sources to search (default: all)"},
+                "max_results": {"type": "integer", "description": "Maximum number of results to return (default: 20)"},
+                "sort_by": {"type": "string", "enum": ["relevance", "date", "citations"], "description": "Sorting criteria (default: relevance)"}
             },
-        ),
-        types.Tool(
-            name="fetch_paper_metadata",
-            description="Fetch detailed metadata (title, authors, abstract) for a given paper ID.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "paper_id": {"type": "string", "description": "Paper identifier (e.g., 'arxiv:2104.08935', 'pubmed:12345678')"}
-                },
-                "required": ["paper_id"]
+            "required": ["query"]
+        },
+    ),
+    types.Tool(
+        name="fetch_paper_metadata",
+        description="Fetch detailed metadata (title, authors, abstract) for a given paper ID.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "paper_id": {"type": "string", "description": "Paper identifier (e.g., 'arxiv:2104.08935', 'pubmed:12345678')"}
             },
-        ),
-        types.Tool(
-            name="download_fulltext",
-            description="Retrieve or download the PDF/HTML full text for a given paper ID.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "paper_id": {"type": "string", "description": "Paper identifier (e.g., 'arxiv:2104.08935', 'pubmed:12345678')"}
-                },
-                "required": ["paper_id"]
+            "required": ["paper_id"]
+        },
+    ),
+    types.Tool(
+        name="download_fulltext",
+        description="Retrieve or download the PDF/HTML full text for a given paper ID.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "paper_id": {"type": "string", "description": "Paper identifier (e.g., 'arxiv:2104.08935', 'pubmed:12345678')"}
             },
-        ),
-        types.Tool(
-            name="summarize_document",
-            description="Generate a structured summary (background, methods, results, conclusions).",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "document": {"type": "string", "description": "Document text or base64-encoded PDF content"},
-                    "content_type": {"type": "string", "enum": ["text", "pdf"], "description": "Type of content provided (default: text)"},
-                    "paper_id": {"type": "string", "description": "Optional paper ID for additional context"}
-                },
-                "required": ["document"]
+            "required": ["paper_id"]
+        },
+    ),
+    types.Tool(
+        name="summarize_document",
+        description="Generate a structured summary (background, methods, results, conclusions).",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document": {"type": "string", "description": "Document text or base64-encoded PDF content"},
+                "content_type": {"type": "string", "enum": ["text", "pdf"], "description": "Type of content provided (default: text)"},
+                "paper_id": {"type": "string", "description": "Optional paper ID for additional context"}
             },
-        ),
-        types.Tool(
-            name="annotate_highlights",
-            description="Highlight key sentences and extract keywords from a document.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "document": {"type": "string", "description": "Document text or base64-encoded PDF content"},
-                    "content_type": {"type": "string", "enum": ["text", "pdf"], "description": "Type of content provided (default: text)"},
-                    "paper_id": {"type": "string", "description": "Optional paper ID for additional context"}
-                },
-                "required": ["document"]
+            "required": ["document"]
+        },
+    ),
+    types.Tool(
+        name="annotate_highlights",
+        description="Highlight key sentences and extract keywords from a document.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document": {"type": "string", "description": "Document text or base64-encoded PDF content"},
+                "content_type": {"type": "string", "enum": ["text", "pdf"], "description": "Type of content provided (default: text)"},
+                "paper_id": {"type": "string", "description": "Optional paper ID for additional context"}
             },
-        ),
-        types.Tool(
-            name="get_citation_graph",
-            description="Return citation relationships for a given paper or set of papers.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "paper_ids": {"type": "array", "items": {"type": "string"}, "description": "List of paper identifiers"},
-                    "depth": {"type": "integer", "description": "Depth of citation graph (1 = direct citations only, default: 1)"},
-                    "max_citations": {"type": "integer", "description": "Maximum number of citations to return (default: 20)"},
-                    "direction": {"type": "string", "enum": ["both", "citing", "cited"], "description": "Direction of citation relationships (default: both)"}
-                },
-                "required": ["paper_ids"]
+            "required": ["document"]
+        },
+    ),
+    types.Tool(
+        name="get_citation_graph",
+        description="Return citation relationships for a given paper or set of papers.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "paper_ids": {"type": "array", "items": {"type": "string"}, "description": "List of paper identifiers"},
+                "depth": {"type": "integer", "description": "Depth of citation graph (1 = direct citations only, default: 1)"},
+                "max_citations": {"type": "integer", "description": "Maximum number of citations to return (default: 20)"},
+                "direction": {"type": "string", "enum": ["both", "citing", "cited"], "description": "Direction of citation relationships (default: both)"}
             },
-        ),
-        types.Tool(
-            name="store_to_drive",
-            description="Save fetched PDFs and summaries to the user's Google Drive folder.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "document": {"type": "string", "description": "Base64-encoded PDF content"},
-                    "folder_id": {"type": "string", "description": "Optional Google Drive folder ID to store in"},
-                    "paper_id": {"type": "string", "description": "Optional paper ID for better organization and naming"}
-                },
-                "required": ["document"]
+            "required": ["paper_ids"]
+        },
+    ),
+    types.Tool(
+        name="store_to_drive",
+        description="Save fetched PDFs and summaries to the user's Google Drive folder.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document": {"type": "string", "description": "Base64-encoded PDF content"},
+                "folder_id": {"type": "string", "description": "Optional Google Drive folder ID to store in"},
+                "paper_id": {"type": "string", "description": "Optional paper ID for better organization and naming"}
             },
-        ),
-        types.Tool(
-            name="search_apis",
-            description="Search across multiple scholarly API sources with a single query.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "The search query text"},
-                    "sources": {"type": "array", "items": {"type": "string", "enum": ["arxiv", "pubmed", "semanticscholar", "googlescholar"]}, "description": "List of sources to search (options: 'arxiv', 'pubmed', 'semanticscholar', 'googlescholar')"},
-                    "max_results": {"type": "integer", "description": "Maximum number of results to return per source"}
-                },
-                "required": ["query"]
+            "required": ["document"]
+        },
+    ),
+    types.Tool(
+        name="search_apis",
+        description="Search across multiple scholarly API sources with a single query.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "The search query text"},
+                "sources": {"type": "array", "items": {"type": "string", "enum": ["arxiv", "pubmed", "semanticscholar", "googlescholar"]}, "description": "List of sources to search (options: 'arxiv', 'pubmed', 'semanticscholar', 'googlescholar')"},
+                "max_results": {"type": "integer", "description": "Maximum number of results to return per source"}
             },
-        ),
-        types.Tool(
-            name="test_api_connector",
-            description="Test a specific API connector and return diagnostics.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "connector": {"type": "string", "enum": ["arxiv", "pubmed", "semanticscholar", "googlescholar", "drive"], "description": "The connector to test"},
-                    "query": {"type": "string", "description": "Search query to use for testing"},
-                    "max_results": {"type": "integer", "description": "Maximum number of results to return"}
-                },
-                "required": ["connector"]
+            "required": ["query"]
+        },
+    ),
+    types.Tool(
+        name="test_api_connector",
+        description="Test a specific API connector and return diagnostics.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "connector": {"type": "string", "enum": ["arxiv", "pubmed", "semanticscholar", "googlescholar", "drive"], "description": "The connector to test"},
+                "query": {"type": "string", "description": "Search query to use for testing"},
+                "max_results": {"type": "integer", "description": "Maximum number of results to return"}
             },
-        ),
-        types.Tool(
-            name="download_paper",
-            description="Download a paper by its ID from the appropriate source.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "paper_id": {"type": "string", "description": "The ID of the paper (e.g., 'arxiv:2312.12345', 'pubmed:12345678', etc.)"},
-                    "save_directory": {"type": "string", "description": "Directory to save the PDF"}
-                },
-                "required": ["paper_id"]
+            "required": ["connector"]
+        },
+    ),
+    types.Tool(
+        name="download_paper",
+        description="Download a paper by its ID from the appropriate source.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "paper_id": {"type": "string", "description": "The ID of the paper (e.g., 'arxiv:2312.12345', 'pubmed:12345678', etc.)"},
+                "save_directory": {"type": "string", "description": "Directory to save the PDF"}
             },
-        ),
-        types.Tool(
-            name="extract_relations",
-            description="Extract relationships between concepts in a scholarly paper (e.g., 'X causes Y' or 'Algorithm A outperforms B').",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "paper_id": {"type": "string", "description": "Paper identifier"}
-                },
-                "required": ["paper_id"]
+            "required": ["paper_id"]
+        },
+    ),
+    types.Tool(
+        name="extract_relations",
+        description="Extract relationships between concepts in a scholarly paper (e.g., 'X causes Y' or 'Algorithm A outperforms B').",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "paper_id": {"type": "string", "description": "Paper identifier"}
             },
-        ),
-        types.Tool(
-            name="summarize_section",
-            description="Generate a focused summary of a specific section in a scholarly paper.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "document": {"type": "string", "description": "Document content (text or base64-encoded PDF)"},
-                    "content_type": {"type": "string", "enum": ["text", "pdf"], "description": "Type of content provided (default: text)"},
-                    "section_name": {"type": "string", "description": "Name of the section to summarize (e.g., Introduction, Methods, Results, Discussion)"},
-                    "paper_id": {"type": "string", "description": "Optional paper identifier for additional context"}
-                },
-                "required": ["document", "section_name"]
+            "required": ["paper_id"]
+        },
+    ),
+    types.Tool(
+        name="summarize_section",
+        description="Generate a focused summary of a specific section in a scholarly paper.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "document": {"type": "string", "description": "Document content (text or base64-encoded PDF)"},
+                "content_type": {"type": "string", "enum": ["text", "pdf"], "description": "Type of content provided (default: text)"},
+                "section_name": {"type": "string", "description": "Name of the section to summarize (e.g., Introduction, Methods, Results, Discussion)"},
+                "paper_id": {"type": "string", "description": "Optional paper identifier for additional context"}
             },
-        ),
-        types.Tool(
-            name="compare_papers",
-            description="Compare multiple scholarly papers to highlight similarities and differences in methods, results, and limitations.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "paper_ids": {"type": "array", "items": {"type": "string"}, "description": "List of paper identifiers to compare"},
-                    "abstracts_only": {"type": "boolean", "description": "Whether to use only abstracts (faster) or full text (more detailed) (default: false)"}
-                },
-                "required": ["paper_ids"]
+            "required": ["document", "section_name"]
+        },
+    ),
+    types.Tool(
+        name="compare_papers",
+        description="Compare multiple scholarly papers to highlight similarities and differences in methods, results, and limitations.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "paper_ids": {"type": "array", "items": {"type": "string"}, "description": "List of paper identifiers to compare"},
+                "abstracts_only": {"type": "boolean", "description": "Whether to use only abstracts (faster) or full text (more detailed) (default: false)"}
             },
-        ),
-        types.Tool(
-            name="analyze_trends",
-            description="Analyze publication trends over time, identify emerging topics, and plot term frequencies for a research area.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {"type": "string", "description": "Search query to find papers for trend analysis"},
-                    "max_papers": {"type": "integer", "description": "Maximum number of papers to analyze (default: 100)"}
-                },
-                "required": ["query"]
+            "required": ["paper_ids"]
+        },
+    ),
+    types.Tool(
+        name="analyze_trends",
+        description="Analyze publication trends over time, identify emerging topics, and plot term frequencies for a research area.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Search query to find papers for trend analysis"},
+                "max_papers": {"type": "integer", "description": "Maximum number of papers to analyze (default: 100)"}
             },
-        ),
+            "required": ["query"]
+        },
+    ),
+]
+
+# Configure the server with the available tools
+@server.list_tools()
+async def handle_list_tools() -> list[types.Tool]:
+    """List the deep research tools available in this MCP server."""
+    return _TOOLS
+
+# Return type shared by every tool handler
+_ToolResult = list[types.TextContent | types.ImageContent | types.EmbeddedResource | types.ResourceLink]
+
+async def _handle_search_papers(args: SearchPapersArgs) -> _ToolResult:
+    """Search multiple scholarly sources for papers matching a query."""
+    search_query = SearchQuery(
+        query=args.query,
+        sources=args.sources,
+        max_results=args.max_results,
+        sort_by=args.sort_by
+    )
+    
+    result = await orchestrator.search_papers(search_query)
+    
+    payload = {
+        "query": result.query,
+        "papers": [_paper_to_dict(paper) for paper in result.papers],
+        "total_found": result.total_found
+    }
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump(payload)
+        )
     ]
 
-@server.call_tool()
-async def handle_call_tool(
-    name: str, arguments: dict | None
-) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-    """Handle tool execution requests."""
-    if not arguments:
-        arguments = {}
+async def _handle_fetch_paper_metadata(args: PaperIdArgs) -> _ToolResult:
+    """Fetch detailed metadata (title, authors, abstract) for a given paper ID."""
+    paper_id = args.paper_id
+    
+    paper = await _cached_metadata(paper_id)
+    
+    # Convert to JSON-serializable format
+    paper_json = {
+        "paper_id": paper.paper_id,
+        "title": paper.title,
+        "authors": [{"name": a.name, "affiliation": a.affiliation} for a in paper.authors],
+        "abstract": paper.abstract,
+        "url": paper.url,
+        "pdf_url": paper.pdf_url,
+        "publication_date": paper.publication_date,
+        "journal": paper.journal,
+        "doi": paper.doi,
+        "source": paper.source,
+        "citations_count": paper.citations_count
+    }
         
-    try:
-        # Handle each tool
-        if name == "search_papers":
-            query = arguments.get("query")
-            sources = arguments.get("sources", ["arxiv", "pubmed", "semanticscholar"])
-            max_results = arguments.get("max_results", 20)
-            sort_by = arguments.get("sort_by", "relevance")
-            
-            search_query = SearchQuery(
-                query=query,
-                sources=sources,
-                max_results=max_results,
-                sort_by=sort_by
-            )
-            
-            result = await orchestrator.search_papers(search_query)
-            
-            # Convert to JSON-serializable format
-            papers_json = []
-            for paper in result.papers:
-                papers_json.append({
-                    "paper_id": paper.paper_id,
-                    "title": paper.title,
-                    "authors": [{"name": a.name} for a in paper.authors],
-                    "abstract": paper.abstract,
-                    "url": paper.url,
-                    "publication_date": paper.publication_date.isoformat() if paper.publication_date else None,
-                    "journal": paper.journal,
-                    "source": paper.source,
-                    "citations_count": paper.citations_count
-                })
-                
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "query": result.query,
-                        "papers": papers_json,
-                        "total_found": result.total_found
-                    }, indent=2)
-                )
-            ]
-            
-        elif name == "fetch_paper_metadata":
-            paper_id = arguments.get("paper_id")
-            if not paper_id:
-                raise ValueError("paper_id is required")
-                
-            paper = await orchestrator.fetch_paper_metadata(paper_id)
-            
-            # Convert to JSON-serializable format
-            paper_json = {
-                "paper_id": paper.paper_id,
-                "title": paper.title,
-                "authors": [{"name": a.name, "affiliation": a.affiliation} for a in paper.authors],
-                "abstract": paper.abstract,
-                "url": paper.url,
-                "pdf_url": paper.pdf_url,
-                "publication_date": paper.publication_date.isoformat() if paper.publication_date else None,
-                "journal": paper.journal,
-                "doi": paper.doi,
-                "source": paper.source,
-                "citations_count": paper.citations_count
-            }
-                
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(paper_json, indent=2)
-                )
-            ]
-            
-        elif name == "download_fulltext":
-            paper_id = arguments.get("paper_id")
-            if not paper_id:
-                raise ValueError("paper_id is required")
-                
-            pdf_content = await orchestrator.download_fulltext(paper_id)
-            
-            # Return as embedded resource
-            return [
-                types.EmbeddedResource(
-                    uri=AnyUrl("paper://pdf/" + paper_id),
-                    name=f"PDF for {paper_id}",
-                    description=f"PDF full text of {paper_id}",
-                    data=base64.b64encode(pdf_content).decode('ascii'),
-                    mimeType="application/pdf"
-                )
-            ]
-            
-        elif name == "summarize_document":
-            document = arguments.get("document")
-            if not document:
-                raise ValueError("document is required")
-                
-            content_type = arguments.get("content_type", "text")
-            paper_id = arguments.get("paper_id")
-            
-            # Convert document to appropriate format
-            if content_type == "pdf":
-                try:
-                    document = base64.b64decode(document)
-                except Exception as e:
-                    raise ValueError(f"Invalid base64-encoded PDF: {str(e)}")
-                    
-            summary = await orchestrator.summarize_document(document, paper_id)
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "paper_id": summary.paper_id,
-                        "background": summary.background,
-                        "methods": summary.methods,
-                        "results": summary.results,
-                        "conclusions": summary.conclusions
-                    }, indent=2)
-                )
-            ]
-            
-        elif name == "annotate_highlights":
-            document = arguments.get("document")
-            if not document:
-                raise ValueError("document is required")
-                
-            content_type = arguments.get("content_type", "text")
-            paper_id = arguments.get("paper_id")
-            
-            # Convert document to appropriate format
-            if content_type == "pdf":
-                try:
-                    document = base64.b64decode(document)
-                except Exception as e:
-                    raise ValueError(f"Invalid base64-encoded PDF: {str(e)}")
-                    
-            annotation = await orchestrator.annotate_highlights(document, paper_id)
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "paper_id": annotation.paper_id,
-                        "highlights": annotation.highlights,
-                        "keywords": annotation.keywords
-                    }, indent=2)
-                )
-            ]
-            
-        elif name == "get_citation_graph":
-            paper_ids = arguments.get("paper_ids", [])
-            if not paper_ids:
-                raise ValueError("paper_ids is required and must not be empty")
-                
-            depth = arguments.get("depth", 1)
-            max_citations = arguments.get("max_citations", 20)
-            direction = arguments.get("direction", "both")
-            
-            # Validate direction
-            if direction not in ["both", "citing", "cited"]:
-                raise ValueError("direction must be one of: both, citing, cited")
-            
-            citation_graph = await orchestrator.get_citation_graph(
-                paper_ids, 
-                depth=depth,
-                max_citations=max_citations,
-                direction=direction
-            )
-            
-            # Convert to JSON-serializable format
-            nodes_json = []
-            for paper in citation_graph.nodes:
-                nodes_json.append({
-                    "id": paper.paper_id,
-                    "title": paper.title,
-                    "authors": [a.name for a in paper.authors],
-                    "journal": paper.journal,
-                    "year": paper.publication_date.year if paper.publication_date else None,
-                    "source": paper.source
-                })
-                
-            links_json = []
-            for link in citation_graph.links:
-                links_json.append({
-                    "source": link.source_id,
-                    "target": link.target_id
-                })
-                
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "nodes": nodes_json,
-                        "links": links_json
-                    }, indent=2)
-                )
-            ]
-            
-        elif name == "store_to_drive":
-            document = arguments.get("document")
-            if not document:
-                raise ValueError("document is required")
-                
-            folder_id = arguments.get("folder_id")
-            paper_id = arguments.get("paper_id")
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump(paper_json)
+        )
+    ]
+
+async def _handle_download_fulltext(args: PaperIdArgs) -> _ToolResult:
+    """Retrieve or download the PDF/HTML full text for a given paper ID."""
+    paper_id = args.paper_id
+    
+    # Fetch now so errors surface here; the bytes stay cached for the read
+    pdf_content = await _cached_fulltext(paper_id)
+    
+    # Return a link rather than inlining base64; clients that want the
+    # PDF read the resource, which is served from the cache
+    return [
+        types.ResourceLink(
+            type="resource_link",
+            # Percent-encoded so IDs with spaces, "/", "?" or "#" survive the round trip
+            uri=AnyUrl("paper://pdf/" + quote(paper_id, safe="")),
+            name=f"PDF for {paper_id}",
+            description=f"PDF full text of {paper_id}",
+            mimeType="application/pdf",
+            size=len(pdf_content)
+        )
+    ]
+
+async def _handle_summarize_document(args: DocumentArgs) -> _ToolResult:
+    """Generate a structured summary (background, methods, results, conclusions)."""
+    document = args.document
+    paper_id = args.paper_id
+    
+    # Convert document to appropriate format
+    if args.content_type == "pdf":
+        document = _decode_pdf(document)
             
-            # Decode the PDF
-            try:
-                pdf_content = base64.b64decode(document)
-            except Exception as e:
-                raise ValueError(f"Invalid base64-encoded PDF: {str(e)}")
-                
-            drive_link = await orchestrator.store_to_drive(pdf_content, folder_id, paper_id)
+    summary = await orchestrator.summarize_document(document, paper_id)
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump({
+                "paper_id": summary.paper_id,
+                "background": summary.background,
+                "methods": summary.methods,
+                "results": summary.results,
+                "conclusions": summary.conclusions
+            })
+        )
+    ]
+
+async def _handle_annotate_highlights(args: DocumentArgs) -> _ToolResult:
+    """Highlight key sentences and extract keywords from a document."""
+    document = args.document
+    paper_id = args.paper_id
+    
+    # Convert document to appropriate format
+    if args.content_type == "pdf":
+        document = _decode_pdf(document)
             
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "drive_link": drive_link
-                    }, indent=2)
-                )
-            ]
+    annotation = await orchestrator.annotate_highlights(document, paper_id)
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump({
+                "paper_id": annotation.paper_id,
+                "highlights": annotation.highlights,
+                "keywords": annotation.keywords
+            })
+        )
+    ]
+
+async def _handle_get_citation_graph(args: CitationGraphArgs) -> _ToolResult:
+    """Return citation relationships for a given paper or set of papers."""
+    citation_graph = await orchestrator.get_citation_graph_batched(
+        args.paper_ids, 
+        depth=args.depth,
+        max_citations=args.max_citations,
+        direction=args.direction
+    )
+    
+    # Convert to JSON-serializable format
+    author_name = attrgetter("name")
+    nodes_json = [
+        {
+            "id": paper_id,
+            "title": title,
+            "authors": list(map(author_name, authors)),
+            "journal": journal,
+            "year": date.year if date else None,
+            "source": source
+        }
+        for paper_id, title, authors, journal, date, source
+        in map(_node_fields, citation_graph.nodes)
+    ]
+    links_json = [
+        {"source": source_id, "target": target_id}
+        for source_id, target_id in map(_link_fields, citation_graph.links)
+    ]
         
-        elif name == "search_apis":
-            query = arguments.get("query")
-            if not query:
-                raise ValueError("query is required")
-                
-            sources = arguments.get("sources", ["arxiv", "pubmed", "semanticscholar", "googlescholar"])
-            max_results = arguments.get("max_results", 5)
-            
-            result = await orchestrator.search_across_sources(query, sources, max_results)
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2)
-                )
-            ]
-            
-        elif name == "test_api_connector":
-            connector = arguments.get("connector")
-            if not connector:
-                raise ValueError("connector is required")
-                
-            query = arguments.get("query", "machine learning")
-            max_results = arguments.get("max_results", 3)
-            
-            import asyncio
-            import sys
-            import os
-            from pathlib import Path
-            import aiohttp
-            
-            results = {
-                "connector": connector,
-                "status": "unknown",
-                "papers_found": 0,
-                "errors": [],
-                "messages": []
-            }
-            
-            async def run_test():
-                try:
-                    # Set up session
-                    async with aiohttp.ClientSession() as session:
-                        # Get the appropriate connector
-                        if connector == "arxiv":
-                            from deepresearch.connectors import ArXivConnector
-                            api = ArXivConnector(session)
-                        elif connector == "pubmed":
-                            from deepresearch.connectors import PubMedConnector
-                            api = PubMedConnector(session)
-                        elif connector == "semanticscholar":
-                            from deepresearch.connectors import SemanticScholarConnector
-                            api_key = os.environ.get("SEMANTICSCHOLAR_API_KEY")
-                            api = SemanticScholarConnector(session, api_key=api_key)
-                        elif connector == "googlescholar":
-                            from deepresearch.connectors import GoogleScholarConnector
-                            api = GoogleScholarConnector(session)
-                        elif connector == "drive":
-                            from deepresearch.connectors import GoogleDriveConnector
-                            results["status"] = "skipped"
-                            results["messages"].append("Drive connector requires OAuth setup - skipping automated test")
-                            return
-                        else:
-                            results["status"] = "error"
-                            results["errors"].append(f"Unknown connector: {connector}")
-                            return
-                        
-                        # Test search
-                        from deepresearch.models import SearchQuery
-                        search_results = await api.search(SearchQuery(query=query, max_results=max_results))
-                        
-                        results["papers_found"] = len(search_results)
-                        results["messages"].append(f"Found {len(search_results)} papers")
-                        
-                        # Get paper details for the first result if available
-                        if search_results:
-                            paper = search_results[0]
-                            results["messages"].append(f"First paper: {paper.title}")
-                            results["messages"].append(f"Authors: {', '.join(a.name for a in paper.authors)}")
-                            
-                            # Test metadata retrieval
-                            try:
-                                paper_id = paper.paper_id
-                                metadata = await api.get_paper_metadata(paper_id)
-                                results["messages"].append(f"Successfully retrieved metadata for {paper_id}")
-                            except Exception as e:
-                                results["errors"].append(f"Metadata retrieval error: {str(e)}")
-                        
-                        results["status"] = "success" if not results["errors"] else "partial_success"
-                                
-                except Exception as e:
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump({
+                "nodes": nodes_json,
+                "links": links_json
+            })
+        )
+    ]
+
+async def _handle_store_to_drive(args: StoreToDriveArgs) -> _ToolResult:
+    """Save fetched PDFs and summaries to the user's Google Drive folder."""
+    pdf_content = _decode_pdf(args.document)
+    drive_link = await orchestrator.store_to_drive(pdf_content, args.folder_id, args.paper_id)
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump({
+                "drive_link": drive_link
+            })
+        )
+    ]
+
+async def _handle_search_apis(args: SearchApisArgs) -> _ToolResult:
+    """Search across multiple scholarly API sources with a single query."""
+    result = await orchestrator.search_across_sources(args.query, args.sources, args.max_results)
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump(result)
+        )
+    ]
+
+async def _handle_test_api_connector(args: TestApiConnectorArgs) -> _ToolResult:
+    """Test a specific API connector and return diagnostics."""
+    connector = args.connector
+    query = args.query
+    max_results = args.max_results
+    
+    results = {
+        "connector": connector,
+        "status": "unknown",
+        "papers_found": 0,
+        "errors": [],
+        "messages": []
+    }
+    
+    async def run_test():
+        try:
+            # Get the appropriate connector
+            factory = _CONNECTOR_FACTORIES.get(connector)
+            if factory is None:
+                if connector == "drive":
+                    results["status"] = "skipped"
+                    results["messages"].append("Drive connector requires OAuth setup - skipping automated test")
+                else:
                     results["status"] = "error"
-                    results["errors"].append(f"Test failed: {str(e)}")
+                    results["errors"].append(f"Unknown connector: {connector}")
+                return
+            # Reuse the orchestrator's pooled session, opened only for a real connector
+            api = factory(await orchestrator.get_session())
             
-            await run_test()
+            # Test search
+            search_results = await api.search(SearchQuery(query=query, max_results=max_results))
             
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(results, indent=2)
-                )
-            ]
+            results["papers_found"] = len(search_results)
+            results["messages"].append(f"Found {len(search_results)} papers")
             
-        elif name == "download_paper":
-            paper_id = arguments.get("paper_id")
-            if not paper_id:
-                raise ValueError("paper_id is required")
+            # Get paper details for the first result if available
+            if search_results:
+                paper = search_results[0]
+                results["messages"].append(f"First paper: {paper.title}")
+                results["messages"].append(f"Authors: {', '.join(a.name for a in paper.authors)}")
                 
-            save_directory = arguments.get("save_directory", "downloads")
-            
-            import asyncio
-            import aiohttp
-            from pathlib import Path
-            
-            result = {
-                "paper_id": paper_id,
-                "status": "unknown",
-                "filename": None,
-                "error": None
-            }
-            
-            save_dir = Path(save_directory)
-            save_dir.mkdir(exist_ok=True)
-            
-            async def perform_download():
+                # Test metadata retrieval
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        # Determine source type from paper_id
-                        source_type = paper_id.split(":", 1)[0] if ":" in paper_id else None
-                        
-                        if source_type == "arxiv":
-                            from deepresearch.connectors import ArXivConnector
-                            connector = ArXivConnector(session)
-                        elif source_type == "pubmed":
-                            from deepresearch.connectors import PubMedConnector
-                            connector = PubMedConnector(session)
-                        elif source_type == "semanticscholar":
-                            from deepresearch.connectors import SemanticScholarConnector
-                            api_key = os.environ.get("SEMANTICSCHOLAR_API_KEY")
-                            connector = SemanticScholarConnector(session, api_key=api_key)
-                        elif source_type == "googlescholar":
-                            from deepresearch.connectors import GoogleScholarConnector
-                            connector = GoogleScholarConnector(session)
-                        else:
-                            result["status"] = "error"
-                            result["error"] = f"Unknown source type for ID: {paper_id}"
-                            return
-                        
-                        # Get metadata first for filename
-                        paper = await connector.get_paper_metadata(paper_id)
-                        
-                        # Download fulltext
-                        pdf_data = await connector.download_fulltext(paper_id)
-                        
-                        # Create clean filename
-                        clean_id = paper_id.replace(":", "_").replace("/", "_")
-                        clean_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
-                        filename = f"{clean_id}_{clean_title[:50]}.pdf"
-                        filepath = save_dir / filename
-                        
-                        # Save file
-                        with open(filepath, "wb") as f:
-                            f.write(pdf_data)
-                        
-                        result["status"] = "success"
-                        result["filename"] = str(filepath)
-                        
+                    paper_id = paper.paper_id
+                    metadata = await api.get_paper_metadata(paper_id)
+                    results["messages"].append(f"Successfully retrieved metadata for {paper_id}")
                 except Exception as e:
-                    result["status"] = "error"
-                    result["error"] = str(e)
-            
-            await perform_download()
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(result, indent=2)
-                )
-            ]
-        
-        elif name == "extract_relations":
-            paper_id = arguments.get("paper_id")
-            if not paper_id:
-                raise ValueError("paper_id is required")
-                
-            relations = await orchestrator.extract_relations(paper_id)
-            
-            # Convert to JSON-serializable format
-            relations_json = []
-            for relation in relations:
-                relations_json.append({
-                    "source": relation.source,
-                    "relation": relation.relation,
-                    "target": relation.target,
-                    "section": relation.section,
-                    "evidence": relation.evidence
-                })
-                
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(relations_json, indent=2)
-                )
-            ]
-        
-        elif name == "summarize_section":
-            document = arguments.get("document")
-            if not document:
-                raise ValueError("document is required")
-                
-            section_name = arguments.get("section_name")
-            if not section_name:
-                raise ValueError("section_name is required")
-                
-            content_type = arguments.get("content_type", "text")
-            paper_id = arguments.get("paper_id")
+                    results["errors"].append(f"Metadata retrieval error: {str(e)}")
             
-            # Convert document to appropriate format
-            if content_type == "pdf":
-                try:
-                    document = base64.b64decode(document)
-                except Exception as e:
-                    raise ValueError(f"Invalid base64-encoded PDF: {str(e)}")
+            results["status"] = "success" if not results["errors"] else "partial_success"
                     
-            # Generate the section summary
-            section_summary = await orchestrator.summarize_section(document, section_name, paper_id)
-            
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps({
-                        "section": section_name,
-                        "summary": section_summary
-                    }, indent=2)
-                )
-            ]
-        
-        elif name == "compare_papers":
-            paper_ids = arguments.get("paper_ids", [])
-            if not paper_ids:
-                raise ValueError("paper_ids is required and must contain at least two papers")
-                
-            if len(paper_ids) < 2:
-                raise ValueError("At least two paper_ids are required for comparison")
-                
-            abstracts_only = arguments.get("abstracts_only", False)
-            
-            # Generate the comparison
-            comparison = await orchestrator.compare_papers(paper_ids, abstracts_only)
+        except Exception as e:
+            results["status"] = "error"
+            results["errors"].append(f"Test failed: {str(e)}")
+    
+    await run_test()
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump(results)
+        )
+    ]
+
+async def _handle_download_paper(args: DownloadPaperArgs) -> _ToolResult:
+    """Download a paper by its ID from the appropriate source."""
+    paper_id = args.paper_id
+    save_directory = args.save_directory
+    
+    result = {
+        "paper_id": paper_id,
+        "status": "unknown",
+        "filename": None,
+        "error": None
+    }
+    
+    save_dir = Path(save_directory)
+    save_dir.mkdir(exist_ok=True)
+    
+    async def perform_download():
+        try:
+            session = await orchestrator.get_session()
+            # Determine source type from paper_id
+            source_type, sep, _ = paper_id.partition(":")
+            factory = _CONNECTOR_FACTORIES.get(source_type) if sep else None
+            if factory is None:
+                result["status"] = "error"
+                result["error"] = f"Unknown source type for ID: {paper_id}"
+                return
+            connector = factory(session)
             
-            # Convert to JSON-serializable format
-            comparison_json = {
-                "paper_ids": comparison.paper_ids,
-                "research_questions": comparison.research_questions,
-                "methodologies": comparison.methodologies,
-                "findings": comparison.findings,
-                "limitations": comparison.limitations,
-                "future_directions": comparison.future_directions
-            }
+            # Get metadata first for filename
+            paper = await _cached_metadata(paper_id, connector.get_paper_metadata)
             
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(comparison_json, indent=2)
-                )
-            ]
-        
-        elif name == "analyze_trends":
-            query = arguments.get("query")
-            if not query:
-                raise ValueError("query is required")
-                
-            max_papers = arguments.get("max_papers", 100)
+            # Create clean filename
+            clean_id = paper_id.replace(":", "_").replace("/", "_")
+            clean_title = sanitize_filename(paper.title[:50])
+            filename = f"{clean_id}_{clean_title}.pdf"
+            filepath = save_dir / filename
             
-            # Generate the trend analysis
-            trends = await orchestrator.analyze_publication_trends(query, max_papers)
+            # Save file, reusing the PDF if this session already fetched it
+            pdf_data = _fulltext_cache.get(paper_id)
+            if pdf_data is not None:
+                # Write off the event loop so other tool calls keep running
+                await asyncio.to_thread(filepath.write_bytes, pdf_data)
+            else:
+                await _stream_to_file(connector.stream_fulltext(paper_id), filepath)
             
-            # Convert to JSON-serializable format
-            trends_json = {
-                "query": trends.query,
-                "year_counts": {str(year): count for year, count in trends.year_counts.items()},
-                "emerging_topics": trends.emerging_topics,
-                "frequent_authors": [{"name": name, "count": count} for name, count in trends.frequent_authors],
-                "term_frequencies": {term: count for term, count in list(trends.term_frequencies.items())[:30]},
-                "source_distribution": trends.source_distribution
-            }
+            result["status"] = "success"
+            result["filename"] = str(filepath)
             
-            return [
-                types.TextContent(
-                    type="text",
-                    text=json.dumps(trends_json, indent=2)
-                )
-            ]
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+    
+    await perform_download()
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump(result)
+        )
+    ]
+
+async def _handle_extract_relations(args: PaperIdArgs) -> _ToolResult:
+    """Extract relationships between concepts in a scholarly paper (e.g., 'X causes Y' or 'Algorithm A outperforms B')."""
+    paper_id = args.paper_id
+    
+    relations = await orchestrator.extract_relations(paper_id)
+    
+    # Convert to JSON-serializable format
+    relations_json = []
+    for relation in relations:
+        relations_json.append({
+            "source": relation.source,
+            "relation": relation.relation,
+            "target": relation.target,
+            "section": relation.section,
+            "evidence": relation.evidence
+        })
         
-        else:
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump(relations_json)
+        )
+    ]
+
+async def _handle_summarize_section(args: SummarizeSectionArgs) -> _ToolResult:
+    """Generate a focused summary of a specific section in a scholarly paper."""
+    document = args.document
+    section_name = args.section_name
+    paper_id = args.paper_id
+    
+    # Convert document to appropriate format
+    if args.content_type == "pdf":
+        document = _decode_pdf(document)
+            
+    # Generate the section summary
+    section_summary = await orchestrator.summarize_section(document, section_name, paper_id)
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump({
+                "section": section_name,
+                "summary": section_summary
+            })
+        )
+    ]
+
+async def _handle_compare_papers(args: ComparePapersArgs) -> _ToolResult:
+    """Compare multiple scholarly papers to highlight similarities and differences in methods, results, and limitations."""
+    # Generate the comparison
+    comparison = await orchestrator.compare_papers(args.paper_ids, args.abstracts_only)
+    
+    # Convert to JSON-serializable format
+    comparison_json = {
+        "paper_ids": comparison.paper_ids,
+        "research_questions": comparison.research_questions,
+        "methodologies": comparison.methodologies,
+        "findings": comparison.findings,
+        "limitations": comparison.limitations,
+        "future_directions": comparison.future_directions
+    }
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump(comparison_json)
+        )
+    ]
+
+async def _handle_analyze_trends(args: AnalyzeTrendsArgs) -> _ToolResult:
+    """Analyze publication trends over time, identify emerging topics, and plot term frequencies for a research area."""
+    # Generate the trend analysis
+    trends = await orchestrator.analyze_publication_trends(args.query, args.max_papers)
+    
+    # Convert to JSON-serializable format
+    trends_json = {
+        "query": trends.query,
+        "year_counts": {str(year): count for year, count in trends.year_counts.items()},
+        "emerging_topics": trends.emerging_topics,
+        "frequent_authors": [{"name": name, "count": count} for name, count in trends.frequent_authors],
+        "term_frequencies": {term: count for term, count in list(trends.term_frequencies.items())[:30]},
+        "source_distribution": trends.source_distribution
+    }
+    
+    return [
+        types.TextContent(
+            type="text",
+            text=_dump(trends_json)
+        )
+    ]
+
+# Tool handlers keyed by tool name; arguments are validated before dispatch
+_HANDLERS: dict[str, Callable[[Any], Awaitable[_ToolResult]]] = {
+    "search_papers": _handle_search_papers,
+    "fetch_paper_metadata": _handle_fetch_paper_metadata,
+    "download_fulltext": _handle_download_fulltext,
+    "summarize_document": _handle_summarize_document,
+    "annotate_highlights": _handle_annotate_highlights,
+    "get_citation_graph": _handle_get_citation_graph,
+    "store_to_drive": _handle_store_to_drive,
+    "search_apis": _handle_search_apis,
+    "test_api_connector": _handle_test_api_connector,
+    "download_paper": _handle_download_paper,
+    "extract_relations": _handle_extract_relations,
+    "summarize_section": _handle_summarize_section,
+    "compare_papers": _handle_compare_papers,
+    "analyze_trends": _handle_analyze_trends,
+}
+
+@server.call_tool()
+async def handle_call_tool(
+    name: str, arguments: dict | None
+) -> _ToolResult:
+    """Handle tool execution requests."""
+    try:
+        handler = _HANDLERS.get(name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {name}")
+        args = _TOOL_ARG_MODELS[name].model_validate(arguments or {})
+        return await handler(args)
             
     except Exception as e:
         logger.error(f"Error executing tool {name}: {str(e)}")
         return [
             types.TextContent(
                 type="text",
-                text=json.dumps({
+                text=_dump({
                     "error": str(e)
-                }, indent=2)
+                })
             )
         ]
 
@@ -757,17 +925,53 @@ async def handle_read_resource(uri: AnyUrl) -> Union[str, bytes]:
     if uri.scheme != "paper":
         raise ValueError(f"Unsupported URI scheme: {uri.scheme}")
 
-    # Handle paper PDFs
-    if uri.path.startswith("/pdf/"):
-        paper_id = uri.path[5:]  # Remove "/pdf/" prefix
+    # Handle paper PDFs; "paper://pdf/<id>" parses with "pdf" as the host
+    if uri.host == "pdf" and uri.path and len(uri.path) > 1:
+        paper_id = unquote(uri.path[1:])  # Remove leading "/"
         try:
-            pdf_content = await orchestrator.download_fulltext(paper_id)
+            pdf_content = await _cached_fulltext(paper_id)
             return pdf_content
         except Exception as e:
             raise ValueError(f"Error fetching PDF: {str(e)}")
             
     raise ValueError(f"Resource not found: {uri}")
 
+# Prompt definitions are static, so they are built once at import
+_PROMPTS: list[types.Prompt] = [
+    types.Prompt(
+        name="research_assistant",
+        description="Ask a research assistant to help with scholarly papers",
+        arguments=[
+            types.PromptArgument(
+                name="topic",
+                description="Research topic or query",
+                required=True
+            ),
+            types.PromptArgument(
+                name="detail_level",
+                description="Level of detail (basic/comprehensive)",
+                required=False
+            )
+        ]
+    ),
+    types.Prompt(
+        name="citation_analyzer",
+        description="Analyze the citation graph and relationships of papers",
+        arguments=[
+            types.PromptArgument(
+                name="paper_ids",
+                description="Paper IDs to analyze, comma-separated",
+                required=True
+            ),
+            types.PromptArgument(
+                name="analysis_focus",
+                description="Focus of the analysis (influence, trends, gaps)",
+                required=False
+            )
+        ]
+    )
+]
+
 # Define the prompt templates
 @server.list_prompts()
 async def handle_list_prompts() -> list[types.Prompt]:
@@ -775,58 +979,10 @@ async def handle_list_prompts() -> list[types.Prompt]:
     List available prompts.
     These are specialized prompts for research workflows.
     """
-    return [
-        types.Prompt(
-            name="research_assistant",
-            description="Ask a research assistant to help with scholarly papers",
-            arguments=[
-                types.PromptArgument(
-                    name="topic",
-                    description="Research topic or query",
-                    required=True
-                ),
-                types.PromptArgument(
-                    name="detail_level",
-                    description="Level of detail (basic/comprehensive)",
-                    required=False
-                )
-            ]
-        ),
-        types.Prompt(
-            name="citation_analyzer",
-            description="Analyze the citation graph and relationships of papers",
-            arguments=[
-                types.PromptArgument(
-                    name="paper_ids",
-                    description="Paper IDs to analyze, comma-separated",
-                    required=True
-                ),
-                types.PromptArgument(
-                    name="analysis_focus",
-                    description="Focus of the analysis (influence, trends, gaps)",
-                    required=False
-                )
-            ]
-        )
-    ]
+    return _PROMPTS
 
-@server.get_prompt()
-async def handle_get_prompt(
-    name: str, arguments: dict[str, str] | None
-) -> types.GetPromptResult:
-    """
-    Generate a prompt by combining arguments with server capabilities.
-    """
-    if not arguments:
-        arguments = {}
-        
-    if name == "research_assistant":
-        topic = arguments.get("topic", "")
-        detail_level = arguments.get("detail_level", "basic")
-        
-        is_comprehensive = detail_level.lower() == "comprehensive"
-        
-        prompt = f"""You are a research assistant with access to scholarly databases including arXiv, PubMed, Semantic Scholar, and Google Scholar.
+# research_assistant prompt text; only the topic varies between calls
+_RA_PREFIX = """You are a research assistant with access to scholarly databases including arXiv, PubMed, Semantic Scholar, and Google Scholar.
 
 I'm researching the topic: {topic}
 
@@ -835,18 +991,37 @@ Please help me by:
 2. Providing a summary of the key findings and research directions
 """
 
-        if is_comprehensive:
-            prompt += """3. Analyzing the relationships between key papers
+_RA_COMPREHENSIVE_SUFFIX = """3. Analyzing the relationships between key papers
 4. Identifying gaps and suggesting future research directions
 5. Recommending specific papers I should read in detail
 
 For the most important papers, please fetch their full details and provide a structured summary of their key contributions.
 """
-        else:
-            prompt += """3. Highlighting 3-5 key papers that are essential reading
+
+_RA_BASIC_SUFFIX = """3. Highlighting 3-5 key papers that are essential reading
 
 Please focus on quality over quantity in your recommendations.
 """
+
+@server.get_prompt()
+async def handle_get_prompt(
+    name: str, arguments: dict[str, str] | None
+) -> types.GetPromptResult:
+    """
+    Generate a prompt by combining arguments with server capabilities.
+    """
+    if not arguments:
+        arguments = {}
+        
+    if name == "research_assistant":
+        topic = arguments.get("topic", "")
+        detail_level = arguments.get("detail_level", "basic")
+        
+        is_comprehensive = detail_level.lower() == "comprehensive"
+        
+        prompt = _RA_PREFIX.format(topic=topic) + (
+            _RA_COMPREHENSIVE_SUFFIX if is_comprehensive else _RA_BASIC_SUFFIX
+        )
             
         return types.GetPromptResult(
             description="Research assistant prompt",
@@ -934,5 +1109,9 @@ async def main():
             # Ensure we clean up resources
             await orchestrator.shutdown()
             
+def run():
+    """Run the server to completion, on uvloop when it is installed."""
+    run_event_loop(main())
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
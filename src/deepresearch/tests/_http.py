@@ -0,0 +1,85 @@
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import aiohttp
+from deepresearch.connectors import GoogleDriveConnector
+
+# One pooled session per process, shared by every connector under test
+_session: Optional[aiohttp.ClientSession] = None
+
+# Drive credentials from the first successful login in this process
+_drive_credentials = None
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Get the process-wide test session, creating it on first use.
+    
+    Must be called from inside a running event loop. Connections and DNS
+    lookups are reused across connectors, and the per-host limit keeps
+    concurrent tests from piling onto a single API.
+    
+    Returns:
+        Shared aiohttp ClientSession
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=64, limit_per_host=10, ttl_dns_cache=300)
+        )
+    return _session
+
+async def close_session():
+    """Close the shared test session if it is open."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+@asynccontextmanager
+async def shared_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Use the shared test session for a block and close it once on exit."""
+    try:
+        yield get_session()
+    finally:
+        await close_session()
+
+async def authenticated_drive(session) -> Optional[GoogleDriveConnector]:
+    """
+    Create an authenticated Drive connector on the given session.
+    
+    Credentials from an earlier login in this process are reused, so only
+    the first Drive test reads the token file or runs the OAuth flow.
+    
+    Returns:
+        Authenticated GoogleDriveConnector, or None if authentication failed
+    """
+    global _drive_credentials
+    connector = GoogleDriveConnector(session, credentials=_drive_credentials)
+    if not await connector.authenticate():
+        return None
+    _drive_credentials = connector.credentials
+    return connector
+
+async def with_retry(fn, *args, tries=4, base=0.5, **kwargs):
+    """
+    Await fn(*args, **kwargs), retrying transient network failures.
+    
+    Waits base * 2**attempt seconds plus a little jitter between attempts, so
+    a brief outage costs a few retries rather than the whole test.
+    
+    Args:
+        fn: Coroutine function to call
+        tries: Total attempts before the last error is raised
+        base: Delay before the first retry, in seconds
+        
+    Returns:
+        Result of fn
+    """
+    for attempt in range(tries):
+        try:
+            return await fn(*args, **kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == tries - 1:
+                raise
+            await asyncio.sleep(base * 2 ** attempt + random.random() * 0.1)
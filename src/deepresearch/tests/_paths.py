@@ -0,0 +1,23 @@
+from functools import lru_cache
+from pathlib import Path
+
+# Working directories shared by the test scripts, relative to where they are run
+DOWNLOAD_DIR = Path("downloads")
+TEST_DIR = Path("test_files")
+
+@lru_cache(maxsize=None)
+def ensure_dir(path: Path) -> Path:
+    """
+    Create a directory the first time it is needed and return it.
+    
+    Nothing is created on import, and each directory is only checked once per
+    process however many files are written into it.
+    
+    Args:
+        path: Directory to create
+        
+    Returns:
+        The same path
+    """
+    path.mkdir(exist_ok=True)
+    return path
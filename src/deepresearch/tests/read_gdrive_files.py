@@ -1,76 +1,227 @@
 import asyncio
+import atexit
+import codecs
+import importlib.util
 import os
 import sys
 import logging
 from pathlib import Path
-import aiohttp
 import json
 import shutil
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from googleapiclient.http import MediaIoBaseDownload
+from google.oauth2.credentials import Credentials
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("gdrive_reader")
 
-# Add the src directory to the path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
+# Add the src directory to the path when running from a checkout without the package installed
+if importlib.util.find_spec("deepresearch") is None:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from deepresearch.tests._http import shared_session
+from deepresearch.tests._paths import DOWNLOAD_DIR, ensure_dir
 from deepresearch.connectors import GoogleDriveConnector
 from deepresearch.connectors.drive import SCOPES
-
-# Create downloads directory
-DOWNLOAD_DIR = Path("downloads")
-DOWNLOAD_DIR.mkdir(exist_ok=True)
+from deepresearch.utils import sanitize_filename
+from deepresearch.utils.event_loop import run_event_loop
 
 # Path to credentials file
 CREDENTIALS_FILE = os.path.join("credentials", "client_secret_395039126310-8ovj91u9ef31o0pehta2n957bjqtaimp.apps.googleusercontent.com.json")
 ROOT_CREDENTIALS_FILE = os.path.join("..", CREDENTIALS_FILE)
 
-# Modify the SCOPES to see all files
-# This requires a new token, so we'll delete the existing one if it exists
+# Seeing all files needs broader access than the connector's default scope
+READ_SCOPE = 'https://www.googleapis.com/auth/drive.readonly'
 TOKEN_FILE = 'deepresearch_token.json'
-if os.path.exists(TOKEN_FILE):
-    logger.info(f"Removing existing token file to get broader access")
-    os.remove(TOKEN_FILE)
 
-async def list_and_read_files():
-    """List files from Google Drive and allow the user to download them"""
+def discard_token_without_scope(scope=READ_SCOPE):
+    """Delete the saved token if it wasn't granted scope, so the next login asks for it."""
+    try:
+        creds = Credentials.from_authorized_user_file(TOKEN_FILE)
+    except FileNotFoundError:
+        return
+    except ValueError:
+        creds = None  # Malformed token; treat it as missing the scope
+        
+    if creds is None or scope not in (creds.scopes or ()):
+        logger.info(f"Removing existing token file to get broader access")
+        os.remove(TOKEN_FILE)
+
+def link_credentials(source, target="deepresearch_credentials.json"):
+    """
+    Point target at the credentials file, leaving it alone if it already does.
+    
+    A symlink always reflects the current credentials, so nothing is copied on
+    later runs. Falls back to a copy where symlinks aren't permitted.
+    """
+    source = Path(source).resolve()
+    target = Path(target)
+    if target.is_symlink() and target.resolve() == source:
+        return
+    target.unlink(missing_ok=True)
+    try:
+        os.symlink(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+async def list_and_read_files(session):
+    """List files from Google Drive and allow the user to download them, using the given session"""
     logger.info("=== Google Drive File Reader ===")
     
-    # Copy credentials file to the expected location
+    # A token that already has read access is reused, skipping the browser login
+    discard_token_without_scope()
+    
+    # Link the credentials file into the expected location
     if os.path.exists(ROOT_CREDENTIALS_FILE):
         logger.info("Using credentials from root directory")
-        # Copy to current working directory
-        shutil.copy(ROOT_CREDENTIALS_FILE, "deepresearch_credentials.json")
+        link_credentials(ROOT_CREDENTIALS_FILE)
     elif os.path.exists(CREDENTIALS_FILE):
         logger.info("Using credentials from credentials directory")
-        shutil.copy(CREDENTIALS_FILE, "deepresearch_credentials.json")
+        link_credentials(CREDENTIALS_FILE)
     else:
         logger.error(f"Credentials file not found at {CREDENTIALS_FILE} or {ROOT_CREDENTIALS_FILE}")
         return
     
-    async with aiohttp.ClientSession() as session:
-        # Initialize connector
-        connector = GoogleDriveConnector(session)
-        
-        # Patch the connector's SCOPES to allow reading all files
-        # This is a hacky way to modify the connector's behavior
-        import deepresearch.connectors.drive
-        deepresearch.connectors.drive.SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
-        
-        # Authenticate
-        logger.info("Authenticating with Google Drive (read-only access)...")
-        auth_success = await connector.authenticate()
+    # Initialize connector
+    connector = GoogleDriveConnector(session)
+    
+    # Patch the connector's SCOPES to allow reading all files
+    # This is a hacky way to modify the connector's behavior
+    import deepresearch.connectors.drive
+    deepresearch.connectors.drive.SCOPES = [READ_SCOPE]
+    
+    # Authenticate
+    logger.info("Authenticating with Google Drive (read-only access)...")
+    auth_success = await connector.authenticate()
+    
+    if not auth_success:
+        logger.error("Authentication failed")
+        return
         
-        if not auth_success:
-            logger.error("Authentication failed")
-            return
+    logger.info("Authentication successful")
+    
+    # Use the direct drive API to list files since our connector might be limited
+    await list_all_files_direct(connector)
             
-        logger.info("Authentication successful")
+# Blocking googleapiclient calls run here rather than in the default executor,
+# so slow Drive requests never hold threads other to_thread callers need
+_DRIVE_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gdrive")
+atexit.register(_DRIVE_POOL.shutdown, wait=False, cancel_futures=True)
+
+# Only the fields the listings actually show
+LIST_FIELDS = "nextPageToken, files(id, name, mimeType)"
+
+# A listed file, unpacked once from the API response; link is None unless requested
+FileRow = namedtuple('FileRow', 'id name mime link')
+
+async def iter_files(connector, q, fields=LIST_FIELDS, page_size=100):
+    """
+    Yield every page of files matching a Drive query.
+    
+    The request for the next page is already in flight while the caller
+    handles the current one, so an N-page listing costs about one round-trip
+    of waiting rather than N.
+    
+    Args:
+        connector: Authenticated GoogleDriveConnector
+        q: Drive search query
+        fields: Partial-response field selector; must include nextPageToken
+        page_size: Files per page
         
-        # Use the direct drive API to list files since our connector might be limited
-        await list_all_files_direct(connector)
-            
+    Yields:
+        Lists of FileRow
+    """
+    loop = asyncio.get_running_loop()
+    files_api = connector._drive_service.files()
+    
+    def fetch(page_token):
+        return files_api.list(
+            pageSize=page_size,
+            fields=fields,
+            q=q,
+            pageToken=page_token
+        ).execute()
+    
+    pending = loop.run_in_executor(_DRIVE_POOL, fetch, None)
+    try:
+        while pending is not None:
+            response = await pending
+            page_token = response.get('nextPageToken')
+            pending = loop.run_in_executor(_DRIVE_POOL, fetch, page_token) if page_token else None
+            yield [
+                FileRow(f['id'], f['name'], f.get('mimeType', 'unknown'), f.get('webViewLink'))
+                for f in response.get('files', [])
+            ]
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+# MIME types whose contents are previewed after download
+_TEXT_MIMES = frozenset({
+    'text/plain', 'application/json', 'text/markdown', 'text/csv', 'text/html', 'application/xml'
+})
+# Native Google Workspace types can't be downloaded as-is
+_GOOGLE_DOCS_PREFIX = 'application/vnd.google-apps.'
+_FOLDER_MIME = _GOOGLE_DOCS_PREFIX + 'folder'
+
+# Characters of a text file shown after download, and the bytes read to get them
+# (UTF-8 needs at most 4 bytes per character)
+PREVIEW_CHARS = 2000
+PREVIEW_BYTES = 8192
+
+# Bytes fetched per request when streaming a download to disk
+DOWNLOAD_CHUNK_SIZE = 8 << 20
+
+async def download_to_path(connector, file_id, path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Stream a Drive file to disk one chunk at a time.
+    
+    Memory use stays at about one chunk however large the file is. A partially
+    written file is removed if the download fails.
+    
+    Args:
+        connector: Authenticated GoogleDriveConnector
+        file_id: Drive file ID
+        path: Destination path
+        chunk_size: Bytes to request per chunk
+        
+    Returns:
+        Number of bytes written
+    """
+    loop = asyncio.get_running_loop()
+    
+    def download():
+        request = connector._drive_service.files().get_media(fileId=file_id)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0), 0o644)
+        with open(fd, "wb") as fh:
+            downloader = MediaIoBaseDownload(fh, request, chunksize=chunk_size)
+            done = False
+            while not done:
+                status, done = downloader.next_chunk(num_retries=3)
+                if status:
+                    logger.info(f"Download {int(status.progress() * 100)}% complete")
+            fh.flush()
+            # A bulk download shouldn't push more useful data out of the page cache.
+            # Dirty pages can't be dropped, so write them out before the advice.
+            if hasattr(os, "posix_fadvise"):
+                os.fdatasync(fd)
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            return fh.tell()
+    
+    try:
+        return await loop.run_in_executor(_DRIVE_POOL, download)
+    except BaseException:
+        Path(path).unlink(missing_ok=True)
+        raise
+
+def read_head(path, size=PREVIEW_BYTES):
+    """Read up to size bytes from the start of a file."""
+    with open(path, "rb") as f:
+        return f.read(size)
+
 async def list_all_files_direct(connector):
     """List all files using direct Drive API access"""
     logger.info("\nListing all files from Google Drive...")
@@ -79,20 +230,35 @@ async def list_all_files_direct(connector):
         # Make sure we're authenticated
         await connector.ensure_authenticated()
         
-        # Use the Drive API directly
+        # List with no folder restriction, one page at a time. Files keep their
+        # numbers across pages, so earlier pages stay selectable without a refetch.
         loop = asyncio.get_running_loop()
-        
-        # Make the list query with no folder restriction
-        response = await loop.run_in_executor(
-            None,
-            lambda: connector._drive_service.files().list(
-                pageSize=100,
-                fields="nextPageToken, files(id, name, mimeType, createdTime, webViewLink)",
-                q="trashed = false"
-            ).execute()
+        pages = iter_files(
+            connector,
+            "trashed = false",
+            fields="nextPageToken, files(id, name, mimeType, webViewLink)"
         )
-        
-        files = response.get('files', [])
+        files = []
+        answer = ""
+        try:
+            async for page in pages:
+                if not page:
+                    continue
+                    
+                # Display files with index
+                for i, (file_id, file_name, file_type, _) in enumerate(page, len(files) + 1):
+                    logger.info(f"{i}. {file_name} ({file_type}) - ID: {file_id}")
+                files.extend(page)
+                
+                # The next page is already being fetched while the user reads this one
+                answer = await loop.run_in_executor(
+                    None, input, "\nEnter the number of the file to download (Enter for more, 0 to exit): "
+                )
+                if answer.strip():
+                    break
+        finally:
+            # Drops a prefetch that is no longer needed
+            await pages.aclose()
         
         if not files:
             logger.info("No files found in your Google Drive")
@@ -100,16 +266,13 @@ async def list_all_files_direct(connector):
             
         logger.info(f"Found {len(files)} files")
         
-        # Display files with index
-        for i, file in enumerate(files, 1):
-            file_type = file.get('mimeType', 'unknown')
-            file_id = file.get('id')
-            file_name = file.get('name')
-            logger.info(f"{i}. {file_name} ({file_type}) - ID: {file_id}")
-        
         # Ask user which file to download
         try:
-            file_index = int(input("\nEnter the number of the file to download (0 to exit): "))
+            if not answer.strip():
+                answer = await loop.run_in_executor(
+                    None, input, "\nEnter the number of the file to download (0 to exit): "
+                )
+            file_index = int(answer)
             
             if file_index == 0:
                 logger.info("Exiting")
@@ -120,44 +283,43 @@ async def list_all_files_direct(connector):
                 return
             
             selected_file = files[file_index - 1]
-            file_id = selected_file.get('id')
-            file_name = selected_file.get('name')
-            file_type = selected_file.get('mimeType')
+            file_id, file_name, file_type, _ = selected_file
             
             logger.info(f"Downloading: {file_name}")
             
             # For folders, we can't download
-            if file_type == 'application/vnd.google-apps.folder':
+            if file_type == _FOLDER_MIME:
                 logger.info("This is a folder, listing contents...")
                 await list_folder_contents(connector, file_id, file_name)
                 return
                 
             # For Google Docs/Sheets, we need special handling
-            if file_type.startswith('application/vnd.google-apps.'):
+            if file_type.startswith(_GOOGLE_DOCS_PREFIX):
                 logger.info(f"This is a Google Docs file ({file_type}), can't download directly.")
-                logger.info(f"View online at: {selected_file.get('webViewLink')}")
+                logger.info(f"View online at: {selected_file.link}")
                 return
             
             # Download regular files
             try:
-                # Use the connector's download method
-                file_content = await connector.download_document(file_id)
-                
                 # Save to downloads directory with original name
-                safe_name = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in file_name)
-                download_path = DOWNLOAD_DIR / safe_name
+                safe_name = sanitize_filename(file_name)
+                download_path = ensure_dir(DOWNLOAD_DIR) / safe_name
                 
-                with open(download_path, "wb") as f:
-                    f.write(file_content)
+                # Stream straight to disk rather than holding the whole file in memory
+                size = await download_to_path(connector, file_id, download_path)
                 
-                logger.info(f"Downloaded {len(file_content)} bytes to {download_path}")
+                logger.info(f"Downloaded {size} bytes to {download_path}")
                 
                 # If it's a text file, show the content
-                if file_type in ['text/plain', 'application/json', 'text/markdown', 'text/csv']:
+                if file_type in _TEXT_MIMES:
                     try:
-                        text_content = file_content.decode('utf-8')
+                        # Only the head of the file is read and decoded; an incremental
+                        # decoder holds back a character split at the cut instead of failing
+                        preview_bytes = await asyncio.to_thread(read_head, download_path)
+                        text_preview = codecs.getincrementaldecoder('utf-8')().decode(preview_bytes, final=False)
+                        truncated = size > len(preview_bytes) or len(text_preview) > PREVIEW_CHARS
                         print("\n=== File Content ===")
-                        print(text_content[:2000] + "..." if len(text_content) > 2000 else text_content)
+                        print(text_preview[:PREVIEW_CHARS] + "..." if truncated else text_preview)
                         print("=" * 20)
                     except UnicodeDecodeError:
                         logger.error("Could not decode file as text")
@@ -177,38 +339,28 @@ async def list_folder_contents(connector, folder_id, folder_name):
     logger.info(f"\nListing contents of folder: {folder_name}")
     
     try:
-        # Use the Drive API directly
-        loop = asyncio.get_running_loop()
+        # Query for files in this folder, one page at a time
+        count = 0
+        async for page in iter_files(connector, f"'{folder_id}' in parents and trashed = false"):
+            # Display files with index
+            for i, (file_id, file_name, file_type, _) in enumerate(page, count + 1):
+                logger.info(f"{i}. {file_name} ({file_type}) - ID: {file_id}")
+            count += len(page)
         
-        # Query for files in this folder
-        response = await loop.run_in_executor(
-            None,
-            lambda: connector._drive_service.files().list(
-                pageSize=100,
-                fields="nextPageToken, files(id, name, mimeType, createdTime, webViewLink)",
-                q=f"'{folder_id}' in parents and trashed = false"
-            ).execute()
-        )
-        
-        files = response.get('files', [])
-        
-        if not files:
+        if not count:
             logger.info(f"No files found in folder '{folder_name}'")
             return
             
-        logger.info(f"Found {len(files)} files in folder '{folder_name}'")
-        
-        # Display files with index
-        for i, file in enumerate(files, 1):
-            file_type = file.get('mimeType', 'unknown')
-            file_id = file.get('id')
-            file_name = file.get('name')
-            logger.info(f"{i}. {file_name} ({file_type}) - ID: {file_id}")
+        logger.info(f"Found {count} files in folder '{folder_name}'")
     
     except Exception as e:
         logger.error(f"Error listing folder contents: {e}")
         import traceback
         traceback.print_exc()
 
+async def main():
+    async with shared_session() as session:
+        await list_and_read_files(session)
+
 if __name__ == "__main__":
-    asyncio.run(list_and_read_files()) 
\ No newline at end of file
+    run_event_loop(main())
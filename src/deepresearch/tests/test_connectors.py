@@ -1,5 +1,4 @@
 import asyncio
-import aiohttp
 import os
 import sys
 import argparse
@@ -9,216 +8,231 @@ from datetime import datetime
 # Add the parent directory to the path so we can import the modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from deepresearch.tests._http import authenticated_drive, shared_session, with_retry
+from deepresearch.utils.event_loop import run_event_loop
 from deepresearch.connectors import (
     ArXivConnector,
     PubMedConnector, 
     SemanticScholarConnector,
-    GoogleScholarConnector,
-    GoogleDriveConnector
+    GoogleScholarConnector
 )
 from deepresearch.models import SearchQuery, Paper
 
+# Default searches, built once rather than validated on every test run
+_ARXIV_QUERY = SearchQuery(query="transformer neural networks", max_results=5)
+_PUBMED_QUERY = SearchQuery(query="CRISPR gene editing", max_results=5)
+_SEMANTIC_SCHOLAR_QUERY = SearchQuery(query="GPT-4 capabilities", max_results=5)
+_GOOGLE_SCHOLAR_QUERY = SearchQuery(query="language model evaluation", max_results=3)
+
+def flush_lines(lines):
+    """Write a test's collected output in one call, so concurrent tests don't interleave"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
 async def test_arxiv(session):
     """Test ArXiv connector functionality"""
-    print("\n=== Testing ArXiv Connector ===")
+    out = []
+    out.append("\n=== Testing ArXiv Connector ===")
     
     try:
         connector = ArXivConnector(session)
         
         # Test search
-        print("\nTesting search...")
-        query = SearchQuery(query="transformer neural networks", max_results=5)
-        papers = await connector.search(query)
-        print(f"Found {len(papers)} papers")
+        out.append("\nTesting search...")
+        papers = await with_retry(connector.search, _ARXIV_QUERY)
+        out.append(f"Found {len(papers)} papers")
         if papers:
-            print(f"First paper: {papers[0].title}")
+            out.append(f"First paper: {papers[0].title}")
             
         # Test metadata retrieval
         if papers:
             paper_id = papers[0].paper_id
-            print(f"\nTesting metadata retrieval for {paper_id}...")
-            paper = await connector.get_paper_metadata(paper_id)
-            print(f"Title: {paper.title}")
-            print(f"Authors: {', '.join(a.name for a in paper.authors)}")
-            print(f"Abstract: {paper.abstract[:150]}...")
+            out.append(f"\nTesting metadata retrieval for {paper_id}...")
+            paper = await with_retry(connector.get_paper_metadata, paper_id)
+            out.append(f"Title: {paper.title}")
+            out.append(f"Authors: {', '.join(a.name for a in paper.authors)}")
+            out.append(f"Abstract: {paper.abstract[:150]}...")
             
             # Test PDF download
-            print(f"\nTesting PDF download for {paper_id}...")
-            pdf_data = await connector.download_fulltext(paper_id)
-            print(f"Downloaded {len(pdf_data)} bytes of PDF data")
+            out.append(f"\nTesting PDF download for {paper_id}...")
+            pdf_data = await with_retry(connector.download_fulltext, paper_id)
+            out.append(f"Downloaded {len(pdf_data)} bytes of PDF data")
             
         # Test ID parsing
-        print("\nTesting ID parsing...")
+        out.append("\nTesting ID parsing...")
         test_ids = [
             "2104.08935",
             "arxiv:2104.08935",
             "https://arxiv.org/abs/2104.08935"
         ]
-        for test_id in test_ids:
-            parsed = connector.parse_paper_id(test_id)
-            print(f"Original: {test_id} -> Parsed: {parsed}")
+        for test_id, parsed in zip(test_ids, connector.parse_paper_ids(test_ids)):
+            out.append(f"Original: {test_id} -> Parsed: {parsed}")
             
     except Exception as e:
-        print(f"Error testing ArXiv connector: {e}")
+        out.append(f"Error testing ArXiv connector: {e}")
+    finally:
+        flush_lines(out)
 
 async def test_pubmed(session):
     """Test PubMed connector functionality"""
-    print("\n=== Testing PubMed Connector ===")
+    out = []
+    out.append("\n=== Testing PubMed Connector ===")
     
     try:
         connector = PubMedConnector(session, email="deepresearch@example.com")
         
         # Test search
-        print("\nTesting search...")
-        query = SearchQuery(query="CRISPR gene editing", max_results=5)
-        papers = await connector.search(query)
-        print(f"Found {len(papers)} papers")
+        out.append("\nTesting search...")
+        papers = await with_retry(connector.search, _PUBMED_QUERY)
+        out.append(f"Found {len(papers)} papers")
         if papers:
-            print(f"First paper: {papers[0].title}")
+            out.append(f"First paper: {papers[0].title}")
             
         # Test metadata retrieval
         if papers:
             paper_id = papers[0].paper_id
-            print(f"\nTesting metadata retrieval for {paper_id}...")
-            paper = await connector.get_paper_metadata(paper_id)
-            print(f"Title: {paper.title}")
-            print(f"Authors: {', '.join(a.name for a in paper.authors)}")
-            print(f"Abstract: {paper.abstract[:150] if paper.abstract else 'No abstract'}...")
+            out.append(f"\nTesting metadata retrieval for {paper_id}...")
+            paper = await with_retry(connector.get_paper_metadata, paper_id)
+            out.append(f"Title: {paper.title}")
+            out.append(f"Authors: {', '.join(a.name for a in paper.authors)}")
+            out.append(f"Abstract: {paper.abstract[:150] if paper.abstract else 'No abstract'}...")
             
             # Test fulltext download (may not be available for all papers)
             try:
-                print(f"\nTesting PDF download for {paper_id}...")
-                pdf_data = await connector.download_fulltext(paper_id)
-                print(f"Downloaded {len(pdf_data)} bytes of PDF data")
+                out.append(f"\nTesting PDF download for {paper_id}...")
+                pdf_data = await with_retry(connector.download_fulltext, paper_id)
+                out.append(f"Downloaded {len(pdf_data)} bytes of PDF data")
             except Exception as e:
-                print(f"Full text download failed (expected for many PubMed papers): {e}")
+                out.append(f"Full text download failed (expected for many PubMed papers): {e}")
             
         # Test ID parsing
-        print("\nTesting ID parsing...")
+        out.append("\nTesting ID parsing...")
         test_ids = [
             "12345678",
             "pubmed:12345678",
             "https://pubmed.ncbi.nlm.nih.gov/12345678/"
         ]
-        for test_id in test_ids:
-            parsed = connector.parse_paper_id(test_id)
-            print(f"Original: {test_id} -> Parsed: {parsed}")
+        for test_id, parsed in zip(test_ids, connector.parse_paper_ids(test_ids)):
+            out.append(f"Original: {test_id} -> Parsed: {parsed}")
             
     except Exception as e:
-        print(f"Error testing PubMed connector: {e}")
+        out.append(f"Error testing PubMed connector: {e}")
+    finally:
+        flush_lines(out)
 
 async def test_semantic_scholar(session):
     """Test Semantic Scholar connector functionality"""
-    print("\n=== Testing Semantic Scholar Connector ===")
+    out = []
+    out.append("\n=== Testing Semantic Scholar Connector ===")
     
     try:
         api_key = os.environ.get("SEMANTICSCHOLAR_API_KEY", None)
         connector = SemanticScholarConnector(session, api_key=api_key)
         
         # Test search
-        print("\nTesting search...")
-        query = SearchQuery(query="GPT-4 capabilities", max_results=5)
-        papers = await connector.search(query)
-        print(f"Found {len(papers)} papers")
+        out.append("\nTesting search...")
+        papers = await with_retry(connector.search, _SEMANTIC_SCHOLAR_QUERY)
+        out.append(f"Found {len(papers)} papers")
         if papers:
-            print(f"First paper: {papers[0].title}")
+            out.append(f"First paper: {papers[0].title}")
             
         # Test metadata retrieval
         if papers:
             paper_id = papers[0].paper_id
-            print(f"\nTesting metadata retrieval for {paper_id}...")
-            paper = await connector.get_paper_metadata(paper_id)
-            print(f"Title: {paper.title}")
-            print(f"Authors: {', '.join(a.name for a in paper.authors)}")
-            print(f"Abstract: {paper.abstract[:150] if paper.abstract else 'No abstract'}...")
+            out.append(f"\nTesting metadata retrieval for {paper_id}...")
+            paper = await with_retry(connector.get_paper_metadata, paper_id)
+            out.append(f"Title: {paper.title}")
+            out.append(f"Authors: {', '.join(a.name for a in paper.authors)}")
+            out.append(f"Abstract: {paper.abstract[:150] if paper.abstract else 'No abstract'}...")
             
             # Test fulltext download (may not be available for all papers)
             if paper.pdf_url:
                 try:
-                    print(f"\nTesting PDF download for {paper_id}...")
-                    pdf_data = await connector.download_fulltext(paper_id)
-                    print(f"Downloaded {len(pdf_data)} bytes of PDF data")
+                    out.append(f"\nTesting PDF download for {paper_id}...")
+                    pdf_data = await with_retry(connector.download_fulltext, paper_id)
+                    out.append(f"Downloaded {len(pdf_data)} bytes of PDF data")
                 except Exception as e:
-                    print(f"Full text download failed: {e}")
+                    out.append(f"Full text download failed: {e}")
             else:
-                print("No PDF URL available for this paper")
+                out.append("No PDF URL available for this paper")
             
         # Test ID parsing
-        print("\nTesting ID parsing...")
+        out.append("\nTesting ID parsing...")
         test_ids = [
             "12345678",
             "semanticscholar:12345678",
             "https://www.semanticscholar.org/paper/12345678"
         ]
-        for test_id in test_ids:
-            parsed = connector.parse_paper_id(test_id)
-            print(f"Original: {test_id} -> Parsed: {parsed}")
+        for test_id, parsed in zip(test_ids, connector.parse_paper_ids(test_ids)):
+            out.append(f"Original: {test_id} -> Parsed: {parsed}")
             
     except Exception as e:
-        print(f"Error testing Semantic Scholar connector: {e}")
+        out.append(f"Error testing Semantic Scholar connector: {e}")
+    finally:
+        flush_lines(out)
 
 async def test_google_scholar(session):
     """Test Google Scholar connector functionality"""
-    print("\n=== Testing Google Scholar Connector ===")
-    print("\nNote: Google Scholar may rate-limit or block scraping attempts")
+    out = []
+    out.append("\n=== Testing Google Scholar Connector ===")
+    out.append("\nNote: Google Scholar may rate-limit or block scraping attempts")
     
     try:
         connector = GoogleScholarConnector(session, use_proxy=False)
         
         # Test search
-        print("\nTesting search...")
-        query = SearchQuery(query="language model evaluation", max_results=3)
-        papers = await connector.search(query)
-        print(f"Found {len(papers)} papers")
+        out.append("\nTesting search...")
+        papers = await with_retry(connector.search, _GOOGLE_SCHOLAR_QUERY)
+        out.append(f"Found {len(papers)} papers")
         if papers:
-            print(f"First paper: {papers[0].title}")
+            out.append(f"First paper: {papers[0].title}")
             
         # Test metadata retrieval (this might fail due to rate limiting)
         if papers:
             try:
                 paper_id = papers[0].paper_id
-                print(f"\nTesting metadata retrieval for {paper_id}...")
-                paper = await connector.get_paper_metadata(paper_id)
-                print(f"Title: {paper.title}")
-                print(f"Authors: {', '.join(a.name for a in paper.authors)}")
+                out.append(f"\nTesting metadata retrieval for {paper_id}...")
+                paper = await with_retry(connector.get_paper_metadata, paper_id)
+                out.append(f"Title: {paper.title}")
+                out.append(f"Authors: {', '.join(a.name for a in paper.authors)}")
             except Exception as e:
-                print(f"Metadata retrieval failed (possibly due to rate limiting): {e}")
+                out.append(f"Metadata retrieval failed (possibly due to rate limiting): {e}")
             
         # Test ID parsing
-        print("\nTesting ID parsing...")
+        out.append("\nTesting ID parsing...")
         test_ids = [
             "abcdef123456",
             "googlescholar:abcdef123456",
             "https://scholar.google.com/scholar?cluster=abcdef123456"
         ]
-        for test_id in test_ids:
-            parsed = connector.parse_paper_id(test_id)
-            print(f"Original: {test_id} -> Parsed: {parsed}")
+        for test_id, parsed in zip(test_ids, connector.parse_paper_ids(test_ids)):
+            out.append(f"Original: {test_id} -> Parsed: {parsed}")
             
     except Exception as e:
-        print(f"Error testing Google Scholar connector: {e}")
+        out.append(f"Error testing Google Scholar connector: {e}")
+    finally:
+        flush_lines(out)
 
 async def test_google_drive(session):
     """Test Google Drive connector functionality"""
-    print("\n=== Testing Google Drive Connector ===")
+    out = []
+    out.append("\n=== Testing Google Drive Connector ===")
     
     try:
-        connector = GoogleDriveConnector(session)
-        
         # Test authentication
-        print("\nTesting authentication (this will prompt for authorization if needed)...")
-        auth_success = await connector.authenticate()
-        if auth_success:
-            print("Authentication successful")
+        out.append("\nTesting authentication (this will prompt for authorization if needed)...")
+        connector = await authenticated_drive(session)
+        if connector is not None:
+            out.append("Authentication successful")
             
             # Test folder creation
             test_folder_name = f"DeepResearch_Test_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            print(f"\nTesting folder creation: {test_folder_name}...")
+            out.append(f"\nTesting folder creation: {test_folder_name}...")
             folder_id = await connector.create_folder(test_folder_name)
-            print(f"Created folder with ID: {folder_id}")
+            out.append(f"Created folder with ID: {folder_id}")
             
             # Test document upload
-            print("\nTesting document upload...")
+            out.append("\nTesting document upload...")
             test_content = "This is a test document created by DeepResearch test script."
             test_filename = "test_document.txt"
             doc = await connector.store_document(
@@ -227,26 +241,28 @@ async def test_google_drive(session):
                 mime_type="text/plain",
                 folder_id=folder_id
             )
-            print(f"Uploaded document: {doc.name}")
-            print(f"View at: {doc.web_view_link}")
+            out.append(f"Uploaded document: {doc.name}")
+            out.append(f"View at: {doc.web_view_link}")
             
             # Test listing documents
-            print("\nTesting document listing...")
+            out.append("\nTesting document listing...")
             docs = await connector.list_documents(folder_id=folder_id)
-            print(f"Found {len(docs)} documents in folder")
+            out.append(f"Found {len(docs)} documents in folder")
             for d in docs:
-                print(f"- {d.name} ({d.mime_type})")
+                out.append(f"- {d.name} ({d.mime_type})")
                 
             # Test downloading document
-            print("\nTesting document download...")
+            out.append("\nTesting document download...")
             content = await connector.download_document(doc.document_id)
-            print(f"Downloaded {len(content)} bytes")
-            print(f"Content: {content.decode('utf-8')}")
+            out.append(f"Downloaded {len(content)} bytes")
+            out.append(f"Content: {content.decode('utf-8')}")
         else:
-            print("Authentication failed")
+            out.append("Authentication failed")
             
     except Exception as e:
-        print(f"Error testing Google Drive connector: {e}")
+        out.append(f"Error testing Google Drive connector: {e}")
+    finally:
+        flush_lines(out)
         
 async def main():
     parser = argparse.ArgumentParser(description='Test DeepResearch connectors')
@@ -255,21 +271,31 @@ async def main():
     
     args = parser.parse_args()
     
-    async with aiohttp.ClientSession() as session:
-        if args.connector in ['arxiv', 'all']:
-            await test_arxiv(session)
-            
-        if args.connector in ['pubmed', 'all']:
-            await test_pubmed(session)
-            
-        if args.connector in ['semanticscholar', 'all']:
-            await test_semantic_scholar(session)
-            
-        if args.connector in ['googlescholar', 'all']:
-            await test_google_scholar(session)
-            
-        if args.connector in ['drive', 'all']:
-            await test_google_drive(session)
+    tests = {
+        'arxiv': test_arxiv,
+        'pubmed': test_pubmed,
+        'semanticscholar': test_semantic_scholar,
+        'googlescholar': test_google_scholar,
+        'drive': test_google_drive
+    }
+    selected = [name for name in tests if args.connector in [name, 'all']]
+    
+    async def run(name, session):
+        # A failing test is reported rather than raised, so it doesn't cancel the others
+        try:
+            await tests[name](session)
+        except Exception as e:
+            return name, e
+        return name, None
+    
+    async with shared_session() as session, asyncio.TaskGroup() as tg:
+        # The tests are independent and mostly wait on the network, so run them together
+        # and report each one as soon as it finishes; Ctrl-C cancels them all
+        runs = [tg.create_task(run(name, session), name=name) for name in selected]
+        for finished in asyncio.as_completed(runs):
+            name, error = await finished
+            if error is not None:
+                print(f"Error testing {name} connector: {error}")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run_event_loop(main())
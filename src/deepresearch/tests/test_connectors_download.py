@@ -1,336 +1,413 @@
 import asyncio
-import aiohttp
 import os
 import sys
 import argparse
 import json
+import logging
+import queue
 from datetime import datetime
-import pathlib
+from logging.handlers import QueueHandler, QueueListener
+import glob
+import hashlib
+from contextlib import asynccontextmanager
+from typing import Optional
+
+logger = logging.getLogger("connectors_download_test")
 
 # Add the parent directory to the path so we can import the modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from deepresearch.tests._http import authenticated_drive, shared_session, with_retry
+from deepresearch.tests._paths import DOWNLOAD_DIR, ensure_dir
 from deepresearch.connectors import (
     ArXivConnector,
     PubMedConnector, 
     SemanticScholarConnector,
-    GoogleScholarConnector,
-    GoogleDriveConnector
+    GoogleScholarConnector
 )
 from deepresearch.models import SearchQuery, Paper
+from deepresearch.utils import sanitize_filename
+from deepresearch.utils.event_loop import run_event_loop
+
+# Default searches, built once rather than validated on every test run
+_ARXIV_QUERY = SearchQuery(query="transformer neural networks", max_results=5)
+_PUBMED_QUERY = SearchQuery(query="CRISPR gene editing", max_results=5)
+_SEMANTIC_SCHOLAR_QUERY = SearchQuery(query="GPT-4 capabilities", max_results=5)
+_SEMANTIC_SCHOLAR_FALLBACK_QUERY = SearchQuery(query="machine learning", max_results=3)
+_GOOGLE_SCHOLAR_QUERY = SearchQuery(query="language model evaluation", max_results=3)
+
+# Papers fetched at once per connector, so one test doesn't hammer a single host
+DOWNLOAD_CONCURRENCY = 5
+
+# Chunks waiting to be written before downloads are made to wait for the disk
+WRITE_QUEUE_SIZE = 64
+
+# File operations for the single writer task, while one is running
+_write_queue: Optional[asyncio.Queue] = None
+
+# Whether a verified PDF from an earlier run stands in for a new download
+_reuse_downloads = True
+
+async def _writer(queue):
+    """Run queued file operations in order, one at a time, in a worker thread"""
+    while (item := await queue.get()) is not None:
+        op, args = item
+        try:
+            await asyncio.to_thread(op, *args)
+        except OSError as e:
+            logger.error(f"Write failed: {e}")
 
-# Create directory for downloads
-DOWNLOAD_DIR = pathlib.Path("downloads")
-DOWNLOAD_DIR.mkdir(exist_ok=True)
+@asynccontextmanager
+async def pdf_writer():
+    """
+    Route PDF writes through one writer task for the duration of a block.
+    
+    Downloads hand their chunks to the queue and go straight back to the
+    network instead of waiting on each write. All queued writes are finished
+    when the block exits.
+    """
+    global _write_queue
+    _write_queue = asyncio.Queue(WRITE_QUEUE_SIZE)
+    task = asyncio.create_task(_writer(_write_queue))
+    try:
+        yield
+    finally:
+        await _write_queue.put(None)
+        await task
+        _write_queue = None
+
+async def _write(op, *args):
+    """Queue a file operation for the writer task, or run it directly if none is running"""
+    if _write_queue is None:
+        await asyncio.to_thread(op, *args)
+    else:
+        await _write_queue.put((op, args))
+
+def _discard(f, filepath):
+    """Close and remove a partially written file"""
+    f.close()
+    filepath.unlink(missing_ok=True)
+
+async def save_pdf(paper, chunks):
+    """
+    Stream a paper's PDF into the downloads directory.
+    
+    Chunks are written by the pdf_writer task when one is running, otherwise
+    in a worker thread as they arrive. A partially written file is removed if
+    the stream fails; a complete one gets a manifest with its size and SHA-256,
+    so later runs can tell it apart from a file cut short.
+    
+    Args:
+        paper: Paper metadata, used to name the file
+        chunks: Async iterator of PDF byte chunks
+        
+    Returns:
+        Tuple of (bytes written, file path)
+    """
+    # Create a sanitized filename
+    clean_id = paper.paper_id.replace(":", "_")
+    clean_title = sanitize_filename(paper.title[:50])
+    filename = f"{clean_id}_{clean_title}.pdf"
+    filepath = ensure_dir(DOWNLOAD_DIR) / filename
+    
+    # Save the PDF as it arrives
+    size = 0
+    digest = hashlib.sha256()
+    await asyncio.to_thread(_manifest_path(filepath).unlink, missing_ok=True)
+    f = await asyncio.to_thread(open, filepath, "wb")
+    try:
+        async for chunk in chunks:
+            await _write(f.write, chunk)
+            digest.update(chunk)
+            size += len(chunk)
+    except BaseException:
+        await _write(_discard, f, filepath)
+        raise
+    await _write(f.close)
+    await _write(_write_manifest, filepath, size, digest.hexdigest())
+    return size, filepath
+
+def _manifest_path(filepath):
+    """Path of the manifest recording a completed download's size and SHA-256"""
+    return filepath.with_name(filepath.name + ".sha256")
+
+def _write_manifest(filepath, size, sha256):
+    """Record a completed download, after its file has been closed"""
+    _manifest_path(filepath).write_text(json.dumps({"size": size, "sha256": sha256}))
+
+def _file_sha256(filepath):
+    """Hash a file in 1 MiB reads"""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def find_downloaded(paper_id):
+    """
+    Return the size and path of a complete PDF an earlier run saved for this paper, or None.
+    
+    A file only counts if its manifest exists and its size and SHA-256 still
+    match it, so one left truncated by a killed run is downloaded again.
+    """
+    clean_id = glob.escape(paper_id.replace(":", "_"))
+    for filepath in DOWNLOAD_DIR.glob(f"{clean_id}_*.pdf"):
+        try:
+            manifest = json.loads(_manifest_path(filepath).read_text())
+            size = filepath.stat().st_size
+            if size == manifest["size"] and _file_sha256(filepath) == manifest["sha256"]:
+                return size, filepath
+        except (OSError, ValueError, KeyError):
+            continue
+    return None
+
+async def fetch_and_save(sem, connector, paper, require_pdf_url=False):
+    """
+    Fetch one paper's metadata and stream its PDF to disk while holding the semaphore.
+    
+    Metadata is always fetched. A verified PDF saved by an earlier run is reused
+    instead of downloading it again, unless the run was started with --redownload.
+    
+    Returns:
+        Tuple of (metadata, (bytes, path, reused) or None if there is no PDF URL)
+    """
+    async with sem:
+        meta = await with_retry(connector.get_paper_metadata, paper.paper_id)
+        if require_pdf_url and not meta.pdf_url:
+            return meta, None
+        if _reuse_downloads:
+            existing = await asyncio.to_thread(find_downloaded, paper.paper_id)
+            if existing is not None:
+                return meta, (*existing, True)
+        return meta, (*await save_pdf(meta, connector.stream_fulltext(paper.paper_id)), False)
+
+async def download_papers(connector, papers, require_pdf_url=False, concurrency=DOWNLOAD_CONCURRENCY):
+    """
+    Fetch metadata and download the PDF of every paper concurrently.
+    
+    Args:
+        connector: Connector the papers came from
+        papers: Search results
+        require_pdf_url: Skip the download when the metadata has no PDF URL
+        concurrency: Most papers in flight at once
+        
+    Returns:
+        Per-paper fetch_and_save results, or the exception raised
+    """
+    sem = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *(fetch_and_save(sem, connector, p, require_pdf_url) for p in papers), return_exceptions=True
+    )
+    for paper, result in zip(papers, results):
+        if isinstance(result, Exception):
+            logger.error(f"{paper.paper_id}: download failed: {result}")
+            continue
+        meta, saved = result
+        logger.info(f"{paper.paper_id}: {meta.title}")
+        logger.info(f"  Authors: {', '.join(a.name for a in meta.authors)}")
+        if saved is None:
+            logger.info("  No PDF URL available for this paper")
+        else:
+            size, filepath, reused = saved
+            if reused:
+                logger.info(f"  Already downloaded ({size} bytes): {filepath}")
+            else:
+                logger.info(f"  Downloaded {size} bytes of PDF data, saved to: {filepath}")
+    return results
 
 async def test_arxiv(session, custom_query=None):
     """Test ArXiv connector functionality and save PDFs"""
-    print("\n=== Testing ArXiv Connector ===")
+    logger.info("\n=== Testing ArXiv Connector ===")
     
     try:
         connector = ArXivConnector(session)
         
         # Test search
-        print("\nTesting search...")
-        query_text = custom_query if custom_query else "transformer neural networks"
-        print(f"Using query: '{query_text}'")
-        query = SearchQuery(query=query_text, max_results=5)
-        papers = await connector.search(query)
-        print(f"Found {len(papers)} papers")
+        logger.info("\nTesting search...")
+        query = SearchQuery(query=custom_query, max_results=5) if custom_query else _ARXIV_QUERY
+        logger.info(f"Using query: '{query.query}'")
+        papers = await with_retry(connector.search, query)
+        logger.info(f"Found {len(papers)} papers")
         if papers:
-            print(f"First paper: {papers[0].title}")
+            logger.info(f"First paper: {papers[0].title}")
             
-        # Test metadata retrieval
+        # Fetch metadata and PDFs for every result, a few papers at a time
         if papers:
-            paper_id = papers[0].paper_id
-            print(f"\nTesting metadata retrieval for {paper_id}...")
-            paper = await connector.get_paper_metadata(paper_id)
-            print(f"Title: {paper.title}")
-            print(f"Authors: {', '.join(a.name for a in paper.authors)}")
-            print(f"Abstract: {paper.abstract[:150]}...")
-            
-            # Test PDF download and save to file
-            print(f"\nTesting PDF download for {paper_id}...")
-            pdf_data = await connector.download_fulltext(paper_id)
-            
-            # Create a sanitized filename
-            clean_id = paper_id.replace(":", "_")
-            clean_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
-            filename = f"{clean_id}_{clean_title[:50]}.pdf"
-            filepath = DOWNLOAD_DIR / filename
-            
-            # Save the PDF
-            with open(filepath, "wb") as f:
-                f.write(pdf_data)
-            
-            print(f"Downloaded {len(pdf_data)} bytes of PDF data")
-            print(f"Saved to: {filepath}")
-            
+            logger.info(f"\nTesting metadata retrieval and PDF download for {len(papers)} papers...")
+            await download_papers(connector, papers)
+        
         # Test ID parsing
-        print("\nTesting ID parsing...")
+        logger.info("\nTesting ID parsing...")
         test_ids = [
             "2104.08935",
             "arxiv:2104.08935",
             "https://arxiv.org/abs/2104.08935"
         ]
-        for test_id in test_ids:
-            parsed = connector.parse_paper_id(test_id)
-            print(f"Original: {test_id} -> Parsed: {parsed}")
+        for test_id, parsed in zip(test_ids, connector.parse_paper_ids(test_ids)):
+            logger.info(f"Original: {test_id} -> Parsed: {parsed}")
             
     except Exception as e:
-        print(f"Error testing ArXiv connector: {e}")
+        logger.error(f"Error testing ArXiv connector: {e}")
 
 async def test_pubmed(session, custom_query=None):
     """Test PubMed connector functionality and save PDFs"""
-    print("\n=== Testing PubMed Connector ===")
+    logger.info("\n=== Testing PubMed Connector ===")
     
     try:
         connector = PubMedConnector(session, email="deepresearch@example.com")
         
         # Test search
-        print("\nTesting search...")
-        query_text = custom_query if custom_query else "CRISPR gene editing"
-        print(f"Using query: '{query_text}'")
-        query = SearchQuery(query=query_text, max_results=5)
-        papers = await connector.search(query)
-        print(f"Found {len(papers)} papers")
+        logger.info("\nTesting search...")
+        query = SearchQuery(query=custom_query, max_results=5) if custom_query else _PUBMED_QUERY
+        logger.info(f"Using query: '{query.query}'")
+        papers = await with_retry(connector.search, query)
+        logger.info(f"Found {len(papers)} papers")
         if papers:
-            print(f"First paper: {papers[0].title}")
+            logger.info(f"First paper: {papers[0].title}")
             
-        # Test metadata retrieval
+        # Fetch metadata and PDFs for every result, a few papers at a time
         if papers:
-            paper_id = papers[0].paper_id
-            print(f"\nTesting metadata retrieval for {paper_id}...")
-            paper = await connector.get_paper_metadata(paper_id)
-            print(f"Title: {paper.title}")
-            print(f"Authors: {', '.join(a.name for a in paper.authors)}")
-            print(f"Abstract: {paper.abstract[:150] if paper.abstract else 'No abstract'}...")
-            
-            # Test fulltext download (may not be available for all papers)
-            try:
-                print(f"\nTesting PDF download for {paper_id}...")
-                pdf_data = await connector.download_fulltext(paper_id)
-                
-                # Create a sanitized filename
-                clean_id = paper_id.replace(":", "_")
-                clean_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
-                filename = f"{clean_id}_{clean_title[:50]}.pdf"
-                filepath = DOWNLOAD_DIR / filename
-                
-                # Save the PDF
-                with open(filepath, "wb") as f:
-                    f.write(pdf_data)
-                
-                print(f"Downloaded {len(pdf_data)} bytes of PDF data")
-                print(f"Saved to: {filepath}")
-                
-            except Exception as e:
-                print(f"Full text download failed (expected for many PubMed papers): {e}")
-            
+            logger.info(f"\nTesting metadata retrieval and PDF download for {len(papers)} papers...")
+            await download_papers(connector, papers)
+        
         # Test ID parsing
-        print("\nTesting ID parsing...")
+        logger.info("\nTesting ID parsing...")
         test_ids = [
             "12345678",
             "pubmed:12345678",
             "https://pubmed.ncbi.nlm.nih.gov/12345678/"
         ]
-        for test_id in test_ids:
-            parsed = connector.parse_paper_id(test_id)
-            print(f"Original: {test_id} -> Parsed: {parsed}")
+        for test_id, parsed in zip(test_ids, connector.parse_paper_ids(test_ids)):
+            logger.info(f"Original: {test_id} -> Parsed: {parsed}")
             
     except Exception as e:
-        print(f"Error testing PubMed connector: {e}")
+        logger.error(f"Error testing PubMed connector: {e}")
 
 async def test_semantic_scholar(session):
     """Test Semantic Scholar connector functionality and save PDFs"""
-    print("\n=== Testing Semantic Scholar Connector ===")
+    logger.info("\n=== Testing Semantic Scholar Connector ===")
     
     try:
         api_key = os.environ.get("SEMANTICSCHOLAR_API_KEY", None)
-        print(f"Using API Key: {'Yes' if api_key else 'No'}")
+        logger.info(f"Using API Key: {'Yes' if api_key else 'No'}")
         
         connector = SemanticScholarConnector(session, api_key=api_key)
         
         # Test search
-        print("\nTesting search...")
+        logger.info("\nTesting search...")
         try:
-            query = SearchQuery(query="GPT-4 capabilities", max_results=5)
-            papers = await connector.search(query)
-            print(f"Found {len(papers)} papers")
+            papers = await with_retry(connector.search, _SEMANTIC_SCHOLAR_QUERY)
+            logger.info(f"Found {len(papers)} papers")
             if papers:
-                print(f"First paper: {papers[0].title}")
+                logger.info(f"First paper: {papers[0].title}")
                 
-            # Test metadata retrieval
+            # Fetch metadata and PDFs for every result, a few papers at a time
             if papers:
-                paper_id = papers[0].paper_id
-                print(f"\nTesting metadata retrieval for {paper_id}...")
-                paper = await connector.get_paper_metadata(paper_id)
-                print(f"Title: {paper.title}")
-                print(f"Authors: {', '.join(a.name for a in paper.authors)}")
-                print(f"Abstract: {paper.abstract[:150] if paper.abstract else 'No abstract'}...")
-                
-                # Test fulltext download (may not be available for all papers)
-                if paper.pdf_url:
-                    try:
-                        print(f"\nTesting PDF download for {paper_id}...")
-                        pdf_data = await connector.download_fulltext(paper_id)
-                        
-                        # Create a sanitized filename
-                        clean_id = paper_id.replace(":", "_")
-                        clean_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
-                        filename = f"{clean_id}_{clean_title[:50]}.pdf"
-                        filepath = DOWNLOAD_DIR / filename
-                        
-                        # Save the PDF
-                        with open(filepath, "wb") as f:
-                            f.write(pdf_data)
-                        
-                        print(f"Downloaded {len(pdf_data)} bytes of PDF data")
-                        print(f"Saved to: {filepath}")
-                        
-                    except Exception as e:
-                        print(f"Full text download failed: {e}")
-                else:
-                    print("No PDF URL available for this paper")
+                logger.info(f"\nTesting metadata retrieval and PDF download for {len(papers)} papers...")
+                await download_papers(connector, papers, require_pdf_url=True)
         except Exception as e:
-            print(f"Semantic Scholar search failed: {e}")
-            print("Trying with a different query...")
+            logger.error(f"Semantic Scholar search failed: {e}")
+            logger.info("Trying with a different query...")
             
             # Try a fallback query
             try:
-                query = SearchQuery(query="machine learning", max_results=3)
-                papers = await connector.search(query)
-                print(f"Found {len(papers)} papers with fallback query")
+                papers = await with_retry(connector.search, _SEMANTIC_SCHOLAR_FALLBACK_QUERY)
+                logger.info(f"Found {len(papers)} papers with fallback query")
                 if papers:
-                    print(f"First paper: {papers[0].title}")
+                    logger.info(f"First paper: {papers[0].title}")
                     
                     # Test metadata retrieval with fallback
                     paper_id = papers[0].paper_id
-                    print(f"\nTesting metadata retrieval for {paper_id}...")
-                    paper = await connector.get_paper_metadata(paper_id)
-                    print(f"Title: {paper.title}")
+                    logger.info(f"\nTesting metadata retrieval for {paper_id}...")
+                    paper = await with_retry(connector.get_paper_metadata, paper_id)
+                    logger.info(f"Title: {paper.title}")
                     # Rest of the processing...
             except Exception as e2:
-                print(f"Fallback search also failed: {e2}")
+                logger.error(f"Fallback search also failed: {e2}")
             
         # Test ID parsing
-        print("\nTesting ID parsing...")
+        logger.info("\nTesting ID parsing...")
         test_ids = [
             "12345678",
             "semanticscholar:12345678",
             "https://www.semanticscholar.org/paper/12345678"
         ]
-        for test_id in test_ids:
-            parsed = connector.parse_paper_id(test_id)
-            print(f"Original: {test_id} -> Parsed: {parsed}")
+        for test_id, parsed in zip(test_ids, connector.parse_paper_ids(test_ids)):
+            logger.info(f"Original: {test_id} -> Parsed: {parsed}")
             
     except Exception as e:
-        print(f"Error testing Semantic Scholar connector: {e}")
-        print(f"Error type: {type(e).__name__}")
+        logger.error(f"Error testing Semantic Scholar connector: {e}")
+        logger.error(f"Error type: {type(e).__name__}")
         if hasattr(e, 'args') and e.args:
-            print(f"Error details: {e.args}")
+            logger.error(f"Error details: {e.args}")
         
         # Try with direct instantiation  
         try:
-            print("\nTrying alternative initialization...")
+            logger.info("\nTrying alternative initialization...")
             import semanticscholar as ss
             ss_client = ss.SemanticScholar(api_key=api_key)
-            print("Direct client creation successful")
+            logger.info("Direct client creation successful")
             
             # Try a basic query to test
-            print("Testing direct API call...")
+            logger.info("Testing direct API call...")
             result = ss_client.get_paper("0796f6cd-5712-4342-9c9f-3f3735f6e20a")
-            print(f"Direct API call successful: {result['title'] if result else 'No result'}")
+            logger.info(f"Direct API call successful: {result['title'] if result else 'No result'}")
         except Exception as e2:
-            print(f"Alternative test also failed: {e2}")
+            logger.error(f"Alternative test also failed: {e2}")
 
 async def test_google_scholar(session):
     """Test Google Scholar connector functionality and save PDFs"""
-    print("\n=== Testing Google Scholar Connector ===")
-    print("\nNote: Google Scholar may rate-limit or block scraping attempts")
+    logger.info("\n=== Testing Google Scholar Connector ===")
+    logger.info("\nNote: Google Scholar may rate-limit or block scraping attempts")
     
     try:
         connector = GoogleScholarConnector(session, use_proxy=False)
         
         # Test search
-        print("\nTesting search...")
-        query = SearchQuery(query="language model evaluation", max_results=3)
-        papers = await connector.search(query)
-        print(f"Found {len(papers)} papers")
+        logger.info("\nTesting search...")
+        papers = await with_retry(connector.search, _GOOGLE_SCHOLAR_QUERY)
+        logger.info(f"Found {len(papers)} papers")
         if papers:
-            print(f"First paper: {papers[0].title}")
+            logger.info(f"First paper: {papers[0].title}")
             
-        # Test metadata retrieval (this might fail due to rate limiting)
+        # Fetch metadata and PDFs for every result, one paper at a time since
+        # Google Scholar is quick to block bursts of requests
         if papers:
-            try:
-                paper_id = papers[0].paper_id
-                print(f"\nTesting metadata retrieval for {paper_id}...")
-                paper = await connector.get_paper_metadata(paper_id)
-                print(f"Title: {paper.title}")
-                print(f"Authors: {', '.join(a.name for a in paper.authors)}")
-                
-                # Test PDF download if URL available
-                if paper.pdf_url:
-                    try:
-                        print(f"\nTesting PDF download for {paper_id}...")
-                        pdf_data = await connector.download_fulltext(paper_id)
-                        
-                        # Create a sanitized filename
-                        clean_id = paper_id.replace(":", "_")
-                        clean_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
-                        filename = f"{clean_id}_{clean_title[:50]}.pdf"
-                        filepath = DOWNLOAD_DIR / filename
-                        
-                        # Save the PDF
-                        with open(filepath, "wb") as f:
-                            f.write(pdf_data)
-                        
-                        print(f"Downloaded {len(pdf_data)} bytes of PDF data")
-                        print(f"Saved to: {filepath}")
-                        
-                    except Exception as e:
-                        print(f"Full text download failed: {e}")
-                else:
-                    print("No PDF URL available for this paper")
-                    
-            except Exception as e:
-                print(f"Metadata retrieval failed (possibly due to rate limiting): {e}")
-            
+            logger.info(f"\nTesting metadata retrieval and PDF download for {len(papers)} papers...")
+            await download_papers(connector, papers, require_pdf_url=True, concurrency=1)
+        
         # Test ID parsing
-        print("\nTesting ID parsing...")
+        logger.info("\nTesting ID parsing...")
         test_ids = [
             "abcdef123456",
             "googlescholar:abcdef123456",
             "https://scholar.google.com/scholar?cluster=abcdef123456"
         ]
-        for test_id in test_ids:
-            parsed = connector.parse_paper_id(test_id)
-            print(f"Original: {test_id} -> Parsed: {parsed}")
+        for test_id, parsed in zip(test_ids, connector.parse_paper_ids(test_ids)):
+            logger.info(f"Original: {test_id} -> Parsed: {parsed}")
             
     except Exception as e:
-        print(f"Error testing Google Scholar connector: {e}")
+        logger.error(f"Error testing Google Scholar connector: {e}")
 
 async def test_google_drive(session):
     """Test Google Drive connector functionality"""
-    print("\n=== Testing Google Drive Connector ===")
+    logger.info("\n=== Testing Google Drive Connector ===")
     
     try:
-        connector = GoogleDriveConnector(session)
-        
         # Test authentication
-        print("\nTesting authentication (this will prompt for authorization if needed)...")
-        auth_success = await connector.authenticate()
-        if auth_success:
-            print("Authentication successful")
+        logger.info("\nTesting authentication (this will prompt for authorization if needed)...")
+        connector = await authenticated_drive(session)
+        if connector is not None:
+            logger.info("Authentication successful")
             
             # Test folder creation
             test_folder_name = f"DeepResearch_Test_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            print(f"\nTesting folder creation: {test_folder_name}...")
+            logger.info(f"\nTesting folder creation: {test_folder_name}...")
             folder_id = await connector.create_folder(test_folder_name)
-            print(f"Created folder with ID: {folder_id}")
+            logger.info(f"Created folder with ID: {folder_id}")
             
             # Test document upload
-            print("\nTesting document upload...")
+            logger.info("\nTesting document upload...")
             test_content = "This is a test document created by DeepResearch test script."
             test_filename = "test_document.txt"
             doc = await connector.store_document(
@@ -339,52 +416,82 @@ async def test_google_drive(session):
                 mime_type="text/plain",
                 folder_id=folder_id
             )
-            print(f"Uploaded document: {doc.name}")
-            print(f"View at: {doc.web_view_link}")
+            logger.info(f"Uploaded document: {doc.name}")
+            logger.info(f"View at: {doc.web_view_link}")
             
             # Test listing documents
-            print("\nTesting document listing...")
+            logger.info("\nTesting document listing...")
             docs = await connector.list_documents(folder_id=folder_id)
-            print(f"Found {len(docs)} documents in folder")
+            logger.info(f"Found {len(docs)} documents in folder")
             for d in docs:
-                print(f"- {d.name} ({d.mime_type})")
+                logger.info(f"- {d.name} ({d.mime_type})")
                 
             # Test downloading document
-            print("\nTesting document download...")
+            logger.info("\nTesting document download...")
             content = await connector.download_document(doc.document_id)
-            print(f"Downloaded {len(content)} bytes")
-            print(f"Content: {content.decode('utf-8')}")
+            logger.info(f"Downloaded {len(content)} bytes")
+            logger.info(f"Content: {content.decode('utf-8')}")
         else:
-            print("Authentication failed")
+            logger.error("Authentication failed")
             
     except Exception as e:
-        print(f"Error testing Google Drive connector: {e}")
+        logger.error(f"Error testing Google Drive connector: {e}")
         
+def start_logging():
+    """
+    Route log records through a queue to one listener thread that writes them.
+    
+    The concurrent tests only enqueue records, so they never wait on each other
+    for the terminal. Returns the listener, which must be stopped to flush.
+    """
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(records))
+    listener = QueueListener(records, handler)
+    listener.start()
+    return listener
+
 async def main():
     parser = argparse.ArgumentParser(description='Test DeepResearch connectors and download PDFs')
     parser.add_argument('--connector', choices=['arxiv', 'pubmed', 'semanticscholar', 'googlescholar', 'drive', 'all'], 
                         default='all', help='Which connector to test')
     parser.add_argument('--query', type=str, default=None, help='Custom search query')
+    parser.add_argument('--redownload', action='store_true',
+                        help='Download every PDF even if an earlier run saved it')
     
     args = parser.parse_args()
+    global _reuse_downloads
+    _reuse_downloads = not args.redownload
     
-    print(f"PDF files will be saved to: {DOWNLOAD_DIR.absolute()}")
-    
-    async with aiohttp.ClientSession() as session:
-        if args.connector in ['arxiv', 'all']:
-            await test_arxiv(session, args.query)
-            
-        if args.connector in ['pubmed', 'all']:
-            await test_pubmed(session, args.query)
-            
-        if args.connector in ['semanticscholar', 'all']:
-            await test_semantic_scholar(session)
-            
-        if args.connector in ['googlescholar', 'all']:
-            await test_google_scholar(session)
+    listener = start_logging()
+    try:
+        logger.info(f"PDF files will be saved to: {DOWNLOAD_DIR.absolute()}")
+        
+        async with shared_session() as session, pdf_writer():
+            tests = {
+                'arxiv': lambda: test_arxiv(session, args.query),
+                'pubmed': lambda: test_pubmed(session, args.query),
+                'semanticscholar': lambda: test_semantic_scholar(session),
+                'googlescholar': lambda: test_google_scholar(session),
+                'drive': lambda: test_google_drive(session)
+            }
+            selected = [name for name in tests if args.connector in [name, 'all']]
             
-        if args.connector in ['drive', 'all']:
-            await test_google_drive(session)
+            # The connectors hit independent hosts, so their network waits overlap.
+            # Each test reports its own expected failures; anything that escapes one
+            # cancels the rest rather than leaving them to run out their timeouts.
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    for name in selected:
+                        tg.create_task(tests[name](), name=name)
+            except* Exception as group:
+                for error in group.exceptions:
+                    logger.error(f"Connector tests stopped: {error}")
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run_event_loop(main())
@@ -3,9 +3,13 @@ import os
 import sys
 import logging
 from pathlib import Path
-import aiohttp
 import json
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -14,15 +18,9 @@ logger = logging.getLogger("drive_connector_test")
 # Add the parent directory to the path so we can import deepresearch modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from deepresearch.connectors import GoogleDriveConnector
-
-# Create test directory
-TEST_DIR = Path("test_files")
-TEST_DIR.mkdir(exist_ok=True)
-
-# Create downloads directory
-DOWNLOAD_DIR = Path("downloads")
-DOWNLOAD_DIR.mkdir(exist_ok=True)
+from deepresearch.tests._http import authenticated_drive, shared_session
+from deepresearch.tests._paths import DOWNLOAD_DIR, TEST_DIR, ensure_dir
+from deepresearch.utils.event_loop import run_event_loop
 
 # Path to credentials file
 CREDENTIALS_FILE = os.environ.get(
@@ -32,9 +30,8 @@ CREDENTIALS_FILE = os.environ.get(
 
 async def create_test_file(filename="test_document.txt", content="This is a test file created by Deep Research"):
     """Create a test file to upload to Google Drive"""
-    filepath = TEST_DIR / filename
-    with open(filepath, "w") as f:
-        f.write(content)
+    filepath = ensure_dir(TEST_DIR) / filename
+    await asyncio.to_thread(filepath.write_text, content)
     logger.info(f"Created test file: {filepath}")
     return filepath
 
@@ -52,16 +49,13 @@ async def test_drive_connector():
     
     try:
         # Create session
-        async with aiohttp.ClientSession() as session:
-            # Initialize connector
-            connector = GoogleDriveConnector(session)
-            
+        async with shared_session() as session:
             # Set up authentication 
             logger.info("Setting up authentication...")
             try:
-                # Load credentials
-                with open(CREDENTIALS_FILE, 'r') as f:
-                    credentials_data = json.load(f)
+                # Load credentials off the event loop
+                raw = await asyncio.to_thread(Path(CREDENTIALS_FILE).read_bytes)
+                credentials_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
                 
                 # Check if client_id and client_secret are in environment variables
                 client_id = os.environ.get("GOOGLE_CLIENT_ID", credentials_data.get("installed", {}).get("client_id"))
@@ -76,7 +70,10 @@ async def test_drive_connector():
                 os.environ["GOOGLE_CLIENT_SECRET"] = client_secret
                 
                 # Initialize the connector (this will trigger authentication flow if not authenticated)
-                await connector.authenticate()
+                connector = await authenticated_drive(session)
+                if connector is None:
+                    logger.error("Authentication failed")
+                    return
                 logger.info("Authentication successful")
                 
             except Exception as e:
@@ -104,33 +101,30 @@ async def test_drive_connector():
                 logger.info("\nUploading a test file...")
                 test_filepath = await create_test_file()
                 
-                with open(test_filepath, "rb") as f:
-                    file_content = f.read()
-                
-                upload_result = await connector.store_document(
-                    content=file_content,
-                    filename="test_document.txt",
-                    mime_type="text/plain",
-                    folder_id=folder_id
-                )
+                # Upload straight from the file rather than reading it into memory
+                with await asyncio.to_thread(open, test_filepath, "rb") as fh:
+                    upload_result = await connector.store_document(
+                        content=fh,
+                        filename="test_document.txt",
+                        mime_type="text/plain",
+                        folder_id=folder_id
+                    )
                 
                 file_id = upload_result.document_id
                 logger.info(f"Uploaded file with ID: {file_id}")
                 
                 # Test downloading the file
                 logger.info("\nDownloading the uploaded file...")
-                download_path = DOWNLOAD_DIR / "downloaded_test_document.txt"
+                download_path = ensure_dir(DOWNLOAD_DIR) / "downloaded_test_document.txt"
                 
                 file_content = await connector.download_document(file_id)
                 
-                with open(download_path, "wb") as f:
-                    f.write(file_content)
+                await asyncio.to_thread(download_path.write_bytes, file_content)
                     
                 logger.info(f"Downloaded file to: {download_path}")
                 
                 # Verify the content
-                with open(download_path, "r") as f:
-                    content = f.read()
+                content = await asyncio.to_thread(download_path.read_text)
                 
                 logger.info(f"File content: {content}")
                 
@@ -156,4 +150,4 @@ async def main():
     await test_drive_connector()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run_event_loop(main())
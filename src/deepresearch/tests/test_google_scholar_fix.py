@@ -1,29 +1,58 @@
 import asyncio
-import aiohttp
 import os
 import sys
 import argparse
 import logging
 from datetime import datetime
-import pathlib
 import re
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG, 
+logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("google_scholar_test")
 
 # Add the parent directory to the path so we can import the modules
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
+from deepresearch.tests._http import shared_session
+from deepresearch.tests._paths import DOWNLOAD_DIR, ensure_dir
 from deepresearch.connectors import GoogleScholarConnector, ArXivConnector
 from deepresearch.models import SearchQuery, Paper
+from deepresearch.utils import sanitize_filename
 
-# Create download directory
-DOWNLOAD_DIR = pathlib.Path("downloads")
-DOWNLOAD_DIR.mkdir(exist_ok=True)
+def write_all(path, data):
+    """
+    Write an in-memory payload straight to a file descriptor.
+    
+    Skips the BufferedWriter layer, which would only copy a PDF that is
+    already one contiguous buffer.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_CLOEXEC", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
-async def test_google_scholar_search(session, query_text="language model evaluation", max_results=3):
+def take(iterator, count):
+    """
+    Pull up to count items from a blocking iterator.
+    
+    Returns:
+        Tuple of the items pulled and the error that stopped it early, if any
+    """
+    items = []
+    try:
+        for _ in range(count):
+            items.append(next(iterator))
+    except StopIteration:
+        pass
+    except Exception as e:
+        return items, e
+    return items, None
+
+async def test_google_scholar_search(session, query_text="language model evaluation", max_results=3, verbose=False):
     """Test only the search functionality of Google Scholar connector"""
     print(f"\n=== Testing Google Scholar Search: '{query_text}' ===")
     
@@ -87,23 +116,22 @@ async def test_google_scholar_search(session, query_text="language model evaluat
                             arxiv_id = arxiv_id_match.group(1)
                     
                     if arxiv_id:
-                        print(f"\nTesting ArXiv metadata retrieval for arxiv:{arxiv_id}...")
+                        print(f"\nTesting ArXiv metadata retrieval and PDF download for arxiv:{arxiv_id}...")
                         arxiv_connector = ArXivConnector(session)
-                        paper = await arxiv_connector.get_paper_metadata(f"arxiv:{arxiv_id}")
+                        # The metadata and the PDF are separate requests, so fetch them together
+                        paper, pdf_data = await asyncio.gather(
+                            arxiv_connector.get_paper_metadata(f"arxiv:{arxiv_id}"),
+                            arxiv_connector.download_fulltext(f"arxiv:{arxiv_id}")
+                        )
                         print(f"Retrieved metadata successfully from ArXiv: {paper.title}")
                         
-                        # Try PDF download
-                        print(f"\nAttempting to download PDF from ArXiv...")
-                        pdf_data = await arxiv_connector.download_fulltext(f"arxiv:{arxiv_id}")
-                        
                         # Save the PDF
                         clean_id = arxiv_id.replace(":", "_")
-                        clean_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
-                        filename = f"arxiv_{clean_id}_{clean_title[:50]}.pdf"
-                        filepath = DOWNLOAD_DIR / filename
+                        clean_title = sanitize_filename(paper.title[:50])
+                        filename = f"arxiv_{clean_id}_{clean_title}.pdf"
+                        filepath = ensure_dir(DOWNLOAD_DIR) / filename
                         
-                        with open(filepath, "wb") as f:
-                            f.write(pdf_data)
+                        await asyncio.to_thread(write_all, filepath, pdf_data)
                         
                         print(f"Downloaded {len(pdf_data)} bytes of PDF data")
                         print(f"Saved to: {filepath}")
@@ -117,19 +145,15 @@ async def test_google_scholar_search(session, query_text="language model evaluat
         print(f"Error in test: {e}")
         print(f"Error type: {type(e).__name__}")
         
-        # Print traceback for more detailed debugging
-        import traceback
-        print("\nTraceback:")
-        traceback.print_exc()
-        
-        # Debug the connector's code
-        print("\nDebugging connector code:")
-        print("Checking connector's search method...")
-        import inspect
-        if hasattr(GoogleScholarConnector, 'search'):
-            print(inspect.getsource(GoogleScholarConnector.search))
-        else:
-            print("search method not found")
+        if verbose:
+            # Traceback and connector source are only loaded and formatted on request
+            import traceback
+            import inspect
+            logger.debug("Traceback:\n%s", traceback.format_exc())
+            if hasattr(GoogleScholarConnector, 'search'):
+                logger.debug("Connector search method:\n%s", inspect.getsource(GoogleScholarConnector.search))
+            else:
+                logger.debug("search method not found")
 
 async def test_google_scholar_metadata(session, paper_id):
     """Test only the metadata retrieval functionality"""
@@ -151,12 +175,11 @@ async def test_google_scholar_metadata(session, paper_id):
                 
                 # Save the PDF
                 clean_id = paper_id.replace(":", "_")
-                clean_title = ''.join(c if c.isalnum() or c in [' ', '.', '-', '_'] else '_' for c in paper.title)
-                filename = f"{clean_id}_{clean_title[:50]}.pdf"
-                filepath = DOWNLOAD_DIR / filename
+                clean_title = sanitize_filename(paper.title[:50])
+                filename = f"{clean_id}_{clean_title}.pdf"
+                filepath = ensure_dir(DOWNLOAD_DIR) / filename
                 
-                with open(filepath, "wb") as f:
-                    f.write(pdf_data)
+                await asyncio.to_thread(write_all, filepath, pdf_data)
                 
                 print(f"Downloaded {len(pdf_data)} bytes of PDF data")
                 print(f"Saved to: {filepath}")
@@ -178,24 +201,21 @@ async def debug_scholarly_module():
         
         # Test a basic search
         print("\nTesting basic search...")
-        results = scholarly.search_pubs("natural language processing", patents=False)
+        results = await asyncio.to_thread(scholarly.search_pubs, "natural language processing", patents=False)
         
-        # Get first few results
+        # Get first few results. next() blocks on Google Scholar whenever it needs
+        # a new page, and the iterator can't be advanced from several threads at
+        # once, so all of them are pulled in a single worker thread.
         print("First results:")
-        count = 0
-        for i in range(3):
-            try:
-                result = next(results)
-                count += 1
-                print(f"{i+1}. {result.get('bib', {}).get('title', 'No title')}")
-            except StopIteration:
-                print("No more results")
-                break
-            except Exception as e:
-                print(f"Error getting result {i}: {e}")
-                break
+        first, error = await asyncio.to_thread(take, results, 3)
+        for i, result in enumerate(first, 1):
+            print(f"{i}. {result.get('bib', {}).get('title', 'No title')}")
+        if error is not None:
+            print(f"Error getting result {len(first)}: {error}")
+        elif len(first) < 3:
+            print("No more results")
                 
-        print(f"Successfully retrieved {count} results")
+        print(f"Successfully retrieved {len(first)} results")
         
     except Exception as e:
         print(f"Error debugging scholarly: {e}")
@@ -233,17 +253,21 @@ async def main():
                         help='Paper ID for metadata test')
     parser.add_argument('--max_results', type=int, default=3,
                         help='Maximum number of results to return')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                        help='Log debug output, including tracebacks and connector source on failure')
     
     args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
     
     if args.mode == 'all' and not args.paper_id:
         print("Running in 'all' mode requires a paper_id for metadata testing.")
         print("Defaulting to search and scholarly tests only.")
         args.mode = 'methods'
     
-    async with aiohttp.ClientSession() as session:
+    async with shared_session() as session:
         if args.mode in ['search', 'all']:
-            await test_google_scholar_search(session, args.query, args.max_results)
+            await test_google_scholar_search(session, args.query, args.max_results, args.verbose)
             
         if args.mode in ['metadata', 'all'] and args.paper_id:
             await test_google_scholar_metadata(session, args.paper_id)
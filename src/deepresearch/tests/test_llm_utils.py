@@ -0,0 +1,13 @@
+import asyncio
+from deepresearch.utils import parse_json_response
+
+
+def test_parse_json_response_skips_bracketed_prose():
+    """A citation like "[1]" before the real object must not be returned instead of it."""
+    assert asyncio.run(parse_json_response('See ref [1]. {"a": 1}')) == {"a": 1}
+
+
+def test_parse_json_response_accepts_list_of_objects_after_prose():
+    """A list of objects is kept even when a bare list appears before it."""
+    text = 'Found [2] relations: [{"source": "x", "target": "y"}]'
+    assert asyncio.run(parse_json_response(text)) == [{"source": "x", "target": "y"}]
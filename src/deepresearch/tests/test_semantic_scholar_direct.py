@@ -12,19 +12,23 @@ def test_direct_api():
         client = ss.SemanticScholar()
         print("Client created successfully")
         
-        # Test getting a paper by ID
-        print("\nTesting get_paper...")
-        paper_id = "0796f6cd-5712-4342-9c9f-3f3735f6e20a"  # GPT-3 paper ID
-        print(f"Fetching paper {paper_id}...")
+        # Test getting papers by ID, in one request to the batch endpoint
+        print("\nTesting get_papers...")
+        paper_ids = [
+            "0796f6cd-5712-4342-9c9f-3f3735f6e20a",  # GPT-3 paper ID
+            "arXiv:2005.14165"
+        ]
+        print(f"Fetching papers {', '.join(paper_ids)}...")
         
         # Add delay to avoid rate limiting
         time.sleep(1)
         
-        paper = client.get_paper(paper_id)
-        if paper:
-            print(f"Successfully retrieved paper: {paper['title']}")
+        papers = client.get_papers(paper_ids, fields=["title", "authors", "abstract"])
+        if papers:
+            for paper in papers:
+                print(f"Successfully retrieved paper: {paper['title']}")
         else:
-            print("Paper not found")
+            print("Papers not found")
             
         # Test searching for papers
         print("\nTesting paper search...")
@@ -1,6 +1,27 @@
-from .llm_utils import call_anthropic_api, parse_json_response
+from .llm_utils import (
+    call_anthropic_api,
+    call_anthropic_api_cached,
+    parse_json_response,
+    get_shared_client,
+    close_shared_client,
+    clip_to_tokens,
+    load_token_encoding
+)
+from .filenames import sanitize_filename
+from .paths import user_cache_dir
+from .paper_ids import split_paper_id
+from .event_loop import run_event_loop
 
 __all__ = [
     'call_anthropic_api',
-    'parse_json_response'
+    'call_anthropic_api_cached',
+    'parse_json_response',
+    'get_shared_client',
+    'close_shared_client',
+    'clip_to_tokens',
+    'load_token_encoding',
+    'sanitize_filename',
+    'user_cache_dir',
+    'split_paper_id',
+    'run_event_loop'
 ] 
\ No newline at end of file
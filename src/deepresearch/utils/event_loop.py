@@ -0,0 +1,21 @@
+import asyncio
+from typing import Any, Coroutine
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional; fall back to the default event loop
+    uvloop = None
+
+def run_event_loop(main: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion, on uvloop when it is installed.
+    
+    Args:
+        main: Top-level coroutine of a script or the server
+        
+    Returns:
+        Whatever main returns
+    """
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
@@ -0,0 +1,26 @@
+class _FilenameCharTable(dict):
+    """
+    str.translate table that keeps alphanumerics and " .-_" and maps anything
+    else to "_". Entries are filled in per code point on first use, so the
+    table covers all of Unicode without being built up front.
+    """
+    
+    def __missing__(self, codepoint: int) -> str:
+        char = chr(codepoint)
+        replacement = char if char.isalnum() or char in " .-_" else "_"
+        self[codepoint] = replacement
+        return replacement
+
+_FILENAME_CHARS = _FilenameCharTable()
+
+def sanitize_filename(name: str) -> str:
+    """
+    Make a string safe to use as a file name.
+    
+    Args:
+        name: Title or other free text
+        
+    Returns:
+        name with every character other than alphanumerics and " .-_" replaced by "_"
+    """
+    return name.translate(_FILENAME_CHARS)
@@ -1,35 +1,185 @@
 import os
 import json
+import asyncio
+import functools
+import hashlib
+import inspect
+import random
+import tempfile
+import time
 import aiohttp
 import re
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Union
 
-async def call_anthropic_api(
-    prompt: str,
-    api_key: Optional[str] = None,
-    model: str = "claude-3-sonnet-20240229",
-    max_tokens: int = 4000,
-    temperature: float = 0.7
-) -> str:
+from .paths import user_cache_dir
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; fall back to a character estimate
+    tiktoken = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+# Rough characters-per-token ratio used when tiktoken is unavailable
+CHARS_PER_TOKEN = 4
+
+# Default token budget for paper text sent to the LLM, about the 10000
+# characters prompts were cut to before truncation counted tokens
+MAX_TEXT_TOKENS = 2500
+
+# Directory for cached LLM responses, under the user's cache directory by default
+LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR") or user_cache_dir("llm")
+
+# Set LLM_CACHE to 0 to always call the API and never read or write the cache
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+# Seconds before a cached LLM response is considered stale (default 7 days)
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
+
+# Connection pool sizes for the shared session. All Anthropic traffic goes to one
+# host, so the per-host cap is what bounds concurrent LLM calls.
+ANTHROPIC_POOL_LIMIT = int(os.environ.get("ANTHROPIC_POOL_LIMIT", "256"))
+ANTHROPIC_POOL_PER_HOST = int(os.environ.get("ANTHROPIC_POOL_PER_HOST", "64"))
+
+# Response bodies larger than this are parsed in a worker thread so a long
+# completion doesn't stall the event loop; smaller ones aren't worth the hop
+OFFLOAD_PARSE_BYTES = 256 * 1024
+
+# Attempts per Anthropic request, and the statuses worth another attempt
+# (rate limited, server errors and 529 "overloaded")
+ANTHROPIC_MAX_RETRIES = 4
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504, 529})
+
+# Longest wait between retries, in seconds
+MAX_RETRY_DELAY = 60
+
+# Messages API endpoint
+ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
+
+# Anthropic request timeouts. There is no overall cap, since a long generation
+# legitimately takes minutes; instead connecting is bounded, and so is each
+# wait for response bytes (the server is silent until a non-streamed reply is
+# done, so sock_read matches aiohttp's old 300 s default total)
+API_TIMEOUT = aiohttp.ClientTimeout(total=None, connect=30, sock_read=300)
+
+# Raised when a connection couldn't be opened in time (aiohttp >= 3.10); older
+# versions don't tell connect and read timeouts apart, so neither is retried
+_CONNECT_TIMEOUT_ERROR = getattr(aiohttp, "ConnectionTimeoutError", ())
+
+# Process-wide session so Anthropic calls reuse pooled keep-alive connections
+_shared_session: Optional[aiohttp.ClientSession] = None
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_shared_client() -> aiohttp.ClientSession:
     """
-    Call the Anthropic Claude API with the given prompt.
+    Return the shared aiohttp session used for Anthropic API calls.
+    
+    The session is created on first use and recreated if it was closed or
+    belongs to a different event loop. Must be called from a running loop.
+    
+    Returns:
+        Shared aiohttp ClientSession
+    """
+    global _shared_session, _shared_loop
+    loop = asyncio.get_running_loop()
+    if _shared_session is None or _shared_session.closed or _shared_loop is not loop:
+        # Idle connections are kept past aiohttp's 15 s default so that calls
+        # spaced out by long generations still skip the TCP and TLS handshakes
+        _shared_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=ANTHROPIC_POOL_LIMIT,
+                limit_per_host=ANTHROPIC_POOL_PER_HOST,
+                ttl_dns_cache=300,
+                keepalive_timeout=75
+            ),
+            timeout=API_TIMEOUT
+        )
+        _shared_loop = loop
+    return _shared_session
+
+async def close_shared_client():
+    """Close the shared Anthropic session, if one is open."""
+    global _shared_session, _shared_loop
+    if _shared_session is not None and not _shared_session.closed:
+        await _shared_session.close()
+    _shared_session = None
+    _shared_loop = None
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    """Load the tiktoken encoding once, or return None if it can't be loaded."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding file is fetched on first use and may be unreachable
+        return None
+
+async def load_token_encoding():
+    """
+    Load the tiktoken encoding in a worker thread.
+    
+    The first load may download the encoding file, so this is awaited at
+    startup to keep that off the event loop before clip_to_tokens needs it.
+    """
+    await asyncio.to_thread(_get_encoding)
+
+def clip_to_tokens(text: str, max_tokens: int = MAX_TEXT_TOKENS) -> str:
+    """
+    Truncate text to at most max_tokens tokens.
+    
+    Uses tiktoken's cl100k_base encoding as an approximation of the Claude
+    tokenizer; without tiktoken, assumes CHARS_PER_TOKEN characters per token.
     
     Args:
-        prompt: The prompt to send to the API
-        api_key: Anthropic API key (will use environment variable if not provided)
-        model: Model identifier to use
-        max_tokens: Maximum number of tokens to generate
-        temperature: Sampling temperature
+        text: Text to truncate
+        max_tokens: Token budget
         
     Returns:
-        The model's response text
+        The text, cut down to fit the budget
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    # Every token covers at least one character, so short text always fits
+    if len(text) <= max_tokens:
+        return text
+    tokens = encoding.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when available, otherwise the stdlib json module."""
+    if orjson is not None:
+        # orjson rejects str subclasses
+        if isinstance(data, str) and type(data) is not str:
+            data = str(data)
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _build_request(
+    prompt: str,
+    api_key: Optional[str],
+    model: str,
+    max_tokens: int,
+    temperature: float
+) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Build the headers and JSON body for a single-prompt Messages API request.
+    
+    Raises:
+        ValueError: If no API key is given or set in the environment
     """
     api_key = api_key or os.environ.get("LLM_API_KEY")
     
     if not api_key:
         raise ValueError("No Anthropic API key provided. Set the LLM_API_KEY environment variable or pass it explicitly.")
     
-    url = "https://api.anthropic.com/v1/messages"
     headers = {
         "Content-Type": "application/json",
         "x-api-key": api_key,
@@ -47,27 +197,248 @@ async def call_anthropic_api(
         "max_tokens": max_tokens,
         "temperature": temperature
     }
+    return headers, data
+
+def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+    """Seconds to wait before retry number attempt, honouring a Retry-After header."""
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), MAX_RETRY_DELAY)
+        except ValueError:
+            # An HTTP date rather than a number of seconds; use the backoff instead
+            pass
+    return min(2 ** attempt + random.random(), MAX_RETRY_DELAY)
+
+async def _post_message(
+    session: aiohttp.ClientSession,
+    headers: Dict[str, str],
+    data: Dict[str, Any],
+    tools: Optional[List[Dict[str, Any]]],
+    max_retries: int = ANTHROPIC_MAX_RETRIES
+) -> Union[str, Dict[str, Any]]:
+    """
+    Send one Messages API request and extract the text or tool input from the reply.
     
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data) as response:
+    Rate limits, overloaded or failing servers and connection errors are retried
+    with exponential backoff, up to max_retries attempts in total. Timeouts
+    while waiting for the reply are not retried.
+    """
+    for attempt in range(max_retries):
+        last_attempt = attempt == max_retries - 1
+        try:
+            async with session.post(ANTHROPIC_API_URL, headers=headers, json=data) as response:
                 if response.status == 200:
-                    result = await response.json()
-                    if "content" in result and len(result["content"]) > 0:
-                        for content_block in result["content"]:
-                            if content_block["type"] == "text":
-                                return content_block["text"]
-                        return ""
+                    body = await response.read()
+                    if len(body) > OFFLOAD_PARSE_BYTES:
+                        result = await asyncio.to_thread(_json_loads, body)
                     else:
-                        return ""
-                else:
-                    error_text = await response.text()
+                        result = _json_loads(body)
+                    content = result.get("content") or ()
+                    if tools:
+                        # Structured output: hand back the tool arguments as-is
+                        tool_input = next((block["input"] for block in content if block.get("type") == "tool_use"), None)
+                        if tool_input is not None:
+                            return tool_input
+                    return next((block["text"] for block in content if block.get("type") == "text"), "")
+                        
+                error_text = await response.text()
+                if response.status not in RETRY_STATUSES or last_attempt:
                     print(f"API error: {response.status} - {error_text}")
                     raise Exception(f"API error: {response.status} - {error_text}")
+                delay = _retry_delay(attempt, response.headers.get("Retry-After"))
+                print(f"API error: {response.status}, retrying in {delay:.1f}s")
+        except aiohttp.ClientConnectionError as e:
+            # A read timeout means the model may still have been generating; a
+            # resend would be billed again and most likely time out the same way
+            read_timeout = isinstance(e, asyncio.TimeoutError) and not isinstance(e, _CONNECT_TIMEOUT_ERROR)
+            if last_attempt or read_timeout:
+                raise
+            delay = _retry_delay(attempt, None)
+            print(f"Connection error calling Anthropic API: {str(e) or type(e).__name__}, retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+async def call_anthropic_api(
+    prompt: str,
+    api_key: Optional[str] = None,
+    model: str = "claude-3-sonnet-20240229",
+    max_tokens: int = 4000,
+    temperature: float = 0.7,
+    client: Optional[aiohttp.ClientSession] = None,
+    tools: Optional[List[Dict[str, Any]]] = None,
+    tool_choice: Optional[Dict[str, Any]] = None,
+    max_retries: int = ANTHROPIC_MAX_RETRIES
+) -> Union[str, Dict[str, Any]]:
+    """
+    Call the Anthropic Claude API with the given prompt.
+    
+    Args:
+        prompt: The prompt to send to the API
+        api_key: Anthropic API key (will use environment variable if not provided)
+        model: Model identifier to use
+        max_tokens: Maximum number of tokens to generate
+        temperature: Sampling temperature
+        client: Session to send the request on (defaults to the shared session)
+        tools: Tool definitions the model may call, for structured output
+        tool_choice: Forces a particular tool, e.g. {"type": "tool", "name": "..."}
+        max_retries: Attempts before a rate limit, server error or connection
+            failure is raised
+        
+    Returns:
+        The model's response text, or the tool input dictionary if the model
+        responded with a tool call
+    """
+    headers, data = _build_request(prompt, api_key, model, max_tokens, temperature)
+    if tools:
+        data["tools"] = tools
+    if tool_choice:
+        data["tool_choice"] = tool_choice
+    
+    try:
+        session = client or get_shared_client()
+        return await _post_message(session, headers, data, tools, max_retries)
     except Exception as e:
         print(f"Error calling Anthropic API: {str(e)}")
         raise
 
+# Arguments of call_anthropic_api that change the response, and so the cache key
+_CACHE_KEY_PARAMS = ("max_tokens", "temperature", "tools", "tool_choice")
+
+# Defaults for the cache key parameters, so an omitted argument and its default share a key
+_CACHE_KEY_DEFAULTS = {
+    name: param.default
+    for name, param in inspect.signature(call_anthropic_api).parameters.items()
+    if name in _CACHE_KEY_PARAMS
+}
+
+def _cache_key(prompt: str, model: str, kwargs: Dict[str, Any]) -> str:
+    """Hash the prompt, model and generation parameters into a cache key."""
+    params = {name: kwargs.get(name, _CACHE_KEY_DEFAULTS[name]) for name in _CACHE_KEY_PARAMS}
+    request = json.dumps({"prompt": prompt, "model": model, **params}, sort_keys=True)
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+def _cache_path(key: str) -> str:
+    """Return the cache file path for a response key, sharded by its first two hex digits."""
+    return os.path.join(LLM_CACHE_DIR, key[:2], f"{key}.json")
+
+def _read_cached(key: str) -> Optional[Union[str, Dict[str, Any]]]:
+    """Read a cached response, or None if it isn't cached or has expired."""
+    path = _cache_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > LLM_CACHE_TTL:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["response"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _write_cached(key: str, response: Union[str, Dict[str, Any]]):
+    """Store a response in the cache, replacing the file atomically."""
+    path = _cache_path(key)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Write to a temporary file first so a concurrent reader never sees half a response
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"response": response}, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+async def call_anthropic_api_cached(
+    prompt: str,
+    api_key: Optional[str] = None,
+    model: str = "claude-3-sonnet-20240229",
+    cache: Optional[bool] = None,
+    **kwargs
+) -> Union[str, Dict[str, Any]]:
+    """
+    Call the Anthropic API, reusing an on-disk response for an identical request.
+    
+    Responses are keyed by a SHA-256 hash of the prompt, model and generation
+    parameters and stored under LLM_CACHE_DIR for LLM_CACHE_TTL seconds, so
+    reruns over the same papers skip the network entirely. Setting the
+    LLM_CACHE environment variable to 0 turns the cache off.
+    
+    Args:
+        prompt: The prompt to send to the API
+        api_key: Anthropic API key (will use environment variable if not provided)
+        model: Model identifier to use
+        cache: Set to False to always call the API and leave the cache untouched,
+            or True to use the cache regardless of LLM_CACHE (defaults to LLM_CACHE)
+        **kwargs: Additional arguments passed through to call_anthropic_api
+        
+    Returns:
+        The model's response, as returned by call_anthropic_api
+    """
+    if cache is None:
+        cache = LLM_CACHE_ENABLED
+    if not cache:
+        return await call_anthropic_api(prompt, api_key, model=model, **kwargs)
+        
+    key = _cache_key(prompt, model, kwargs)
+    
+    cached = await asyncio.to_thread(_read_cached, key)
+    if cached is not None:
+        return cached
+        
+    response = await call_anthropic_api(prompt, api_key, model=model, **kwargs)
+    if response:
+        try:
+            await asyncio.to_thread(_write_cached, key, response)
+        except OSError as e:
+            print(f"Failed to cache Anthropic response: {str(e)}")
+    return response
+
+# Decoder for pulling the first JSON value out of surrounding prose
+_JSON_DECODER = json.JSONDecoder()
+
+# Where a JSON object or array may start
+_VALUE_START_RE = re.compile(r'[{\[]')
+
+# A double-quoted JSON string (left alone) or a bare single quote (to be rewritten)
+_SINGLE_QUOTE_RE = re.compile(r'"(?:\\.|[^"\\])*"|\'')
+
+def _to_double_quote(match: re.Match) -> str:
+    """Rewrite a single quote, keeping double-quoted strings and their apostrophes intact."""
+    return '"' if match.group(0) == "'" else match.group(0)
+
+def _fenced_body(text: str) -> str:
+    """Return the body of the first ``` fence in text, or the whole text if there is none."""
+    start = text.find("```")
+    if start == -1:
+        return text.strip()
+    start += 3
+    end = text.find("```", start)
+    # An unclosed fence runs to the end of the response
+    body = text[start:] if end == -1 else text[start:end]
+    return body.removeprefix("json").strip()
+
+def _is_structured(value: Any) -> bool:
+    """Whether a decoded value is an object or a list of objects, as LLM responses are."""
+    if isinstance(value, dict):
+        return True
+    return isinstance(value, list) and all(isinstance(item, dict) for item in value)
+
+def _decode_first_value(json_str: str) -> Any:
+    """
+    Parse the first JSON object, or list of objects, in a string, ignoring any text around it.
+    
+    Raises:
+        ValueError: If there is no parseable object or list of objects
+    """
+    # A bracket in the prose (e.g. "[1]") can come before the real value, so every
+    # "{" and "[" is tried in turn and values of the wrong shape are skipped
+    for match in _VALUE_START_RE.finditer(json_str):
+        try:
+            value, _ = _JSON_DECODER.raw_decode(json_str, match.start())
+        except ValueError:
+            continue
+        if _is_structured(value):
+            return value
+    raise ValueError("No JSON object or array found")
+
 async def parse_json_response(text: str) -> Dict[str, Any]:
     """
     Parse a JSON response from LLM, handling potential issues with JSON formatting.
@@ -76,25 +447,24 @@ async def parse_json_response(text: str) -> Dict[str, Any]:
     Returns:
         Parsed JSON as a dictionary
     """
-    json_pattern = r'```(?:json)?\s*([\s\S]*?)\s*```'
-    
-    matches = re.findall(json_pattern, text)
-    if matches:
-        json_str = matches[0]
-    else:
-        json_str = text
-        
-    json_str = json_str.strip()
+    json_str = _fenced_body(text)
     
+    # orjson's and the stdlib's decode errors are both ValueErrors
     try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
+        return _json_loads(json_str)
+    except ValueError as e:
+        # Prose before or after the JSON: take the first complete value
+        try:
+            return _decode_first_value(json_str)
+        except ValueError:
+            pass
+            
         print(f"Failed to parse JSON response: {e}")
         print(f"Response text: {text}")
         
-        json_str = json_str.replace("'", "\"")
+        json_str = _SINGLE_QUOTE_RE.sub(_to_double_quote, json_str)
         
         try:
-            return json.loads(json_str)
-        except json.JSONDecodeError:
+            return _json_loads(json_str)
+        except ValueError:
             return {}
@@ -0,0 +1,20 @@
+import re
+from typing import Optional, Tuple
+
+# Recognized source prefixes on paper IDs (e.g. 'doi:10.1000/xyz')
+_ID_RE = re.compile(r'^(doi|arxiv|pubmed|pmid|semanticscholar|googlescholar|drive):(.+)$')
+
+def split_paper_id(paper_id: str) -> Tuple[Optional[str], str]:
+    """
+    Split a paper ID into its source prefix and the remaining identifier.
+    
+    Args:
+        paper_id: Paper identifier, optionally prefixed with its source
+        
+    Returns:
+        Tuple of (source, rest); source is None if the prefix isn't recognized
+    """
+    match = _ID_RE.match(paper_id)
+    if match:
+        return match.group(1), match.group(2)
+    return None, paper_id
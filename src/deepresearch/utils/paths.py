@@ -0,0 +1,14 @@
+import os
+
+def user_cache_dir(name: str) -> str:
+    """
+    Return the directory for one of the package's caches.
+    
+    Args:
+        name: Name of the cache, used as a subdirectory
+        
+    Returns:
+        deepresearch/<name> under XDG_CACHE_HOME, or under ~/.cache if that is unset
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "deepresearch", name)
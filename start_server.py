@@ -5,9 +5,8 @@ Simple script to start the DeepResearch MCP server.
 Run this with: python start_server.py
 """
 
-import asyncio
-from deepresearch.server import main
+from deepresearch.server import run
 
 if __name__ == "__main__":
     print("Starting DeepResearch MCP server...")
-    asyncio.run(main()) 
\ No newline at end of file
+    run() 
\ No newline at end of file